@@ -2,71 +2,135 @@
 
 import streamlit as st
 import os
+import json
 import time
+import re
 import base64
+import hashlib
+import itertools
+import uuid
 import threading
 import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from models.lm_studio import LMStudioClient
-from models.ollama_client import OllamaClient
-from core.orchestrator import Orchestrator
 from utils.logger import setup_logger
 from utils.helpers import clean_ai_response
 from config import print_config, DEBUG_MODE, ENABLED_TOOLS, USE_OLLAMA, OLLAMA_BASE_URL, OLLAMA_MODEL_NAME
-from storage.postgresql_storage import PostgreSQLStorage
-from tools.water_level_monitoring_tool import water_level_monitoring_tool
 from utils.state_manager import get_state_manager, sync_automation_status
 
 # 로거 설정
 logger = setup_logger(__name__)
 
+# 채팅/사이드 위젯에서 쓰는 도구 (렌더링 경로 안에서 매번 import하지 않도록 상단에서 로드)
+try:
+    from tools.water_level_monitoring_tool import water_level_monitoring_tool
+except ImportError as e:
+    logger.error(f"수위 모니터링 도구 로드 실패: {e}")
+    water_level_monitoring_tool = None
+
+try:
+    from tools.automation_control_tool import automation_control_tool
+except ImportError as e:
+    logger.error(f"자동화 제어 도구 로드 실패: {e}")
+    automation_control_tool = None
+
 # 대시보드 세션 초기화 함수
 def init_dashboard_session():
     """대시보드 세션 상태 초기화 (상태 유지 포함)"""
     pass
 
 # --- 세션 상태 초기화 및 글로벌 상태 동기화 ---
+@st.cache_resource(show_spinner=False)
+def _get_sm():
+    """글로벌 상태 관리자 (프로세스당 하나)"""
+    return get_state_manager()
+
+@st.cache_data(ttl=2, show_spinner=False)
+def _load_state_cached() -> dict:
+    """글로벌 상태 스냅샷 (rerun마다 상태 파일을 읽지 않도록 짧게 캐시, 쓰기 후 clear)"""
+    return _get_sm().load_state()
+
 # 글로벌 상태 관리자 인스턴스
-state_manager = get_state_manager()
+state_manager = _get_sm()
 
 # 글로벌 상태를 먼저 로드하고 세션에 동기화 (최초 1회만)
 if 'initial_sync_done' not in st.session_state:
     state_manager.sync_to_streamlit()
     st.session_state.initial_sync_done = True
 
+# 세션 상태 기본값 (중요한 상태들은 위에서 동기화된 글로벌 상태가 우선)
+_SESSION_DEFAULTS = {
+    'messages': [],
+    'messages_archive': [],
+    'history_restored': 0,
+    'upload_jobs': [],
+    'files_version': 0,
+    'files_page': 0,
+    'prepared_files': OrderedDict(),
+    'prefetch_futures': {},
+    'debug_info': {},
+    'last_vector_items': [],
+    'pdf_preview': None,
+    'show_pdf_modal': False,
+    'page': "main",
+    'autonomous_notifications': [],
+    'pending_approvals': [],
+    'monitoring_future': None,
+    'autonomous_agent': None,
+    'automation_status': False,
+    'autonomous_monitoring': False,
+    'system_initialized': False,
+    'simulation_mode': True,
+}
+
 # 세션 상태 기본값 설정 (없는 것들만)
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
-if 'debug_info' not in st.session_state:
-    st.session_state.debug_info = {}
-if 'config_info' not in st.session_state:
-    st.session_state.config_info = print_config()
-if 'last_vector_items' not in st.session_state:
-    st.session_state.last_vector_items = []
-if 'pdf_preview' not in st.session_state:
-    st.session_state.pdf_preview = None
-if 'show_pdf_modal' not in st.session_state:
-    st.session_state.show_pdf_modal = False
-if 'page' not in st.session_state:
-    st.session_state.page = "main"
-if 'autonomous_notifications' not in st.session_state:
-    st.session_state.autonomous_notifications = []
-if 'pending_approvals' not in st.session_state:
-    st.session_state.pending_approvals = []
-if 'monitoring_thread' not in st.session_state:
-    st.session_state.monitoring_thread = None
-if 'autonomous_agent' not in st.session_state:
-    st.session_state.autonomous_agent = None
-
-# 중요한 상태들은 글로벌 상태 우선, 없으면 기본값
-if 'automation_status' not in st.session_state:
-    st.session_state.automation_status = False
-if 'autonomous_monitoring' not in st.session_state:
-    st.session_state.autonomous_monitoring = False
-if 'system_initialized' not in st.session_state:
-    st.session_state.system_initialized = False
-if 'simulation_mode' not in st.session_state:
-    st.session_state.simulation_mode = True
+for _key, _default in _SESSION_DEFAULTS.items():
+    # 가변 기본값은 세션마다 새 객체로 복사
+    st.session_state.setdefault(_key, _default.copy() if isinstance(_default, (list, dict)) else _default)
+
+@st.cache_data(ttl=None, show_spinner=False)
+def _config_info() -> dict:
+    """환경 설정 정보 (프로세스 내 불변이므로 한 번만 계산)"""
+    return print_config()
+
+def get_config_info() -> dict:
+    """환경 설정 정보 조회 (처음 읽을 때만 계산)"""
+    if 'config_info' not in st.session_state:
+        st.session_state.config_info = _config_info()
+    return st.session_state.config_info
+
+@st.cache_resource(show_spinner=False)
+def _get_monitoring_loop() -> asyncio.AbstractEventLoop:
+    """자율 모니터링용 백그라운드 이벤트 루프 (프로세스당 하나)
+
+    세션마다 스레드를 만들지 않고, 하나의 루프 스레드에서 모니터링 태스크를 실행합니다.
+    uvloop이 설치되어 있으면 사용합니다.
+    """
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="autonomous-monitoring-loop", daemon=True).start()
+    return loop
+
+# 자동화 상태 복구 시 상태 조회 최소 간격 (초, 전체 세션 공유)
+RESTORE_THROTTLE_SECONDS = 5
+
+@st.cache_resource(show_spinner=False)
+def _monitoring_guard() -> dict:
+    """모니터링 시작/상태 복구용 프로세스 공유 락과 상태
+
+    app.py의 모듈 변수는 rerun마다 다시 만들어지므로 cache_resource로 보관합니다.
+    """
+    return {
+        'start_lock': threading.Lock(),
+        'restore_lock': threading.Lock(),
+        'last_restore_ts': 0.0,
+        'last_restore_state': None,  # (automation_status, autonomous_monitoring)
+        'future': None,
+    }
 
 def start_autonomous_monitoring():
     """자동화 모니터링 시작"""
@@ -74,29 +138,27 @@ def start_autonomous_monitoring():
     if not agent:
         return False
 
-    thread = st.session_state.get('monitoring_thread')
-    if thread and thread.is_alive():
-        st.session_state.autonomous_monitoring = True  # 상태 동기화
-        return True  # 이미 실행 중
-
-    def monitoring_loop():
-        """백그라운드 모니터링 실행"""
-        try:
-            agent_local = st.session_state.get('autonomous_agent')
-            if not agent_local:
-                logger.error('autonomous_agent가 세션에 없습니다')
-                return
-            try:
-                agent_local.start_monitoring()
-            except Exception as e:
-                logger.error(f"자동 모니터링 실패: {e}")
-        except Exception as e:
-            logger.error(f"모니터링 루프 초기화 실패: {e}")
+    guard = _monitoring_guard()
+    with guard['start_lock']:
+        # 여러 탭에서 동시에 눌러도 모니터링 태스크는 하나만 생성
+        future = guard['future']
+        if future and not future.done():
+            if agent.is_running:
+                st.session_state.monitoring_future = future
+                st.session_state.autonomous_monitoring = True  # 상태 동기화
+                return True  # 이미 실행 중
+            # 중지 요청 후 종료 대기 중인 태스크는 취소하고 새로 시작
+            future.cancel()
+
+        # 다른 경로(스레드 모니터링 등)로 이미 실행 중이면 start_monitoring_async가 바로 False를 반환하므로 시작하지 않음
+        if agent.is_running:
+            logger.warning("에이전트 모니터링이 이미 다른 경로로 실행 중이어서 새로 시작하지 않았습니다.")
+            return False
 
-    thread = threading.Thread(target=monitoring_loop, daemon=True)
-    thread.start()
+        future = _schedule_monitoring(agent)
+        guard['future'] = future
 
-    st.session_state.monitoring_thread = thread
+    st.session_state.monitoring_future = future
     st.session_state.autonomous_monitoring = True
 
     if hasattr(agent, 'is_monitoring'):
@@ -104,6 +166,11 @@ def start_autonomous_monitoring():
 
     return True
 
+def _schedule_monitoring(agent):
+    """모니터링 코루틴을 백그라운드 루프에 등록하고 future 반환"""
+    # 주기별 오류는 에이전트가 지수 백오프로 재시도 (세션 상태는 백그라운드 스레드에서 쓸 수 없음)
+    return asyncio.run_coroutine_threadsafe(agent.start_monitoring_async(), _get_monitoring_loop())
+
 def stop_autonomous_monitoring():
     """백그라운드 자율 모니터링 중지"""
     if st.session_state.get('autonomous_agent'):
@@ -116,14 +183,40 @@ def stop_autonomous_monitoring():
     
     st.session_state.autonomous_monitoring = False
     
-    # 스레드는 daemon이므로 자동으로 종료됨
-    if st.session_state.get('monitoring_thread'):
-        st.session_state.monitoring_thread = None
+    # 이벤트 루프에서 실행 중인 모니터링 태스크 취소 (다른 세션이 시작한 공유 태스크 포함)
+    future = st.session_state.get('monitoring_future')
+    if future:
+        future.cancel()
+        st.session_state.monitoring_future = None
+    guard = _monitoring_guard()
+    with guard['start_lock']:
+        if guard['future']:
+            guard['future'].cancel()
+            guard['future'] = None
 
 def restore_automation_state():
-    """새로고침 후 자동화 상태 복구"""
+    """새로고침 후 자동화 상태 복구 (여러 세션이 동시에 호출해도 N초에 한 번만 조회)"""
+    guard = _monitoring_guard()
+    with guard['restore_lock']:
+        last_state = guard['last_restore_state']
+        if last_state is not None and time.time() - guard['last_restore_ts'] < RESTORE_THROTTLE_SECONDS:
+            # 직전 조회 결과를 이 세션에도 반영 (반영하지 않으면 세션 내내 비활성으로 표시됨)
+            st.session_state.automation_status, st.session_state.autonomous_monitoring = last_state
+            if last_state[1]:
+                st.session_state.monitoring_future = guard['future']
+            return True
+        result = _restore_automation_state()
+        if result:
+            guard['last_restore_ts'] = time.time()
+            guard['last_restore_state'] = (
+                bool(st.session_state.get('automation_status')),
+                bool(st.session_state.get('autonomous_monitoring')),
+            )
+        return result
+
+def _restore_automation_state():
+    """자동화 상태 조회 후 세션/글로벌 상태에 반영"""
     try:
-        from tools.automation_control_tool import automation_control_tool
         status_result = automation_control_tool(action='status')
         
         if status_result.get('success'):
@@ -135,16 +228,16 @@ def restore_automation_state():
                 
                 # 자율 모니터링도 재시작 시도 (이미 실행 중이면 그대로 유지)
                 autonomous_success = False
-                if st.session_state.get('autonomous_agent'):
-                    if not st.session_state.get('autonomous_monitoring', False):
-                        if start_autonomous_monitoring():
-                            autonomous_success = True
-                            st.session_state.autonomous_monitoring = True
-                            logger.info("새로고침 후 자율 모니터링 재시작 성공")
-                        else:
-                            logger.warning("새로고침 후 자율 모니터링 재시작 실패")
+                agent = st.session_state.get('autonomous_agent')
+                if agent:
+                    if agent.is_heartbeat_fresh():
+                        autonomous_success = True  # 이미 실행 중 (최근 하트비트 확인)
+                        st.session_state.autonomous_monitoring = True
+                    elif start_autonomous_monitoring():
+                        autonomous_success = True
+                        logger.info("새로고침 후 자율 모니터링 재시작 성공")
                     else:
-                        autonomous_success = True  # 이미 실행 중
+                        logger.warning("새로고침 후 자율 모니터링 재시작 실패")
                         
                 # 글로벌 상태에 동기화
                 sync_automation_status(True, autonomous_success)
@@ -162,31 +255,60 @@ def restore_automation_state():
         logger.warning(f"자동화 상태 복구 실패: {e}")
         return False
 
+# --- 프로세스 공유 리소스 (세션마다 새로 만들지 않음) ---
+# 무거운 모듈은 최초 생성 시점에만 임포트 (초기화 전 rerun의 콜드 스타트 비용 절감)
+@st.cache_resource(show_spinner=False)
+def get_llm_client():
+    """AI 클라이언트 (Ollama 또는 LM Studio)"""
+    if USE_OLLAMA:
+        from models.ollama_client import OllamaClient
+        return OllamaClient(base_url=OLLAMA_BASE_URL, model_name=OLLAMA_MODEL_NAME)
+    from models.lm_studio import LMStudioClient
+    return LMStudioClient()
+
+@st.cache_resource(show_spinner=False)
+def get_orchestrator():
+    """오케스트레이터"""
+    from core.orchestrator import Orchestrator
+    return Orchestrator(get_llm_client())
+
+@st.cache_resource(show_spinner=False)
+def get_autonomous_agent():
+    """자율 에이전트"""
+    from services.autonomous_agent import AutonomousAgent
+    return AutonomousAgent(get_llm_client())
+
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    """PostgreSQL 스토리지"""
+    from storage.postgresql_storage import PostgreSQLStorage
+    return PostgreSQLStorage.get_instance()
+
+@st.cache_resource(show_spinner=False)
+def get_ingestion_pipeline():
+    """파일 업로드 처리 파이프라인 (프로세스 공유, 워커 스레드 상주)"""
+    from services.ingestion_pipeline import IngestionPipeline
+    return IngestionPipeline(get_storage())
+
 def initialize_system():
     """AgenticRAG 시스템 초기화"""
     with st.spinner("시스템 초기화 중..."):
         try:
             logger.info("=== 시스템 초기화 시작 ===")
 
-            # AI 클라이언트 초기화 (Ollama 또는 LM Studio)
-            if USE_OLLAMA:
-                logger.info("1/7: Ollama 클라이언트 초기화 중...")
-                lm_studio_client = OllamaClient(base_url=OLLAMA_BASE_URL, model_name=OLLAMA_MODEL_NAME)
-                logger.info(f"1/7: Ollama 클라이언트 초기화 완료 (모델: {OLLAMA_MODEL_NAME})")
-            else:
-                logger.info("1/7: LM Studio 클라이언트 초기화 중...")
-                lm_studio_client = LMStudioClient()
-                logger.info("1/7: LM Studio 클라이언트 초기화 완료")
+            # AI 클라이언트 초기화 (Ollama 또는 LM Studio, 프로세스 공유 인스턴스)
+            logger.info("1/7: AI 클라이언트 초기화 중...")
+            lm_studio_client = get_llm_client()
+            logger.info(f"1/7: AI 클라이언트 초기화 완료 (모델: {lm_studio_client.model})")
 
             # 오케스트레이터 초기화
             logger.info("2/7: 오케스트레이터 초기화 중...")
-            orchestrator = Orchestrator(lm_studio_client)
+            orchestrator = get_orchestrator()
             logger.info("2/7: 오케스트레이터 초기화 완료")
 
             # 자율 에이전트 초기화
             logger.info("3/7: 자율 에이전트 초기화 중...")
-            from services.autonomous_agent import AutonomousAgent
-            autonomous_agent = AutonomousAgent(lm_studio_client)
+            autonomous_agent = get_autonomous_agent()
             logger.info("3/7: 자율 에이전트 초기화 완료")
             
             # 세션 상태에 저장
@@ -201,9 +323,10 @@ def initialize_system():
 
             # 상태를 Streamlit에서 글로벌로 동기화
             state_manager.sync_from_streamlit()
+            _load_state_cached.clear()
 
             # 설정 정보 업데이트
-            st.session_state.config_info = print_config()
+            st.session_state.config_info = _config_info()
 
             # 모델 정보 확인 (get_model_info 호출 시 블로킹되므로 기본값만 설정)
             st.session_state.model_info = {
@@ -248,7 +371,7 @@ def initialize_system():
             # PostgreSQLStorage 초기화
             logger.info("6/7: PostgreSQL 스토리지 초기화 중...")
             try:
-                st.session_state.storage = PostgreSQLStorage.get_instance()
+                st.session_state.storage = get_storage()
                 logger.info("6/7: PostgreSQL 스토리지 초기화 성공")
             except Exception as e:
                 logger.error(f"PostgreSQLStorage 초기화 오류: {e}")
@@ -256,13 +379,18 @@ def initialize_system():
                 st.session_state.system_initialized = False # 스토리지 초기화 실패 시 시스템 초기화 실패로 간주
                 return False
 
-            # 자동화 상태 복구 (새로고침 후)
-            logger.info("7/7: 자동화 상태 복구 중...")
-            try:
-                restore_automation_state()
-                logger.info(f"7/7: 자동화 상태 복구 완료")
-            except Exception as e:
-                logger.warning(f"자동화 상태 복구 중 오류 (무시됨): {e}")
+            # 자동화 상태 복구 (새로고침 후, 세션당 한 번만)
+            if not st.session_state.get('_automation_restored'):
+                logger.info("7/7: 자동화 상태 복구 중...")
+                try:
+                    restore_automation_state()
+                    logger.info(f"7/7: 자동화 상태 복구 완료")
+                except Exception as e:
+                    logger.warning(f"자동화 상태 복구 중 오류 (무시됨): {e}")
+                finally:
+                    st.session_state._automation_restored = True
+            else:
+                logger.info("7/7: 자동화 상태 복구 건너뜀 (이 세션에서 이미 완료)")
 
             logger.info("=== 시스템 초기화 성공 ===")
             return True
@@ -272,16 +400,151 @@ def initialize_system():
             return False
 
 
-def display_pdf_inline(file_bytes: bytes, filename: str):
-    """PDF 바이트를 인라인으로 렌더링"""
+CHAT_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'chat_styles.css')
+
+def _minify_css(css: str) -> str:
+    """주석/공백을 제거한 CSS 반환 (간단한 정규식 기반)"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+@st.cache_data(show_spinner=False)
+def _load_css() -> str:
+    """메인 화면 CSS 파일 로드 후 최소화 (프로세스당 한 번)"""
+    with open(CHAT_CSS_PATH, 'r', encoding='utf-8') as f:
+        return _minify_css(f.read())
+
+AUTO_SCROLL_JS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'auto_scroll.js')
+
+@st.cache_data(show_spinner=False)
+def _load_js() -> str:
+    """채팅 자동 스크롤 스크립트 파일 로드 (프로세스당 한 번)"""
+    with open(AUTO_SCROLL_JS_PATH, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def inject_ui_assets():
+    """메인 화면 CSS와 자동 스크롤 스크립트를 세션당 한 번, 하나의 컴포넌트로 부모 문서 <head>에 주입
+
+    st.markdown으로 매 rerun마다 <style>/<script>를 다시 보내는 대신,
+    최초 1회 컴포넌트 스크립트로 <style>/<script> 태그를 <head>에 추가합니다.
+    <head>에 추가된 태그는 이후 rerun에서 컴포넌트가 사라져도 유지되고,
+    부모 문서에서 만든 <script>는 부모 창에서 실행됩니다.
+    """
+    if st.session_state.get('_ui_assets_injected'):
+        return
+    st.components.v1.html(f"""
+    <script>
+        const doc = window.parent.document;
+        if (!doc.getElementById('synergy-chat-css')) {{
+            const style = doc.createElement('style');
+            style.id = 'synergy-chat-css';
+            style.textContent = {json.dumps(_load_css())};
+            doc.head.appendChild(style);
+        }}
+        if (!doc.getElementById('synergy-chat-js')) {{
+            const script = doc.createElement('script');
+            script.id = 'synergy-chat-js';
+            script.textContent = {json.dumps(_load_js())};
+            doc.head.appendChild(script);
+        }}
+    </script>
+    """, height=0)
+    st.session_state._ui_assets_injected = True
+
+def scroll_to_latest_message(message_id: str):
+    """스트리밍 완료 후 채팅 영역을 마지막 메시지까지 한 번 스크롤
+
+    message_id를 스크립트에 넣어 응답마다 컴포넌트 내용이 달라지도록 해 매번 실행되게 합니다.
+    """
+    st.components.v1.html(f"""
+    <script>
+        // {message_id}
+        const win = window.parent;
+        if (win.__synergyScrollToBottom) {{
+            win.__synergyScrollToBottom();
+        }} else {{
+            const messages = win.document.querySelectorAll('[data-testid="stChatMessage"]');
+            if (messages.length) {{
+                messages[messages.length - 1].scrollIntoView({{block: 'end'}});
+            }}
+        }}
+    </script>
+    """, height=0)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _encode_pdf_b64(file_bytes: bytes) -> str:
+    """PDF 바이트를 base64 문자열로 인코딩 (rerun 간 캐시)"""
+    return base64.b64encode(file_bytes).decode('ascii')
+
+STATIC_PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'pdfs')
+# static/pdfs 는 인증 없이 공개 서빙되므로 최근 미리보기 파일만 짧게 유지
+STATIC_PDF_MAX_FILES = 32
+STATIC_PDF_MAX_AGE_SECONDS = 3600
+
+def _evict_static_pdfs():
+    """오래된 미리보기 PDF 삭제 (STATIC_PDF_MAX_AGE_SECONDS 초과 또는 최근 STATIC_PDF_MAX_FILES개 밖)"""
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(STATIC_PDF_DIR) if entry.name.endswith('.pdf')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        now = time.time()
+        for idx, entry in enumerate(entries):
+            if idx >= STATIC_PDF_MAX_FILES or now - entry.stat().st_mtime > STATIC_PDF_MAX_AGE_SECONDS:
+                os.remove(entry.path)
+    except OSError as e:
+        logger.warning(f"미리보기 PDF 정리 중 오류: {e}")
+
+def _write_static_pdf(digest: str, file_bytes: bytes | bytearray | memoryview) -> str:
+    """PDF 바이트를 static/pdfs/{sha256}.pdf 로 기록하고 URL 경로 반환
+
+    이미 있으면 수정 시각만 갱신해 보고 있는 파일이 정리 대상이 되지 않도록 하고,
+    새로 기록할 때만 오래된 파일을 정리합니다.
+    """
+    os.makedirs(STATIC_PDF_DIR, exist_ok=True)
+    path = os.path.join(STATIC_PDF_DIR, f"{digest}.pdf")
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(file_bytes)
+        os.replace(tmp_path, path)
+        _evict_static_pdfs()
+    return f"app/static/pdfs/{digest}.pdf"
+
+@st.cache_resource(max_entries=32, ttl=600, show_spinner=False)
+def _static_pdf_digest(file_id: str, _file_bytes: bytes) -> str:
+    """파일 ID별 PDF sha256 (미리보기가 열려 있는 동안 rerun마다 전체를 해시하지 않도록 캐시)"""
+    return hashlib.sha256(_file_bytes).hexdigest()
+
+def display_pdf_inline(file_bytes: bytes, filename: str, file_id: str):
+    """PDF 바이트를 인라인으로 렌더링 (정적 파일 서빙 우선, 비활성 시 base64)"""
     try:
-        b64_pdf = base64.b64encode(file_bytes).decode('utf-8')
-        pdf_iframe = f'<iframe src="data:application/pdf;base64,{b64_pdf}" width="100%" height="700" type="application/pdf"></iframe>'
+        if st.get_option('server.enableStaticServing'):
+            pdf_src = _write_static_pdf(_static_pdf_digest(file_id, file_bytes), file_bytes)
+        else:
+            pdf_src = f"data:application/pdf;base64,{_encode_pdf_b64(file_bytes)}"
+        pdf_iframe = f'<iframe src="{pdf_src}" width="100%" height="700" type="application/pdf"></iframe>'
         st.markdown(pdf_iframe, unsafe_allow_html=True)
     except Exception as e:
         logger.error(f"PDF 인라인 표시 오류: {filename} - {e}")
         st.error(f"PDF를 표시하는 중 오류가 발생했습니다: {e}")
 
+@st.cache_resource(max_entries=16, ttl=600, show_spinner=False)
+def _fetch_pdf_bytes(file_id: str) -> bytes:
+    """PostgreSQL에서 PDF 바이트 조회 (file_id 기준 캐시)
+
+    bytes는 불변이므로 cache_resource로 같은 객체를 공유합니다 (cache_data는 조회마다 역직렬화 복사본 반환).
+    조회 실패/빈 내용은 예외로 알려 캐시에 남기지 않습니다 (일시적 오류가 TTL 동안 고정되지 않도록).
+    """
+    content = st.session_state.storage.get_file_content_by_id(file_id)
+    if not content:
+        raise FileNotFoundError(f"PDF 내용을 찾을 수 없습니다: {file_id}")
+    return content
+
 def open_pdf_modal(file_id: str, filename: str):
     st.session_state.pdf_preview = {"file_id": file_id, "filename": filename}
     st.session_state.show_pdf_modal = True
@@ -290,22 +553,38 @@ def close_pdf_modal():
     st.session_state.pdf_preview = None
     st.session_state.show_pdf_modal = False
 
-def render_pdf_download_button(content: str, key_prefix: str = "pdf"):
+@st.cache_resource(show_spinner=False)
+def _get_pdf_converter():
+    """MarkdownToPDFConverter 싱글톤 (폰트/스타일 초기화는 프로세스당 한 번)"""
+    from utils.pdf_generator import MarkdownToPDFConverter
+    return MarkdownToPDFConverter()
+
+@st.cache_data(show_spinner=False)
+def _pdf_available() -> bool:
+    """PDF 생성 라이브러리 사용 가능 여부 (프로세스당 한 번 확인)"""
+    from utils.pdf_generator import is_pdf_available
+    return is_pdf_available()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _markdown_pdf_bytes(content_sha1: str, _content: str) -> bytes:
+    """마크다운 → PDF 변환 결과 캐시 (같은 메시지를 다시 그릴 때 재변환하지 않음)"""
+    return _get_pdf_converter().convert_markdown_to_pdf(_content)
+
+def render_pdf_download_button(content: str, key_prefix: str = "pdf", stable_id: str | None = None):
     """PDF 다운로드 버튼 렌더링 (재사용 가능)"""
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 위젯 키는 메시지 기준으로 고정, 파일명 타임스탬프는 rerun당 한 번만 생성
+    sid = stable_id or hashlib.md5(content.encode('utf-8')).hexdigest()[:10]
+    timestamp_str = st.session_state.get('_run_ts') or datetime.now().strftime("%Y%m%d_%H%M%S")
     try:
-        from utils.pdf_generator import MarkdownToPDFConverter, is_pdf_available
-
-        if is_pdf_available():
-            pdf_converter = MarkdownToPDFConverter()
+        if _pdf_available():
             filename = f"agentic_rag_report_{timestamp_str}.pdf"
-            pdf_bytes = pdf_converter.convert_markdown_to_pdf(content, filename)
+            pdf_bytes = _markdown_pdf_bytes(hashlib.sha1(content.encode('utf-8')).hexdigest(), content)
             st.download_button(
                 label="📄 PDF 다운로드",
                 data=pdf_bytes,
                 file_name=filename,
                 mime="application/pdf",
-                key=f"{key_prefix}_{timestamp_str}"
+                key=f"{key_prefix}_{sid}"
             )
         else:
             filename = f"agentic_rag_report_{timestamp_str}.txt"
@@ -315,62 +594,93 @@ def render_pdf_download_button(content: str, key_prefix: str = "pdf"):
                 data=text_bytes,
                 file_name=filename,
                 mime="text/plain",
-                key=f"{key_prefix}_txt_{timestamp_str}"
+                key=f"{key_prefix}_txt_{sid}"
             )
     except Exception as e:
         logger.error(f"다운로드 버튼 생성 오류: {str(e)}")
 
-def render_tool_results(tool_results: dict):
+@st.cache_data(max_entries=64, show_spinner=False)
+def _decode_b64_image(b64: str) -> bytes:
+    """base64 이미지 문자열을 원본 바이트로 디코딩 (rerun 간 캐시)
+
+    st.image가 바이트의 매직 넘버로 형식을 판단하므로 PIL 디코딩/재인코딩이 필요 없습니다.
+    """
+    return base64.b64decode(b64)
+
+def _render_result_image(result: dict, decode=_decode_b64_image, caption: str = None):
+    """도구 결과 이미지 표시 (파일이 있으면 경로로 바로 표시, 없을 때만 base64 디코딩)"""
+    filepath = result.get('graph_filepath')
+    if filepath and os.path.exists(filepath):
+        try:
+            st.image(filepath, caption=caption or result.get('graph_filename', '그래프'), use_container_width=True)
+            return
+        except Exception as e:
+            logger.error(f"그래프 파일 표시 오류: {e}")
+    b64 = result.get('image_base64')
+    if b64:
+        try:
+            st.image(decode(b64), caption=caption or result.get('graph_filename', '이미지'), use_container_width=True)
+        except Exception as e:
+            logger.error(f"이미지 표시 오류: {e}")
+
+def _strip_inline_images(tool_results: dict) -> dict:
+    """그래프 파일이 디스크에 있으면 중복되는 image_base64를 뺀 사본 반환 (세션 상태 보관용)"""
+    if not tool_results:
+        return tool_results
+    stripped = {}
+    for tool_name, result in tool_results.items():
+        if (isinstance(result, dict) and result.get('image_base64')
+                and result.get('graph_filepath') and os.path.exists(result['graph_filepath'])):
+            result = {k: v for k, v in result.items() if k != 'image_base64'}
+        stripped[tool_name] = result
+    return stripped
+
+JSON_PREVIEW_LIMIT = 100
+
+def _truncate_json(value, limit: int = JSON_PREVIEW_LIMIT):
+    """긴 리스트를 앞부분 limit개만 남겨 미리보기용으로 축약"""
+    if isinstance(value, dict):
+        return {k: _truncate_json(v, limit) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [_truncate_json(v, limit) for v in value[:limit]]
+        if len(value) > limit:
+            head.append(f"... 외 {len(value) - limit}개 항목")
+        return head
+    return value
+
+@st.fragment
+def _render_tool_result(tool_name: str, result, key_prefix: str = "tool"):
+    """단일 도구 실행 결과 표시 (상호작용 시 이 조각만 재실행)"""
+    st.subheader(f"🛠️ {tool_name}")
+    if isinstance(result, dict):
+        if 'success' in result:
+            status = "✅ 성공" if result.get('success') else "❌ 실패"
+            st.markdown(f"**상태:** {status}")
+        if 'message' in result:
+            st.markdown(f"**결과:** {result['message']}")
+        if 'temperature_c' in result:
+            st.markdown(f"**🌡️ 기온:** {result['temperature_c']}°C")
+        if 'humidity' in result:
+            st.markdown(f"**💧 습도:** {result['humidity']}%")
+
+        # 이미지 표시 (graph_filepath 우선, 파일이 없을 때만 image_base64)
+        _render_result_image(result)
+
+        # 체크했을 때만 JSON을 직렬화해 전송 (긴 리스트는 축약 후 토글로 전체 표시)
+        if st.checkbox("전체 데이터 보기", key=f"{key_prefix}_{tool_name}_json_show"):
+            show_all = st.toggle("모든 항목 표시", key=f"{key_prefix}_{tool_name}_json_all")
+            st.json(result if show_all else _truncate_json(result), expanded=False)
+    else:
+        st.write(str(result))
+
+def render_tool_results(tool_results: dict, key_prefix: str = "tool"):
     """도구 실행 결과 표시 (재사용 가능)"""
     if not tool_results:
         return
 
     with st.expander("🔍 도구 실행 결과", expanded=False):
         for tool_name, result in tool_results.items():
-            st.subheader(f"🛠️ {tool_name}")
-            if isinstance(result, dict):
-                if 'success' in result:
-                    status = "✅ 성공" if result.get('success') else "❌ 실패"
-                    st.markdown(f"**상태:** {status}")
-                if 'message' in result:
-                    st.markdown(f"**결과:** {result['message']}")
-                if 'temperature_c' in result:
-                    st.markdown(f"**🌡️ 기온:** {result['temperature_c']}°C")
-                if 'humidity' in result:
-                    st.markdown(f"**💧 습도:** {result['humidity']}%")
-
-                # 이미지 표시 (graph_filepath 또는 image_base64)
-                if 'graph_filepath' in result and result.get('graph_filepath'):
-                    try:
-                        st.image(result['graph_filepath'], caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                    except Exception as e:
-                        logger.error(f"그래프 파일 표시 오류: {e}")
-                        # graph_filepath 실패 시 image_base64 시도
-                        if 'image_base64' in result and result.get('image_base64'):
-                            try:
-                                import base64
-                                import io
-                                from PIL import Image
-                                image_data = base64.b64decode(result['image_base64'])
-                                image = Image.open(io.BytesIO(image_data))
-                                st.image(image, caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                            except Exception as e2:
-                                logger.error(f"Base64 이미지 표시 오류: {e2}")
-                elif 'image_base64' in result and result.get('image_base64'):
-                    try:
-                        import base64
-                        import io
-                        from PIL import Image
-                        image_data = base64.b64decode(result['image_base64'])
-                        image = Image.open(io.BytesIO(image_data))
-                        st.image(image, caption=result.get('graph_filename', '이미지'), use_container_width=True)
-                    except Exception as e:
-                        logger.error(f"이미지 표시 오류: {e}")
-
-                with st.expander("전체 데이터", expanded=False):
-                    st.json(result)
-            else:
-                st.write(str(result))
+            _render_tool_result(tool_name, result, key_prefix)
 
 def render_pdf_modal():
     if not st.session_state.get('show_pdf_modal'):
@@ -382,10 +692,14 @@ def render_pdf_modal():
     if not storage or not file_id:
         st.session_state.show_pdf_modal = False
         return
-    file_bytes = storage.get_file_content_by_id(file_id)
+    try:
+        file_bytes = _fetch_pdf_bytes(file_id)
+    except FileNotFoundError as e:
+        logger.warning(str(e))
+        file_bytes = None
     with st.expander(f"📄 {filename} (미리보기)", expanded=True):
         if file_bytes:
-            display_pdf_inline(bytes(file_bytes), filename)
+            display_pdf_inline(file_bytes, filename, file_id)
         else:
             st.warning("PDF 데이터를 불러오지 못했습니다.")
         if st.button("닫기", key="close_pdf_expander_btn"):
@@ -393,13 +707,7 @@ def render_pdf_modal():
             st.rerun()
 
 def render_autonomous_agent_page():
-    """자율 에이전트 페이지 렌더링"""
-    st.set_page_config(
-        page_title="🔔 자율 에이전트 - Synergy ChatBot",
-        page_icon="🤖",
-        layout="wide"
-    )
-    
+    """자율 에이전트 페이지 렌더링 (페이지 설정은 main()에서 처리)"""
     # 메인으로 돌아가기 버튼
     if st.button("🏠 메인 대시보드로 돌아가기"):
         st.session_state.page = "main"
@@ -427,6 +735,61 @@ def render_autonomous_agent_page():
         # 기본 제어 패널
         render_basic_autonomous_controls(autonomous_agent)
 
+@st.fragment
+def _render_notification(autonomous_agent, notification):
+    """단일 알림 표시 (버튼 클릭은 이 조각만 재실행, 처리 성공 시 목록 갱신을 위해 앱 전체 재실행)"""
+    with st.container():
+        level_icon = {"info": "ℹ️", "warning": "⚠️", "critical": "🚨", "emergency": "🆘"}
+        icon = level_icon.get(notification.level.value, "📢")
+
+        st.markdown(f"**{icon} {notification.title}**")
+        st.caption(f"{notification.timestamp.strftime('%H:%M:%S')} - {notification.level.value.upper()}")
+        st.text(notification.message)
+
+        # 액션이 필요한 경우 승인 버튼
+        if notification.action_required and notification.action_id:
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("✅ 승인", key=f"approve_{notification.action_id}"):
+                    if autonomous_agent.approve_action(notification.action_id):
+                        st.toast("조치가 승인되어 실행되었습니다!", icon="✅")
+                        st.rerun(scope="app")
+                    else:
+                        st.error("조치를 승인하지 못했습니다. 이미 처리되었거나 만료된 요청입니다.")
+            with col2:
+                if st.button("❌ 거부", key=f"reject_{notification.action_id}"):
+                    if autonomous_agent.reject_action(notification.action_id):
+                        st.toast("조치가 거부되었습니다.", icon="❌")
+                        st.rerun(scope="app")
+                    else:
+                        st.error("조치를 거부하지 못했습니다. 이미 처리되었거나 만료된 요청입니다.")
+
+        st.divider()
+
+@st.fragment
+def _render_approval(autonomous_agent, approval):
+    """단일 승인 대기 항목 표시 (버튼 클릭은 이 조각만 재실행, 처리 성공 시 목록 갱신을 위해 앱 전체 재실행)"""
+    with st.expander(f"🔄 {approval['description']}", expanded=True):
+        st.write(f"**상황:** {approval['situation']}")
+        st.write(f"**예상 효과:** {approval['estimated_impact']}")
+        st.write(f"**요청 시간:** {approval['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ 승인", key=f"pending_approve_{approval['action_id']}"):
+                if autonomous_agent.approve_action(approval['action_id']):
+                    st.toast("승인 완료!", icon="✅")
+                    st.rerun(scope="app")
+                else:
+                    st.error("승인하지 못했습니다. 이미 처리되었거나 만료된 요청입니다.")
+        with col2:
+            if st.button("❌ 거부", key=f"pending_reject_{approval['action_id']}"):
+                if autonomous_agent.reject_action(approval['action_id']):
+                    st.toast("거부 완료", icon="❌")
+                    st.rerun(scope="app")
+                else:
+                    st.error("거부하지 못했습니다. 이미 처리되었거나 만료된 요청입니다.")
+
 def render_basic_autonomous_controls(autonomous_agent):
     """기본 자율 에이전트 제어 패널"""
     col1, col2 = st.columns(2)
@@ -444,18 +807,19 @@ def render_basic_autonomous_controls(autonomous_agent):
         if not status["is_monitoring"]:
             if st.button("▶️ 자율 모니터링 시작"):
                 try:
-                    import asyncio
-                    asyncio.create_task(autonomous_agent.start_monitoring())
-                    st.success("자율 모니터링을 시작했습니다!")
-                    st.session_state.autonomous_monitoring = True
-                    st.rerun()
+                    # 스크립트 스레드에는 실행 중인 루프가 없으므로 백그라운드 모니터링 루프에 등록
+                    if start_autonomous_monitoring():
+                        st.success("자율 모니터링을 시작했습니다!")
+                        st.rerun()
+                    else:
+                        st.error("모니터링 시작 실패: 자율 에이전트가 초기화되지 않았습니다.")
                 except Exception as e:
                     st.error(f"모니터링 시작 실패: {e}")
         else:
             if st.button("⏸️ 자율 모니터링 중지"):
-                autonomous_agent.stop_monitoring()
+                # 공유 모니터링 태스크 취소까지 처리하는 경로로 중지
+                stop_autonomous_monitoring()
                 st.info("자율 모니터링을 중지했습니다.")
-                st.session_state.autonomous_monitoring = False
                 st.rerun()
     
     with col2:
@@ -466,29 +830,7 @@ def render_basic_autonomous_controls(autonomous_agent):
         
         if notifications:
             for notification in notifications:
-                with st.container():
-                    level_icon = {"info": "ℹ️", "warning": "⚠️", "critical": "🚨", "emergency": "🆘"}
-                    icon = level_icon.get(notification.level.value, "📢")
-                    
-                    st.markdown(f"**{icon} {notification.title}**")
-                    st.caption(f"{notification.timestamp.strftime('%H:%M:%S')} - {notification.level.value.upper()}")
-                    st.text(notification.message)
-                    
-                    # 액션이 필요한 경우 승인 버튼
-                    if notification.action_required and notification.action_id:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if st.button("✅ 승인", key=f"approve_{notification.action_id}"):
-                                if autonomous_agent.approve_action(notification.action_id):
-                                    st.success("조치가 승인되어 실행되었습니다!")
-                                    st.rerun()
-                        with col2:
-                            if st.button("❌ 거부", key=f"reject_{notification.action_id}"):
-                                if autonomous_agent.reject_action(notification.action_id):
-                                    st.info("조치가 거부되었습니다.")
-                                    st.rerun()
-                    
-                    st.divider()
+                _render_notification(autonomous_agent, notification)
         else:
             st.info("현재 알림이 없습니다.")
         
@@ -498,33 +840,507 @@ def render_basic_autonomous_controls(autonomous_agent):
         
         if pending:
             for approval in pending:
-                with st.expander(f"🔄 {approval['description']}", expanded=True):
-                    st.write(f"**상황:** {approval['situation']}")
-                    st.write(f"**예상 효과:** {approval['estimated_impact']}")
-                    st.write(f"**요청 시간:** {approval['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("✅ 승인", key=f"pending_approve_{approval['action_id']}"):
-                            if autonomous_agent.approve_action(approval['action_id']):
-                                st.success("승인 완료!")
-                                st.rerun()
-                    with col2:
-                        if st.button("❌ 거부", key=f"pending_reject_{approval['action_id']}"):
-                            if autonomous_agent.reject_action(approval['action_id']):
-                                st.info("거부 완료")
-                                st.rerun()
+                _render_approval(autonomous_agent, approval)
         else:
             st.info("승인 대기 중인 조치가 없습니다.")
 
+def render_user_message(message):
+    """사용자 메시지 렌더링 - st.chat_message 사용 (대화창 스타일)"""
+    with st.chat_message("user", avatar="👤"):
+        st.markdown(message["content"])
+
+        if message.get("timestamp"):
+            st.caption(f"🕐 {message['timestamp']}")
+
+def _message_id(message: dict) -> str:
+    """메시지 고유 ID (생성 시 부여, 이전 세션에서 넘어온 메시지는 처음 볼 때 부여)"""
+    if "id" not in message:
+        message["id"] = uuid.uuid4().hex
+    return message["id"]
+
+def _message_image_bytes(message: dict, tool_name: str, b64: str) -> bytes:
+    """메시지 이미지 바이트 조회 (라벨이 지난 rerun과 같으면 디코딩 결과 재사용)
+
+    라벨은 (본문 해시, base64 해시)로, 문자열 해시는 객체에 캐시되므로
+    기록된 메시지에서는 비교 비용이 거의 없습니다. PIL을 거치지 않고 원본 바이트를 그대로 씁니다.
+    """
+    key = (_message_id(message), tool_name)
+    label = (hash(message.get("content", "")), hash(b64))
+    labels = st.session_state.setdefault('_msg_labels', {})
+    images = st.session_state.setdefault('_msg_images', {})
+    if labels.get(key) == label and key in images:
+        return images[key]
+
+    image_data = base64.b64decode(b64)
+    labels[key] = label
+    images[key] = image_data
+    return image_data
+
+def render_assistant_message(message):
+    """어시스턴트 메시지 렌더링 - st.chat_message 사용 (스트리밍과 동일)"""
+    with st.chat_message("assistant", avatar="🤖"):
+        # 메시지 내용 표시 (마크다운 형식, 일관된 렌더링)
+        content = message["content"]
+
+        # 메시지 내용을 그대로 표시 - write_stream()과 동일한 방식으로 렌더링
+        # st.write()는 마크다운을 자동으로 렌더링하며 write_stream()과 호환됩니다
+        st.write(content)
+
+        # 이미지가 있으면 메인 영역에 바로 표시
+        tool_results = message.get("tool_results", {})
+        if tool_results:
+            for tool_name, result in tool_results.items():
+                if isinstance(result, dict):
+                    # graph_filepath 우선, 파일이 없을 때만 image_base64 디코딩
+                    _render_result_image(result, decode=lambda b64: _message_image_bytes(message, tool_name, b64))
+
+        # 타임스탬프와 처리시간
+        timestamp_parts = []
+        if message.get("timestamp"):
+            timestamp_parts.append(f"🕐 {message['timestamp']}")
+        if message.get("processing_time"):
+            timestamp_parts.append(f"⚡ {message['processing_time']}")
+
+        if timestamp_parts:
+            st.caption(" | ".join(timestamp_parts))
+
+        # PDF 다운로드 버튼 (헬퍼 함수 사용)
+        render_pdf_download_button(message["content"], key_prefix="pdf_btn", stable_id=_message_id(message))
+
+        # 도구 실행 결과 (헬퍼 함수 사용)
+        if "tool_results" in message:
+            render_tool_results(message.get("tool_results", {}), key_prefix=f"tool_{_message_id(message)}")
+
+@st.fragment
+def _render_message(message: dict):
+    """기록된 메시지 하나 렌더링 (메시지 안의 위젯 상호작용 시 이 조각만 재실행)
+
+    기록 목록은 보관/되돌리기로 위치가 바뀌므로 인덱스가 아니라 메시지 자체를 받습니다.
+    """
+    if message["role"] == "user":
+        render_user_message(message)
+    else:
+        render_assistant_message(message)
+
+# 화면에 그리는 대화 기록 최대 개수 (넘치는 앞부분은 보관 목록으로 이동)
+MAX_HISTORY_MESSAGES = 40
+# "이전 대화 더 보기" 한 번에 되돌려 놓는 개수
+HISTORY_PAGE_SIZE = 20
+
+def _trim_history():
+    """대화 기록이 최대 개수를 넘으면 오래된 메시지를 messages_archive로 옮김 (rerun마다 그리는 양 제한)
+
+    "이전 대화 더 보기"로 되돌려 놓은 개수(history_restored)만큼은 한도를 늘려 바로 다시 보관하지 않습니다.
+    """
+    messages = st.session_state.messages
+    overflow = len(messages) - MAX_HISTORY_MESSAGES - st.session_state.history_restored
+    if overflow > 0:
+        archived = messages[:overflow]
+        st.session_state.messages_archive.extend(archived)
+        del messages[:overflow]
+        # 보관된 메시지의 디코딩 이미지 캐시는 세션 상태에서 제거 (다시 표시되면 재디코딩)
+        archived_ids = {m.get("id") for m in archived}
+        for cache_name in ('_msg_images', '_msg_labels'):
+            cache = st.session_state.get(cache_name)
+            if cache:
+                for key in [k for k in cache if k[0] in archived_ids]:
+                    del cache[key]
+
+@st.fragment
+def _render_history():
+    """대화 기록 전체 렌더링 (기록 영역 안의 상호작용은 채팅 입력/사이드 위젯과 분리해 재실행)"""
+    archive = st.session_state.messages_archive
+    if archive and st.button("이전 대화 더 보기", key="load_archived_messages", use_container_width=True):
+        # 보관된 메시지 중 가장 최근 것부터 한 묶음씩 기록 앞쪽에 되돌려 놓음
+        restored = archive[-HISTORY_PAGE_SIZE:]
+        del archive[-HISTORY_PAGE_SIZE:]
+        st.session_state.messages[:0] = restored
+        st.session_state.history_restored += len(restored)
+
+    for message in st.session_state.messages:
+        _render_message(message)
+
+# 파일 목록 한 페이지 크기
+FILE_LIST_PAGE_SIZE = 20
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_files(version: int, page: int, _storage) -> list:
+    """파일 목록 한 페이지 조회 (업로드 완료 시 files_version을 올려 캐시 무효화)"""
+    return _storage.list_files(limit=FILE_LIST_PAGE_SIZE, offset=page * FILE_LIST_PAGE_SIZE)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _count_files(version: int, _storage) -> int:
+    """전체 파일 수 조회 (files_version 기준 캐시)"""
+    return _storage.count_files()
+
+# 다운로드 준비 상태로 세션에 보관할 최대 파일 수 (오래된 것부터 제거)
+MAX_PREPARED_FILES = 3
+
+def _store_prepared_file(file_id: str, file_content: bytes):
+    """다운로드할 파일 내용을 세션에 보관 (최근 MAX_PREPARED_FILES개만 유지)"""
+    prepared = st.session_state.prepared_files
+    prepared[file_id] = file_content
+    prepared.move_to_end(file_id)
+    while len(prepared) > MAX_PREPARED_FILES:
+        prepared.popitem(last=False)
+
+# 파일 목록 상단에서 내용을 미리 가져올 파일 수
+PREFETCH_TOP_K = 3
+# 미리 가져올 파일 최대 크기 (이보다 큰 파일은 준비 버튼을 눌렀을 때만 조회)
+PREFETCH_MAX_BYTES = 5 * 1024 * 1024
+# 사용되지 않은 미리 가져오기 결과를 세션에 보관하는 시간 (초)
+PREFETCH_RESULT_TTL_SECONDS = 60
+
+@st.cache_resource(show_spinner=False)
+def _get_prefetch_pool() -> ThreadPoolExecutor:
+    """파일 내용 미리 가져오기용 스레드 풀 (프로세스당 하나)"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="file-prefetch")
+
+def _prefetch_files(storage, file_list: list):
+    """보이는 파일 중 상위 PREFETCH_TOP_K개(PREFETCH_MAX_BYTES 이하)의 내용을 백그라운드에서 미리 조회
+
+    목록에서 사라진 파일의 작업은 취소하고, 끝난 뒤 PREFETCH_RESULT_TTL_SECONDS 동안
+    사용되지 않은 결과는 버립니다. 버린 파일은 목록이 바뀌기 전까지 다시 가져오지 않습니다.
+    """
+    futures = st.session_state.prefetch_futures
+    targets = [
+        f.get('_id') for f in file_list[:PREFETCH_TOP_K]
+        if (f.get('length') or 0) <= PREFETCH_MAX_BYTES and f.get('_id') not in st.session_state.prepared_files
+    ]
+    now = time.time()
+    for fid, (future, submitted_at) in list(futures.items()):
+        if fid not in targets:
+            futures.pop(fid)
+            future.cancel()
+        elif future.done() and now - submitted_at > PREFETCH_RESULT_TTL_SECONDS:
+            futures.pop(fid)
+
+    # 같은 목록에서는 한 번만 제출 (만료로 버린 결과를 rerun마다 다시 가져오지 않도록)
+    if st.session_state.get('prefetch_targets') == targets:
+        return
+    st.session_state.prefetch_targets = targets
+
+    pool = _get_prefetch_pool()
+    for fid in targets:
+        if fid not in futures:
+            futures[fid] = (pool.submit(storage.get_file_content_by_id, fid), now)
+
+def _fetch_file_content(storage, file_id: str):
+    """파일 내용 조회 (미리 가져오기 중이면 그 결과를 기다려 사용, 없으면 직접 조회)"""
+    entry = st.session_state.prefetch_futures.pop(file_id, None)
+    if entry is not None:
+        try:
+            content = entry[0].result()
+            if content is not None:
+                return content
+        except Exception as e:
+            logger.debug(f"미리 가져오기 결과 사용 불가, 직접 조회: {file_id} ({e})")
+    return storage.get_file_content_by_id(file_id)
+
+# 파일 크기 단위 (1024배씩)
+FILE_SIZE_UNITS = ("bytes", "KB", "MB", "GB")
+
+def human_size(file_size: int) -> str:
+    """바이트 크기를 읽기 쉬운 문자열로 변환 (bit_length로 단위를 바로 골라 분기 없이 계산)"""
+    file_size = int(file_size or 0)
+    unit = min(max(file_size.bit_length() - 1, 0) // 10, len(FILE_SIZE_UNITS) - 1)
+    if unit == 0:
+        return f"{file_size} bytes"
+    return f"{file_size / (1 << (10 * unit)):.2f} {FILE_SIZE_UNITS[unit]}"
+
+@st.fragment(run_every=1)
+def _render_upload_progress():
+    """백그라운드 업로드 작업 진행 상태 표시 (끝난 작업은 결과 메시지로 바꾸고 전체 화면 갱신)"""
+    pipeline = get_ingestion_pipeline()
+    finished = False
+    for job_id in list(st.session_state.upload_jobs):
+        status = pipeline.status(job_id)
+        if status is None:
+            st.session_state.upload_jobs.remove(job_id)
+            continue
+
+        if not status["finished"]:
+            # 단계 표시는 실제 작업 상태 기준 (임베딩은 배치가 끝날 때마다 청크 수 갱신)
+            label = f"{status['label']} ({status['filename']})"
+            embedding = status["stage"] == "embed" and status["chunk_count"]
+            if embedding:
+                label += f" - 임베딩 {status['embedded']}/{status['chunk_count']}"
+            with st.status(label, expanded=True, state="running"):
+                if embedding:
+                    st.progress(status["embedded"] / status["chunk_count"])
+                elif status["chunk_count"]:
+                    st.caption(f"청크 {status['chunk_count']}개")
+            continue
+
+        if status["error"]:
+            st.session_state.upload_error_msg = f"'{status['filename']}' 업로드 실패: {status['error']}"
+        elif status["duplicate_of"]:
+            st.session_state.upload_error_msg = (
+                f"'{status['filename']}'은 이미 저장된 '{status['duplicate_of']}'과 내용이 같습니다. "
+                f"(ID: {status['file_id']})"
+            )
+        else:
+            chunk_info = f" | 청크: {status['chunk_count']}개" if status["chunk_count"] else ""
+            # 성공 메시지를 세션에 저장 (다음 렌더링에서 표시)
+            st.session_state.upload_success_msg = (
+                f"✅ **'{status['filename']}'** 업로드 완료!\n\n"
+                f"📊 크기: {human_size(status['size'])} | ID: {status['file_id']}{chunk_info}"
+            )
+            # 파일 목록 즉시 갱신을 위해 캐시 버전 증가
+            st.session_state.files_version += 1
+        pipeline.forget(job_id)
+        st.session_state.upload_jobs.remove(job_id)
+        finished = True
+
+    if finished:
+        st.rerun(scope="app")
+
+@st.fragment
+def _render_upload_panel():
+    """파일 업로드 패널 (제출 시 패널만 다시 실행)"""
+    st.subheader("📤 파일 업로드")
+
+    # 업로드 완료/실패 메시지 표시
+    if 'upload_success_msg' in st.session_state:
+        st.success(st.session_state.upload_success_msg)
+        del st.session_state.upload_success_msg
+    if 'upload_error_msg' in st.session_state:
+        st.error(st.session_state.upload_error_msg)
+        del st.session_state.upload_error_msg
+
+    # 업로드 위젯 초기화를 위한 동적 키
+    upload_key = st.session_state.get('upload_widget_key', 0)
+
+    uploaded_file = st.file_uploader(
+        "파일 선택",
+        label_visibility="collapsed",
+        key=f"file_uploader_{upload_key}"
+    )
+    if uploaded_file:
+        if st.button("📤 업로드", use_container_width=True, type="primary"):
+            storage = st.session_state.get('storage')
+            if storage:
+                try:
+                    # 파일 이름 중복은 여기서 바로 확인 (files.filename이 UNIQUE라 저장 단계에서 실패하므로)
+                    # 내용이 같은 파일(이름만 다른 경우)은 파이프라인 Load 단계의 해시 확인이 처리
+                    existing_file = storage.check_file_exists(uploaded_file.name)
+                    if existing_file:
+                        st.warning(f"파일 '{uploaded_file.name}'이 이미 존재합니다. (ID: {existing_file['id']})")
+                        st.info("다른 이름으로 파일을 저장하거나 기존 파일을 사용하세요.")
+                        return
+
+                    # 로드 → 청크 → 임베딩 → 저장은 백그라운드 파이프라인에서 처리하고 바로 반환
+                    # getvalue()로 전체를 복사하지 않고 1MiB씩 읽어 임시 파일로 넘김
+                    uploaded_file.seek(0)
+                    job_id = get_ingestion_pipeline().submit_stream(
+                        uploaded_file,
+                        uploaded_file.name,
+                        metadata={"source": "streamlit_upload"}
+                    )
+                    st.session_state.upload_jobs.append(job_id)
+
+                    # 업로드 위젯 초기화를 위한 키 증가
+                    current_key = st.session_state.get('upload_widget_key', 0)
+                    st.session_state.upload_widget_key = current_key + 1
+                    # 업로드 패널만 다시 그림 (목록/알림 등 나머지 화면은 작업 완료 시 갱신)
+                    st.rerun(scope="fragment")
+                except Exception as e:
+                    st.error(f"업로드 중 오류가 발생했습니다: {str(e)}")
+                    logger.error(f"파일 업로드 오류: {e}")
+            else:
+                st.error("스토리지 시스템이 초기화되지 않았습니다.")
+
+    # 진행 중인 업로드 작업 진행률 (작업이 있을 때만 1초마다 갱신)
+    if st.session_state.upload_jobs:
+        _render_upload_progress()
+
+def _close_stream(stream_generator):
+    """진행 중인 응답 스트림 제너레이터 닫기 (이미 끝났거나 없으면 무시)"""
+    if stream_generator is None:
+        return
+    try:
+        stream_generator.close()
+    except Exception as e:
+        logger.error(f"응답 스트림 종료 오류: {e}")
+
+def _on_chat_submit():
+    """채팅 입력 제출 콜백 - 사용자 메시지를 기록하고 이번 실행에서 응답할 질문으로 표시"""
+    prompt = st.session_state.get('main_chat_input')
+    if not prompt or not st.session_state.get('system_initialized', False):
+        return
+    # 이전 응답이 아직 스트리밍 중이면 먼저 닫음
+    _close_stream(st.session_state.pop('_active_stream', None))
+    st.session_state.messages.append({
+        "id": uuid.uuid4().hex,
+        "role": "user",
+        "content": prompt,
+        "timestamp": datetime.now().strftime("%H:%M")
+    })
+    _trim_history()
+    st.session_state._pending_prompt = prompt
+
+# 상단 헤더 HTML (모듈 로드 시 한 번만 생성)
+_HEADER_HTML = """
+<div style="text-align:center; padding:24px 16px; border-radius:16px; width: 100%; margin: 16px 0; color:#fff; background:linear-gradient(135deg, #667eea 0%, #764ba2 100%); box-shadow:0 6px 24px rgba(102,126,234,.3); position: relative; overflow: hidden;">
+    <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: radial-gradient(circle at 20% 80%, rgba(255,255,255,0.1) 0%, transparent 50%), radial-gradient(circle at 80% 20%, rgba(255,255,255,0.1) 0%, transparent 50%);"></div>
+    <div style="position: relative; z-index: 1;">
+        <h1 style="margin:0; font-size:32px; color:white; font-weight:700; text-shadow: 0 2px 4px rgba(0,0,0,0.2);">⚡Synergy ChatBot</h1>
+        <p style="margin:8px 0 0; opacity:.95; color:white; font-size:16px; font-weight:400;">AI-Powered Intelligent Assistant</p>
+    </div>
+</div>
+"""
+
+def _create_sample_data():
+    """샘플 데이터 생성 버튼 콜백 (성공 시 상태 캐시를 비워 이번 실행에서 바로 반영)"""
+    try:
+        sample_result = water_level_monitoring_tool(action='add_sample_data')
+        if sample_result.get('success'):
+            _fetch_current_status.clear()
+            st.toast("✅ 테스트용 샘플 데이터 생성 완료!")
+        else:
+            st.session_state.sample_data_error = f"샘플 데이터 생성 실패: {sample_result.get('error')}"
+    except Exception as e:
+        st.session_state.sample_data_error = f"샘플 데이터 생성 오류: {str(e)}"
+
+_TS_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})')
+
+def _parse_ts(value: str):
+    """ISO/DB 타임스탬프 문자열을 ('YYYY-MM-DD', 'HH:MM:SS')로 분리 (형식이 다를 때만 fromisoformat, 실패 시 None)"""
+    if not isinstance(value, str):
+        return None
+    match = _TS_RE.match(value)
+    if match:
+        return match.group(1), match.group(2)
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return dt.strftime('%Y-%m-%d'), dt.strftime('%H:%M:%S')
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _fetch_current_status() -> dict:
+    """배수지 현재 상태 조회 (rerun마다 DB를 조회하지 않도록 전역 캐시, 새로고침 시 clear)"""
+    return water_level_monitoring_tool(action='current_status')
+
+RESERVOIR_MAX_LEVEL = 120  # 수위 위젯 최대 표시 수위 (m)
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _reservoir_html(level: float, status: str, name: str, date_display: str) -> str:
+    """배수지 수위 게이지 HTML (출력에 영향을 주는 값으로만 캐시)"""
+    level_percent = min(100, (level / RESERVOIR_MAX_LEVEL) * 100)
+    if status == 'CRITICAL':
+        color = '#dc2626'  # 빨간색
+    elif status == 'WARNING':
+        color = '#f59e0b'  # 주황색
+    else:
+        color = '#3b82f6'  # 파란색
+    return f"""
+    <div style="background: linear-gradient(to top, {color} {level_percent}%, #e5e7eb {level_percent}%); 
+               height: 80px; border-radius: 8px; position: relative; margin: 8px 0;
+               border: 2px solid {color}; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+        <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); 
+                   color: white; font-weight: bold; font-size: 14px; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
+            {level:.1f}m
+        </div>
+        <div style="position: absolute; top: 5px; left: 8px; color: white; font-size: 11px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
+            {name}
+        </div>
+        <div style="position: absolute; top: 5px; right: 8px; color: white; font-size: 10px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
+            {status}
+        </div>
+        <div style="position: absolute; bottom: 3px; left: 8px; color: white; font-size: 9px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.8); opacity: 0.95; max-width: calc(100% - 16px); overflow: hidden; text-overflow: ellipsis; white-space: nowrap; background: rgba(0,0,0,0.2); padding: 2px 4px; border-radius: 3px;">
+            📅 {date_display}
+        </div>
+    </div>
+    """
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _pump_status_html(pump_items: tuple, active_pumps: int, total_pumps: int) -> str:
+    """펌프 상태 배지와 요약 HTML (펌프별 위젯/컬럼 대신 마크다운 하나로 표시)"""
+    badges = []
+    for pump_name, is_active in pump_items:
+        pump_display_name = pump_name.replace('pump_', '펌프 ').upper()
+        if is_active:
+            badges.append(f'<span style="flex:1; text-align:center; padding:6px 4px; border-radius:6px; background:#dcfce7; color:#166534; font-size:13px;">⚡ 🟢 {pump_display_name}</span>')
+        else:
+            badges.append(f'<span style="flex:1; text-align:center; padding:6px 4px; border-radius:6px; background:#dbeafe; color:#1e40af; font-size:13px;">⏸️ ⚪ {pump_display_name}</span>')
+    badge_row = f'<div style="display:flex; gap:6px; margin:4px 0 8px 0;">{"".join(badges)}</div>' if badges else ''
+    return (
+        '<div><strong>💨 펌프 상태</strong></div>'
+        f'{badge_row}'
+        f'<div><strong>📊 요약:</strong> {active_pumps}/{total_pumps} 펌프 가동 중</div>'
+    )
+
+NOTIFICATION_LEVEL_COLORS = {
+    "info": "#3b82f6",
+    "warning": "#f59e0b",
+    "critical": "#ef4444",
+    "emergency": "#dc2626"
+}
+NOTIFICATION_LEVEL_ICONS = {
+    "info": "ℹ️",
+    "warning": "⚠️",
+    "critical": "🚨",
+    "emergency": "🆘"
+}
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _notification_card_html(level_str: str, title: str, time_str: str, message: str) -> str:
+    """사이드 알림 카드 HTML (message는 101자까지만 받아 100자 초과 여부만 판단)"""
+    color = NOTIFICATION_LEVEL_COLORS.get(level_str, "#6b7280")
+    icon = NOTIFICATION_LEVEL_ICONS.get(level_str, "📢")
+    return f"""
+    <div style="border-left: 3px solid {color}; padding: 8px 12px; margin: 6px 0; background: #f8fafc; border-radius: 0 6px 6px 0;">
+        <strong style="color: {color};">{icon} {title}</strong><br>
+        <small style="color: #6b7280;">{time_str}</small><br>
+        <span style="font-size: 13px;">{message[:100]}{'...' if len(message) > 100 else ''}</span>
+    </div>
+    """
+
+# 스트리밍 응답 화면 갱신 단위 (약 30fps 또는 64자마다 한 번)
+STREAM_FLUSH_INTERVAL_SECONDS = 0.033
+STREAM_FLUSH_CHARS = 64
+
+# 아두이노 연결 확인(STATUS 쓰기) 최소 간격 (초)
+ARDUINO_PROBE_INTERVAL_SECONDS = 5
+
+# 모델 / 연결 상태 패널 표시 문자열
+_API_OK_HTML = '**API**: <span style="color: #16a34a;">✅ 연결됨</span>'
+_API_NONE_HTML = '**API**: <span style="color: #dc2626;">❌ 연결 안됨</span>'
+_ARD_OK_TMPL = "**아두이노**: <span style='color: #16a34a;'>✅ 연결됨 ({})</span>"
+_ARD_PORT_TMPL = "**아두이노**: <span style='color: #3b82f6;'>🔌 포트 발견 ({})</span>"
+_ARD_SIM_HTML = "**아두이노**: <span style='color: #f59e0b;'>🔄 시뮬레이션</span>"
+_ARD_LOST_HTML = "**아두이노**: <span style='color: #dc2626;'>❌ 연결 끊어짐</span>"
+_ARD_NONE_HTML = "**아두이노**: <span style='color: #dc2626;'>❌ 연결 안됨</span>"
+
+def _arduino_port_name(arduino_tool, port: str) -> str:
+    """포트 표시 이름 (Windows COM 경로 처리) - 포트가 바뀔 때만 계산해 도구 객체에 보관"""
+    cached = getattr(arduino_tool, '_port_name', None)
+    if cached and cached[0] == port:
+        return cached[1]
+    port_name = port.rsplit('\\', 1)[-1].rsplit('/', 1)[-1]
+    arduino_tool._port_name = (port, port_name)
+    return port_name
+
+# 페이지별 (제목, 아이콘) - set_page_config는 main()에서 한 번만 호출
+PAGE_CONFIGS = {
+    "autonomous_agent": ("🔔 자율 에이전트 - Synergy ChatBot", "🤖"),
+}
+
 def main():
     """Streamlit 앱 메인 함수"""
+    page_title, page_icon = PAGE_CONFIGS.get(st.session_state.get('page', "main"), ("Synergy ChatBot", "⚡"))
     st.set_page_config(
-        page_title="Synergy ChatBot",
-        page_icon="⚡",
+        page_title=page_title,
+        page_icon=page_icon,
         layout="wide"
     )
 
+    # rerun당 한 번 계산하는 타임스탬프 (다운로드 파일명, 메시지 시각 등에 사용)
+    run_now = datetime.now()
+    st.session_state._run_ts = run_now.strftime("%Y%m%d_%H%M%S")
+    now_hhmm = run_now.strftime("%H:%M")
+
     # 페이지 라우팅
     if 'page' not in st.session_state:
         st.session_state.page = "main"
@@ -557,770 +1373,15 @@ def main():
     render_pdf_modal()
     
 
-    # --- 카카오톡 스타일 CSS ---
-    st.markdown("""
-    <style>
-    :root{
-        --kakao-bg: #b5b2ff;
-        --kakao-yellow: #fee500;
-        --user-bubble: #fee500;
-        --ai-bubble: #ffffff;
-        --text-dark: #191919;
-        --text-light: #666666;
-        --bubble-shadow: rgba(0,0,0,0.1);
-        --border-light: #e1e1e1;
-    }
-    
-    .main .block-container {
-        padding: 0.5rem 1rem;
-        max-width: 1400px;
-    }
-    
-    /* === 채팅 메시지 기본 스타일 (명확한 구분) === */
-    .stChatMessage {
-        border-radius: 12px !important;
-        padding: 16px 20px !important;
-        margin: 12px 0 !important;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.06) !important;
-        transition: all 0.2s ease !important;
-        position: relative !important;
-    }
-
-    .stChatMessage:hover {
-        box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1) !important;
-    }
-
-    /* 사용자 메시지 - 주황색 강조 */
-    .stChatMessage[data-testid="chat-message-user"],
-    .stChatMessage[data-testid*="user"] {
-        background: #fffbf0 !important;
-        border: 1px solid #fed7aa !important;
-        border-left: 4px solid #f59e0b !important;
-    }
-
-    .stChatMessage[data-testid="chat-message-user"]:hover,
-    .stChatMessage[data-testid*="user"]:hover {
-        background: #fff7e6 !important;
-        border-left-color: #d97706 !important;
-    }
-
-    /* AI 메시지 - 파란색 강조 */
-    .stChatMessage[data-testid="chat-message-assistant"],
-    .stChatMessage[data-testid*="assistant"] {
-        background: #f0f4ff !important;
-        border: 1px solid #c7d2fe !important;
-        border-left: 4px solid #667eea !important;
-    }
-
-    .stChatMessage[data-testid="chat-message-assistant"]:hover,
-    .stChatMessage[data-testid*="assistant"]:hover {
-        background: #e0e7ff !important;
-        border-left-color: #5568d3 !important;
-    }
-
-    /* 아바타 아이콘 스타일 */
-    .stChatMessage [data-testid="chatAvatarIcon-assistant"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4) !important;
-    }
-
-    .stChatMessage [data-testid="chatAvatarIcon-user"] {
-        background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%) !important;
-        box-shadow: 0 4px 12px rgba(251, 191, 36, 0.4) !important;
-    }
-
-    /* 테이블 스타일 */
-    .stChatMessage .stMarkdown table {
-        width: 100% !important;
-        border-collapse: collapse !important;
-        margin: 20px 0 !important;
-        border: 1px solid #e5e7eb !important;
-        border-radius: 8px !important;
-        overflow: hidden !important;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05) !important;
-    }
-
-    .stChatMessage .stMarkdown th {
-        background: #f9fafb !important;
-        color: #111827 !important;
-        padding: 14px 18px !important;
-        text-align: left !important;
-        font-weight: 600 !important;
-        font-size: 14px !important;
-        border-bottom: 2px solid #e5e7eb !important;
-    }
-
-    .stChatMessage .stMarkdown td {
-        padding: 14px 18px !important;
-        border-bottom: 1px solid #f3f4f6 !important;
-        font-size: 14px !important;
-        color: #374151 !important;
-        background: white !important;
-    }
-
-    .stChatMessage .stMarkdown tr:last-child td {
-        border-bottom: none !important;
-    }
-
-    .stChatMessage .stMarkdown tr:hover td {
-        background: #f9fafb !important;
-    }
-
-    /* 생각 중 메시지 스타일 - 채팅창 내에서만 적용 */
-    .thinking-bubble {
-        background: #f5f5f5 !important;
-        border: 2px dashed #667eea !important;
-        animation: thinking-pulse 2s ease-in-out infinite !important;
-        position: relative !important;
-        z-index: 1 !important;
-    }
-    
-    /* 전체 화면 오버레이 방지 */
-    .stApp > div[data-testid="stAppViewContainer"] {
-        background: transparent !important;
-    }
-    
-    /* streamlit 기본 스피너/로더 숨기기 */
-    .stSpinner {
-        display: none !important;
-    }
-    
-    /* 전체 화면 블록킹 방지 */
-    body {
-        overflow: visible !important;
-    }
-    
-    @keyframes thinking-pulse {
-        0%, 100% { opacity: 0.8; transform: scale(1); }
-        50% { opacity: 1; transform: scale(1.05); }
-    }
-    
-    @keyframes thinking-glow {
-        0%, 100% { 
-            box-shadow: 0 4px 12px rgba(44, 90, 160, 0.2);
-            border-color: #667eea;
-        }
-        50% { 
-            box-shadow: 0 6px 20px rgba(44, 90, 160, 0.4);
-            border-color: #4f5bd5;
-        }
-    }
-    
-    @keyframes thinking-dots {
-        0%, 20% { opacity: 0.3; transform: scale(0.8); }
-        50% { opacity: 1; transform: scale(1.2); }
-        80%, 100% { opacity: 0.3; transform: scale(0.8); }
-    }
-    
-    /* 타임스탬프 스타일 */
-    .timestamp {
-        font-size: 11px !important;
-        color: var(--text-light) !important;
-        margin-top: 4px !important;
-        text-align: right !important;
-    }
-    
-    .timestamp-left {
-        text-align: left !important;
-        margin-left: 48px !important;
-    }
-    
-    /* --- 🎨 채팅 입력창 스타일 (강제 라이트 모드) --- */
-    /* 입력창 내부 텍스트 스타일 */
-    .stChatInput > div > div > textarea {
-        border: none !important; /* 이 부분이 textarea의 테두리를 제거합니다 */
-        border-radius: 24px !important;
-        padding: 12px 20px !important;
-        font-size: 14px !important;
-        background: transparent !important;
-        resize: none !important;
-        color: #191919 !important; 
-    }
-
-    /* 입력창 내부 텍스트 스타일 */
-    .stChatInput > div > div > textarea {
-        border: none !important;
-        border-radius: 24px !important;
-        padding: 12px 20px !important;
-        font-size: 14px !important;
-        background: transparent !important;
-        resize: none !important;
-        color: #191919 !important; /* 텍스트 색상 고정 */
-    }
-
-    /* 입력창 플레이스홀더 텍스트 색상 */
-    .stChatInput > div > div > textarea::placeholder {
-        color: #888888 !important;
-    }
-
-    .stChatInput > div > div > textarea:focus {
-        outline: none !important;
-        box-shadow: none !important;
-    }
-
-    
-    /* 파일 아이템 스타일 */
-    .file-item{
-        border: 1px solid var(--border-light);
-        border-radius: 8px;
-        padding: 8px;
-        margin: 6px 0;
-        background: white;
-        transition: all 0.2s ease;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-    
-    .file-item:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    }
-    
-    /* 컨테이너 간격 최적화 */
-    .stContainer > div {
-        gap: 0.5rem !important;
-    }
-
-    /* 다크 모드 */
-    [data-theme="dark"] {
-        --ai-bubble: #2f2f2f;
-        --user-bubble: #4a4a4a;
-        --text-dark: #ffffff;
-        --text-light: #b0b0b0;
-        --border-light: #444444;
-        --bubble-shadow: rgba(0,0,0,0.3);
-    }
-    
-    /* 다크 모드 오버라이드 방지 (기존 다크모드 CSS는 삭제) */
-    [data-theme="dark"] .stChatInput > div > div {
-        background: #ffffff !important; /* 다크모드에서도 흰색 배경 유지 */
-        border-color: #e1e1e1 !important;
-    }
-    [data-theme="dark"] .stChatInput > div > div > textarea {
-        color: #191919 !important; /* 다크모드에서도 검은 텍스트 유지 */
-    }
-    [data-theme="dark"] .stChatInput > div > div > textarea::placeholder {
-        color: #888888 !important; /* 다크모드에서도 플레이스홀더 색상 유지 */
-    }
-    
-    [data-theme="dark"] .file-item {
-        background: #2f2f2f;
-        border-color: #444444;
-        color: #ffffff;
-    }
-
-    /* 3단 레이아웃 컬럼 정렬 - 강력한 상단 정렬 */
-    [data-testid="column"] {
-        vertical-align: top !important;
-        align-items: flex-start !important;
-        display: flex !important;
-        flex-direction: column !important;
-    }
-
-    /* 컬럼 간격 조정 */
-    .main .block-container [data-testid="stHorizontalBlock"] {
-        gap: 1rem !important;
-        align-items: flex-start !important;
-    }
-
-    /* 컬럼 내부 요소들 상단 정렬 */
-    [data-testid="column"] > div {
-        display: flex !important;
-        flex-direction: column !important;
-        align-items: stretch !important;
-        padding-top: 0 !important;
-        margin-top: 0 !important;
-    }
-
-    /* 모든 컬럼의 첫 번째 element-container 상단 여백 제거 */
-    [data-testid="column"] > div > div[data-testid="element-container"]:first-child {
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }
-
-    /* 모든 컨테이너 통일 스타일 및 간격 */
-    [data-testid="stVerticalBlock"] > div > div[data-testid="stVerticalBlock"] {
-        gap: 0.5rem !important;
-    }
-
-    /* border=True 컨테이너들의 상단 정렬 강제 */
-    [data-testid="column"] [data-testid="stVerticalBlock"]:has(> div[style*="border"]) {
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }
-
-    /* 컨테이너 border 통일 및 정렬 */
-    div[data-testid="stVerticalBlock"] > div > div[data-testid="element-container"] > div > div {
-        border-radius: 8px !important;
-    }
-
-    /* 모든 컬럼 내부의 컨테이너를 같은 위치에서 시작 */
-    [data-testid="column"] > div[data-testid="stVerticalBlock"] > div:first-child {
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }
-
-    /* 모든 border=True 컨테이너를 같은 높이에서 시작 */
-    [data-testid="column"] > div > div:first-child [data-testid="stVerticalBlock"] {
-        margin-top: 0 !important;
-    }
-
-    /* element-container 내부 여백 제거 */
-    [data-testid="column"] > div > div[data-testid="element-container"]:first-of-type {
-        padding-top: 0 !important;
-    }
-
-    /* === 컬럼 정렬 개선 === */
-    /* 모든 컬럼을 상단 정렬 */
-    section[data-testid="stHorizontalBlock"] {
-        align-items: flex-start !important;
-    }
-
-    /* 모든 컬럼의 직접 자식 요소 상단 여백 제거 */
-    [data-testid="column"] > div[data-testid="stVerticalBlock"] {
-        display: flex !important;
-        flex-direction: column !important;
-        align-items: stretch !important;
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }
-
-    /* 컬럼 내부의 모든 첫 번째 요소 정렬 */
-    [data-testid="column"] > div[data-testid="stVerticalBlock"] > div:first-child,
-    [data-testid="column"] > div > div:first-child,
-    section[data-testid="stHorizontalBlock"] > div[data-testid="column"] > div > div:first-child {
-        margin-top: 0 !important;
-        padding-top: 0 !important;
-    }
-
-    /* === 채팅 입력창 스타일 통합 개선 === */
-    /* 중앙 컬럼 전체를 하나의 통합된 채팅 영역으로 표시 */
-    [data-testid="column"]:nth-child(2) > div[data-testid="stVerticalBlock"] {
-        background: white !important;
-        border-radius: 8px !important;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08) !important;
-        padding: 0 !important;
-    }
-
-    /* 중앙 컬럼의 채팅 컨테이너 - 상단 모서리만 둥글게 */
-    [data-testid="column"]:nth-child(2) [data-testid="stVerticalBlock"] > div[style*="border"] {
-        border-radius: 8px 8px 0 0 !important;
-        border-bottom: none !important;
-        margin-bottom: 0 !important;
-        max-height: calc(100vh - 280px) !important;
-        overflow-y: auto !important;
-        padding: 1rem !important;
-        border: 1px solid #e5e7eb !important;
-    }
-
-    /* 채팅 입력창 - 컨테이너와 완벽하게 통합 */
-    .stChatInput {
-        margin: 0 !important;
-        padding: 0 !important;
-        background: white !important;
-    }
-
-    /* 중앙 컬럼의 채팅 입력창 - 하단 모서리만 둥글게 */
-    [data-testid="column"]:nth-child(2) .stChatInput {
-        border-radius: 0 0 8px 8px !important;
-        margin: 0 !important;
-        padding: 12px 16px !important;
-        border: 1px solid #e5e7eb !important;
-        border-top: none !important;
-    }
-
-    /* 입력창 내부 요소 스타일 개선 */
-    [data-testid="column"]:nth-child(2) .stChatInput input {
-        border: none !important;
-        box-shadow: none !important;
-    }
-
-    /* 입력창 전송 버튼 스타일 */
-    [data-testid="column"]:nth-child(2) .stChatInput button {
-        background: #667eea !important;
-        border-radius: 6px !important;
-    }
-
-    [data-testid="column"]:nth-child(2) .stChatInput button:hover {
-        background: #5568d3 !important;
-    }
-
-    /* 채팅 컨테이너 스크롤 부드럽게 */
-    [data-testid="stVerticalBlock"]:has(.stChatMessage) {
-        scroll-behavior: smooth !important;
-        overflow-y: auto !important;
-    }
-
-    /* 메시지 추가 시 애니메이션 */
-    .stChatMessage {
-        animation: fadeInUp 0.3s ease-in-out !important;
-    }
-
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(10px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-
-    /* 채팅 컨테이너 최대 높이 설정 */
-    [data-testid="stVerticalBlock"] > div[style*="border"] {
-        max-height: calc(100vh - 250px) !important;
-        overflow-y: auto !important;
-    }
-    </style>
-    <script>
-    // 컬럼 정렬 강제 적용 (개선된 버전)
-    function alignColumns() {
-        // 모든 컬럼을 상단 정렬
-        const horizontalBlock = document.querySelector('[data-testid="stHorizontalBlock"]');
-        if (horizontalBlock) {
-            horizontalBlock.style.alignItems = 'flex-start';
-        }
-
-        // 각 컬럼의 첫 번째 요소들 정렬
-        const columns = document.querySelectorAll('[data-testid="column"]');
-        columns.forEach(col => {
-            // 컬럼의 직접 자식들 정렬
-            const verticalBlock = col.querySelector('[data-testid="stVerticalBlock"]');
-            if (verticalBlock) {
-                verticalBlock.style.marginTop = '0';
-                verticalBlock.style.paddingTop = '0';
-
-                // 첫 번째 자식 요소들 정렬
-                const firstChild = verticalBlock.querySelector('> div:first-child');
-                if (firstChild) {
-                    firstChild.style.marginTop = '0';
-                    firstChild.style.paddingTop = '0';
-                }
-            }
-        });
-    }
-
-    // 페이지 로드 시 실행
-    setTimeout(alignColumns, 100);
-
-    // Streamlit 리렌더링 감지 및 재정렬
-    const observer = new MutationObserver(alignColumns);
-    observer.observe(document.body, { childList: true, subtree: true });
-    </script>
-    """, unsafe_allow_html=True)
+    # --- 카카오톡 스타일 CSS + 자동 스크롤 스크립트 (세션당 한 번만 주입) ---
+    inject_ui_assets()
 
     # --- 헤더 (전체 화면 폭에 맞게 수정) ---
-    st.markdown("""
-    <div style="text-align:center; padding:24px 16px; border-radius:16px; width: 100%; margin: 16px 0; color:#fff; background:linear-gradient(135deg, #667eea 0%, #764ba2 100%); box-shadow:0 6px 24px rgba(102,126,234,.3); position: relative; overflow: hidden;">
-        <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: radial-gradient(circle at 20% 80%, rgba(255,255,255,0.1) 0%, transparent 50%), radial-gradient(circle at 80% 20%, rgba(255,255,255,0.1) 0%, transparent 50%);"></div>
-        <div style="position: relative; z-index: 1;">
-            <h1 style="margin:0; font-size:32px; color:white; font-weight:700; text-shadow: 0 2px 4px rgba(0,0,0,0.2);">⚡Synergy ChatBot</h1>
-            <p style="margin:8px 0 0; opacity:.95; color:white; font-size:16px; font-weight:400;">AI-Powered Intelligent Assistant</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # ===== 메시지 렌더링 헬퍼 함수들 (전역으로 정의) =====
-    def render_message_styles():
-        """스트리밍 포맷 기준 통일 스타일 - 깔끔한 하얀 배경"""
-        st.markdown("""
-        <style>
-        /* 채팅 컨테이너 배경 - 하얀색 */
-        [data-testid="stVerticalBlock"] > div:has(.stChatMessage) {
-            background: white !important;
-        }
-
-        .stChatMessage [data-testid="chatAvatarIcon-assistant"] {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4) !important;
-        }
-
-        .stChatMessage [data-testid="chatAvatarIcon-user"] {
-            background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%) !important;
-            box-shadow: 0 4px 12px rgba(251, 191, 36, 0.4) !important;
-        }
-
-        /* 메시지 내용 스타일 향상 */
-        .stChatMessage .stMarkdown {
-            font-size: 15px !important;
-            line-height: 1.7 !important;
-            color: #1f2937 !important;
-        }
-
-        .stChatMessage .stMarkdown p {
-            margin: 14px 0 !important;
-            font-size: 15px !important;
-            line-height: 1.7 !important;
-            color: #374151 !important;
-        }
-
-        .stChatMessage .stMarkdown h1,
-        .stChatMessage .stMarkdown h2 {
-            font-size: 22px !important;
-            margin: 24px 0 16px 0 !important;
-            color: #111827 !important;
-            border-bottom: 2px solid #e5e7eb !important;
-            padding-bottom: 10px !important;
-            font-weight: 700 !important;
-        }
-
-        .stChatMessage .stMarkdown h3 {
-            font-size: 18px !important;
-            margin: 20px 0 12px 0 !important;
-            color: #1f2937 !important;
-            font-weight: 600 !important;
-        }
-
-        .stChatMessage .stMarkdown h4,
-        .stChatMessage .stMarkdown h5,
-        .stChatMessage .stMarkdown h6 {
-            font-size: 16px !important;
-            margin: 16px 0 10px 0 !important;
-            color: #374151 !important;
-            font-weight: 600 !important;
-        }
-
-        .stChatMessage .stMarkdown ul,
-        .stChatMessage .stMarkdown ol {
-            margin: 14px 0 !important;
-            padding-left: 28px !important;
-        }
-
-        .stChatMessage .stMarkdown li {
-            font-size: 15px !important;
-            line-height: 1.7 !important;
-            margin: 8px 0 !important;
-            color: #374151 !important;
-        }
-
-        .stChatMessage .stMarkdown li::marker {
-            color: #9ca3af !important;
-        }
-
-        /* 테이블 스타일 */
-        .stChatMessage .stMarkdown table {
-            width: 100% !important;
-            border-collapse: collapse !important;
-            margin: 20px 0 !important;
-            border: 1px solid #e5e7eb !important;
-            border-radius: 8px !important;
-            overflow: hidden !important;
-            box-shadow: 0 1px 3px rgba(0, 0, 0, 0.05) !important;
-        }
-
-        .stChatMessage .stMarkdown th {
-            background: #f9fafb !important;
-            color: #111827 !important;
-            padding: 14px 18px !important;
-            text-align: left !important;
-            font-weight: 600 !important;
-            font-size: 14px !important;
-            border-bottom: 2px solid #e5e7eb !important;
-        }
-
-        .stChatMessage .stMarkdown td {
-            padding: 14px 18px !important;
-            border-bottom: 1px solid #f3f4f6 !important;
-            font-size: 14px !important;
-            color: #374151 !important;
-            background: white !important;
-        }
-
-        .stChatMessage .stMarkdown tr:last-child td {
-            border-bottom: none !important;
-        }
-
-        .stChatMessage .stMarkdown tr:hover td {
-            background: #f9fafb !important;
-        }
-
-        /* 인라인 코드 스타일 */
-        .stChatMessage .stMarkdown code {
-            background: #f3f4f6 !important;
-            padding: 3px 7px !important;
-            border-radius: 6px !important;
-            font-size: 14px !important;
-            color: #dc2626 !important;
-            font-family: 'SF Mono', 'Monaco', 'Menlo', monospace !important;
-            font-weight: 500 !important;
-        }
-
-        /* 코드 블록 스타일 */
-        .stChatMessage .stMarkdown pre {
-            background: #1f2937 !important;
-            padding: 18px !important;
-            border-radius: 10px !important;
-            overflow-x: auto !important;
-            margin: 18px 0 !important;
-            border: 1px solid #374151 !important;
-        }
-
-        .stChatMessage .stMarkdown pre code {
-            background: transparent !important;
-            color: #f3f4f6 !important;
-            padding: 0 !important;
-            font-size: 14px !important;
-        }
-
-        /* 텍스트 강조 스타일 */
-        .stChatMessage .stMarkdown strong {
-            font-weight: 700 !important;
-            color: #111827 !important;
-        }
-
-        .stChatMessage .stMarkdown em {
-            font-style: italic !important;
-            color: #6b7280 !important;
-        }
-
-        /* 구분선 스타일 */
-        .stChatMessage .stMarkdown hr {
-            margin: 28px 0 !important;
-            border: none !important;
-            height: 1px !important;
-            background: #e5e7eb !important;
-        }
-
-        /* 인용구 스타일 */
-        .stChatMessage .stMarkdown blockquote {
-            border-left: 4px solid #667eea !important;
-            padding: 12px 20px !important;
-            margin: 18px 0 !important;
-            background: #f9fafb !important;
-            color: #4b5563 !important;
-            border-radius: 0 8px 8px 0 !important;
-        }
-
-        /* 다운로드 버튼 스타일 */
-        .stChatMessage .stDownloadButton button {
-            background: #667eea !important;
-            color: white !important;
-            border: none !important;
-            padding: 10px 20px !important;
-            border-radius: 8px !important;
-            font-size: 14px !important;
-            font-weight: 600 !important;
-            transition: all 0.2s ease !important;
-        }
-
-        .stChatMessage .stDownloadButton button:hover {
-            background: #5568d3 !important;
-            transform: translateY(-1px) !important;
-        }
-
-        /* 상태 표시기 (st.status) 스타일 */
-        .stChatMessage .stStatus {
-            background: #f9fafb !important;
-            border: 1px solid #e5e7eb !important;
-            border-radius: 8px !important;
-            margin-bottom: 14px !important;
-        }
-
-        .stChatMessage .stStatus > details > summary {
-            font-size: 14px !important;
-            color: #667eea !important;
-            font-weight: 600 !important;
-            padding: 10px !important;
-        }
-
-        /* expander 스타일 개선 */
-        .stChatMessage .stExpander {
-            border: 1px solid #e5e7eb !important;
-            border-radius: 8px !important;
-            background: #f9fafb !important;
-            margin: 12px 0 !important;
-        }
-
-        .stChatMessage .stExpander > details > summary {
-            font-size: 14px !important;
-            font-weight: 600 !important;
-            color: #4b5563 !important;
-            padding: 12px !important;
-        }
-
-        /* caption (타임스탬프) 스타일 */
-        .stChatMessage [data-testid="stCaptionContainer"] {
-            color: #9ca3af !important;
-            font-size: 13px !important;
-            margin-top: 12px !important;
-            font-weight: 500 !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
-    def render_user_message(message):
-        """사용자 메시지 렌더링 - st.chat_message 사용 (대화창 스타일)"""
-        with st.chat_message("user", avatar="👤"):
-            st.markdown(message["content"])
-
-            if message.get("timestamp"):
-                st.caption(f"🕐 {message['timestamp']}")
-
-    def render_assistant_message(message):
-        """어시스턴트 메시지 렌더링 - st.chat_message 사용 (스트리밍과 동일)"""
-        with st.chat_message("assistant", avatar="🤖"):
-            # 메시지 내용 표시 (마크다운 형식, 일관된 렌더링)
-            content = message["content"]
-
-            # 메시지 내용을 그대로 표시 - write_stream()과 동일한 방식으로 렌더링
-            # st.write()는 마크다운을 자동으로 렌더링하며 write_stream()과 호환됩니다
-            st.write(content)
-
-            # 이미지가 있으면 메인 영역에 바로 표시
-            tool_results = message.get("tool_results", {})
-            if tool_results:
-                for tool_name, result in tool_results.items():
-                    if isinstance(result, dict):
-                        # graph_filepath로 이미지 표시 시도
-                        if 'graph_filepath' in result and result.get('graph_filepath'):
-                            try:
-                                st.image(result['graph_filepath'], caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                            except Exception as e:
-                                logger.error(f"그래프 파일 표시 오류: {e}")
-                                # 실패 시 image_base64 시도
-                                if 'image_base64' in result and result.get('image_base64'):
-                                    try:
-                                        import base64
-                                        import io
-                                        from PIL import Image
-                                        image_data = base64.b64decode(result['image_base64'])
-                                        image = Image.open(io.BytesIO(image_data))
-                                        st.image(image, caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                                    except Exception as e2:
-                                        logger.error(f"Base64 이미지 표시 오류: {e2}")
-                        # graph_filepath가 없으면 image_base64 시도
-                        elif 'image_base64' in result and result.get('image_base64'):
-                            try:
-                                import base64
-                                import io
-                                from PIL import Image
-                                image_data = base64.b64decode(result['image_base64'])
-                                image = Image.open(io.BytesIO(image_data))
-                                st.image(image, caption=result.get('graph_filename', '이미지'), use_container_width=True)
-                            except Exception as e:
-                                logger.error(f"이미지 표시 오류: {e}")
-
-            # 타임스탬프와 처리시간
-            timestamp_parts = []
-            if message.get("timestamp"):
-                timestamp_parts.append(f"🕐 {message['timestamp']}")
-            if message.get("processing_time"):
-                timestamp_parts.append(f"⚡ {message['processing_time']}")
-
-            if timestamp_parts:
-                st.caption(" | ".join(timestamp_parts))
-
-            # PDF 다운로드 버튼 (헬퍼 함수 사용)
-            render_pdf_download_button(message["content"], key_prefix=f"pdf_btn_{id(message)}")
-
-            # 도구 실행 결과 (헬퍼 함수 사용)
-            if "tool_results" in message:
-                render_tool_results(message.get("tool_results", {}))
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
     # --- 3단 레이아웃 정의 전 초기화 처리 ---
     # 글로벌 상태와 세션 상태 동기화 (UI 없이 백그라운드에서 실행)
-    state_manager = get_state_manager()
-    state = state_manager.load_state()
+    state = _load_state_cached()
 
     # 글로벌 상태에서 초기화 상태 확인
     if state.get('system_initialized', False):
@@ -1348,6 +1409,13 @@ def main():
 
     # --- 왼쪽 컬럼: 제어판 ---
     with left_col:
+        # 세션 상태 스냅샷 (상태를 바꾸는 버튼은 모두 st.rerun()하므로 이 컬럼에서는 한 번만 읽음)
+        ss = st.session_state
+        automation_active = ss.get('automation_status', False)
+        autonomous_monitoring = ss.get('autonomous_monitoring', False)
+        model_info = ss.get('model_info', {})
+        debug_info = ss.get('debug_info')
+
         with st.container(border=True):
             # 자동 초기화 실패 시 경고 표시
             if auto_init_failed:
@@ -1373,9 +1441,6 @@ def main():
             # 자동화 제어 버튼들 (상태 기반 개선)
             col1, col2 = st.columns(2)
             
-            # 현재 자동화 상태 확인
-            automation_active = st.session_state.get('automation_status', False)
-            
             with col1:
                 # 자동화가 이미 시작된 경우 버튼 비활성화
                 button_disabled = not is_system_initialized or automation_active
@@ -1385,8 +1450,6 @@ def main():
                 if st.button(button_text, use_container_width=True, disabled=button_disabled, help=button_help):
                     with st.spinner("자동화 시스템 시작 중..."):
                         try:
-                            from tools.automation_control_tool import automation_control_tool
-                            
                             result = automation_control_tool(action='start')
                             
                             if result.get('success'):
@@ -1419,7 +1482,6 @@ def main():
                 if st.button(button_text, use_container_width=True, disabled=button_disabled, help=button_help):
                     with st.spinner("자동화 시스템 중단 중..."):
                         try:
-                            from tools.automation_control_tool import automation_control_tool
                             result = automation_control_tool(action='stop')
                             if result.get('success'):
                                 st.session_state.automation_status = False
@@ -1452,12 +1514,10 @@ def main():
         with st.container(border=True):
             st.subheader("🤖 모델 / 연결 상태")
             if is_system_initialized:
-                model_info = st.session_state.get('model_info', {})
                 api_ok = model_info.get('api_available', False)
                 
                 # 아두이노 상태 로직 개선
-                arduino_status = "❌ 연결 안됨"
-                arduino_color = "#dc2626"
+                arduino_html = _ARD_NONE_HTML
                 
                 # 아두이노 도구 확인
                 arduino_tool = None
@@ -1472,43 +1532,42 @@ def main():
                     serial_conn = getattr(arduino_tool, 'serial_connection', None)
                     
                     if port == "SIMULATION":
-                        arduino_status = "🔄 시뮬레이션"
-                        arduino_color = "#f59e0b"
+                        arduino_html = _ARD_SIM_HTML
                     elif port and serial_conn and hasattr(serial_conn, 'is_open') and serial_conn.is_open:
-                        # 실제 연결 상태를 다시 한번 확인
-                        try:
-                            # 시리얼 연결이 실제로 작동하는지 테스트
-                            serial_conn.write(b"STATUS\n")
-                            serial_conn.flush()
-                            # Windows COM 포트 처리
-                            port_name = port.split('\\')[-1] if '\\' in port else port.split('/')[-1]
-                            arduino_status = f"✅ 연결됨 ({port_name})"
-                            arduino_color = "#16a34a"
-                        except Exception as e:
+                        # 실제 연결 상태를 다시 한번 확인 (시리얼 쓰기는 N초에 한 번만, 그 사이엔 마지막 결과 사용)
+                        now = time.monotonic()
+                        if now - st.session_state.get('_arduino_probe_ts', 0) > ARDUINO_PROBE_INTERVAL_SECONDS:
+                            st.session_state._arduino_probe_ts = now
+                            try:
+                                # 시리얼 연결이 실제로 작동하는지 테스트
+                                serial_conn.write(b"STATUS\n")
+                                serial_conn.flush()
+                                st.session_state._arduino_ok = True
+                            except Exception:
+                                st.session_state._arduino_ok = False
+                        if st.session_state.get('_arduino_ok', True):
+                            arduino_html = _ARD_OK_TMPL.format(_arduino_port_name(arduino_tool, port))
+                        else:
                             # 실제로는 연결이 안된 상태
-                            arduino_status = "❌ 연결 끊어짐"
-                            arduino_color = "#dc2626"
-                            # 연결을 닫고 포트 정보 초기화
+                            arduino_html = _ARD_LOST_HTML
+                            # 연결을 닫고 포트 정보 초기화 (재연결 시 바로 다시 확인하도록 캐시도 초기화)
                             try:
                                 serial_conn.close()
                             except:
                                 pass
                             arduino_tool.serial_connection = None
                             arduino_tool.arduino_port = None
+                            st.session_state.pop('_arduino_ok', None)
+                            st.session_state.pop('_arduino_probe_ts', None)
                     elif port:
                         # 포트는 있지만 연결이 안된 상태
-                        port_name = port.split('\\')[-1] if '\\' in port else port.split('/')[-1]
-                        arduino_status = f"🔌 포트 발견 ({port_name})"
-                        arduino_color = "#3b82f6"
+                        arduino_html = _ARD_PORT_TMPL.format(_arduino_port_name(arduino_tool, port))
                 
                 st.markdown(f"**모델**: `{model_info.get('model', '-')}`")
-                st.markdown(f"""**API**: {'<span style="color: #16a34a;">✅ 연결됨</span>' if api_ok else '<span style="color: #dc2626;">❌ 연결 안됨</span>'}""", unsafe_allow_html=True)
-                st.markdown(f"**아두이노**: <span style='color: {arduino_color};'>{arduino_status}</span>", unsafe_allow_html=True)
+                st.markdown(_API_OK_HTML if api_ok else _API_NONE_HTML, unsafe_allow_html=True)
+                st.markdown(arduino_html, unsafe_allow_html=True)
 
                 # 통합 자동화 상태 표시 (시스템 초기화된 경우에만)
-                automation_active = st.session_state.get('automation_status', False)
-                autonomous_monitoring = st.session_state.get('autonomous_monitoring', False)
-
                 # 통합 상태로 표시
                 if automation_active and autonomous_monitoring:
                     st.markdown("**🤖 통합 자동화**: <span style='color: #16a34a;'>🟢 완전 활성</span>", unsafe_allow_html=True)
@@ -1532,58 +1591,39 @@ def main():
         with st.container(border=True):
             st.subheader("⚙️ 환경 설정")
             with st.expander("열기"):
-                st.json(st.session_state.get('config_info', {}))
+                st.json(get_config_info())
         
         with st.container(border=True):
             st.subheader("🐛 디버그")
             debug_mode = st.checkbox("디버그 모드", value=DEBUG_MODE, disabled=not is_system_initialized)
-            if debug_mode and st.session_state.debug_info:
+            if debug_mode and debug_info:
                 with st.expander("최근 처리 정보", expanded=False):
-                    st.json(st.session_state.debug_info)
+                    st.json(debug_info)
 
     # --- 중앙 컬럼: 채팅 ---
     with center_col:
-        with st.container(border=True):
-            # 스타일 한 번만 렌더링
-            render_message_styles()
-
+        with st.container(border=True, key="chat_container"):
             # 이전 메시지들 표시
-            for i, message in enumerate(st.session_state.messages):
-                # thinking 메시지는 기록에서 제외 (스트리밍 중에만 표시)
-                if message.get("is_thinking", False):
-                    continue
+            _render_history()
 
-                if message["role"] == "user":
-                    render_user_message(message)
-                else:
-                    render_assistant_message(message)
-
-            # thinking 메시지가 있을 때 스트리밍 응답 처리 (채팅 컨테이너 안에서!)
-            if (st.session_state.messages and
-                st.session_state.messages[-1].get("is_thinking") and
-                not st.session_state.get('processing_started', False)):
-
-                # 처리 시작 플래그 설정 (중복 처리 방지)
-                st.session_state.processing_started = True
-
-                # 사용자 질문 가져오기
-                user_prompt = st.session_state.messages[-2]["content"]
+            # 방금 입력된 질문이 있으면 같은 실행 안에서 바로 스트리밍 응답 처리 (채팅 컨테이너 안에서!)
+            user_prompt = st.session_state.pop('_pending_prompt', None)
+            if user_prompt:
 
                 # 시스템 초기화 확인
                 if not st.session_state.get('system_initialized', False) or not st.session_state.get('orchestrator'):
                     st.error("❌ 시스템이 초기화되지 않았습니다. 좌측 사이드바에서 '🔄 시스템 초기화' 버튼을 클릭해주세요.")
-                    # thinking 메시지를 에러 메시지로 교체
-                    st.session_state.messages[-1] = {
+                    st.session_state.messages.append({
+                        "id": uuid.uuid4().hex,
                         "role": "assistant",
                         "content": "시스템이 초기화되지 않았습니다. 좌측 사이드바에서 **'🔄 시스템 초기화'** 버튼을 먼저 클릭해주세요.",
-                        "timestamp": datetime.now().strftime("%H:%M")
-                    }
-                    st.session_state.processing_started = False
+                        "timestamp": now_hhmm
+                    })
+                    _trim_history()
                     st.rerun()
 
                 try:
                     # 스트리밍 응답 수집 및 실시간 표시
-                    full_response = ""
                     tool_calls = None
                     tool_results = {}
 
@@ -1592,32 +1632,42 @@ def main():
                         # 스트리밍 응답 생성 시작
                         start_time = time.time()
 
-                        # 깔끔한 상태 표시
-                        with st.status("🔍 질문 분석 및 답변 생성 중...", expanded=False) as status:
-                            st.write("💭 질문 분석 중...")
+                        # 첫 청크가 도착할 때까지만 스피너 표시
+                        with st.spinner("답변 생성 중..."):
                             stream_generator = st.session_state.orchestrator.process_query_sync(user_prompt, stream=True)
-                            st.write("✨ 답변 생성 중...")
-                            status.update(label="✅ 답변 생성 완료!", state="complete", expanded=False)
+                            # 다음 질문 제출 시 이전 스트림을 닫을 수 있도록 보관
+                            st.session_state._active_stream = stream_generator
+                            first_chunk = next(stream_generator, None)
 
                         # 스트리밍 제너레이터
                         def stream_response():
-                            nonlocal full_response, tool_calls, tool_results
-                            for chunk in stream_generator:
+                            nonlocal tool_calls, tool_results
+                            # 토큰마다 다시 그리지 않도록 일정 시간/길이 단위로 모아서 내보냄
+                            buf = ""
+                            last_flush = time.monotonic()
+                            head = (first_chunk,) if first_chunk is not None else ()
+                            for chunk in itertools.chain(head, stream_generator):
                                 if chunk.get("type") == "chunk":
-                                    content = chunk["content"]
-                                    full_response += content
-                                    yield content
+                                    buf += chunk["content"]
+                                    now = time.monotonic()
+                                    if now - last_flush >= STREAM_FLUSH_INTERVAL_SECONDS or len(buf) >= STREAM_FLUSH_CHARS:
+                                        yield buf
+                                        buf = ""
+                                        last_flush = now
                                 elif chunk.get("type") == "done":
                                     tool_calls = chunk.get("tool_calls")
                                     tool_results = chunk.get("tool_results", {})
-                            
-                            # 스트리밍 완료 후 통일된 후처리 적용
-                            from utils.helpers import apply_consistent_formatting
-                            full_response = apply_consistent_formatting(full_response)
+                            if buf:
+                                yield buf
 
                         # 실시간 스트리밍 표시
                         message_placeholder = st.empty()
-                        streamed_content = message_placeholder.write_stream(stream_response())
+                        try:
+                            streamed_content = message_placeholder.write_stream(stream_response())
+                        finally:
+                            # rerun/중단으로 스크립트가 끊겨도 LLM 스트림이 계속 소비되지 않도록 닫음
+                            _close_stream(st.session_state.pop('_active_stream', None))
+                        response_id = uuid.uuid4().hex
 
                         # 스트리밍 완료 후 재렌더링하지 않음 - write_stream이 이미 올바르게 렌더링함
                         # message_placeholder는 그대로 유지
@@ -1629,54 +1679,36 @@ def main():
                         if tool_results:
                             for tool_name, result in tool_results.items():
                                 if isinstance(result, dict):
-                                    # graph_filepath로 이미지 표시 시도
-                                    if 'graph_filepath' in result and result.get('graph_filepath'):
-                                        try:
-                                            st.image(result['graph_filepath'], caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                                        except Exception as e:
-                                            logger.error(f"그래프 파일 표시 오류: {e}")
-                                            # 실패 시 image_base64 시도
-                                            if 'image_base64' in result and result.get('image_base64'):
-                                                try:
-                                                    import base64
-                                                    import io
-                                                    from PIL import Image
-                                                    image_data = base64.b64decode(result['image_base64'])
-                                                    image = Image.open(io.BytesIO(image_data))
-                                                    st.image(image, caption=result.get('graph_filename', '그래프'), use_container_width=True)
-                                                except Exception as e2:
-                                                    logger.error(f"Base64 이미지 표시 오류: {e2}")
-                                    # graph_filepath가 없으면 image_base64 시도
-                                    elif 'image_base64' in result and result.get('image_base64'):
-                                        try:
-                                            import base64
-                                            import io
-                                            from PIL import Image
-                                            image_data = base64.b64decode(result['image_base64'])
-                                            image = Image.open(io.BytesIO(image_data))
-                                            st.image(image, caption=result.get('graph_filename', '이미지'), use_container_width=True)
-                                        except Exception as e:
-                                            logger.error(f"이미지 표시 오류: {e}")
+                                    # graph_filepath 우선, 파일이 없을 때만 image_base64 디코딩
+                                    _render_result_image(result)
 
                         # 타임스탬프와 처리시간 표시
-                        st.caption(f"🕐 {datetime.now().strftime('%H:%M')} | ⚡ {processing_time:.2f}초")
+                        st.caption(f"🕐 {now_hhmm} | ⚡ {processing_time:.2f}초")
 
                         # PDF 다운로드 버튼 (헬퍼 함수 사용)
-                        render_pdf_download_button(full_response, key_prefix="pdf_stream")
+                        render_pdf_download_button(streamed_content, key_prefix="pdf_stream")
 
                         # 도구 실행 결과 표시 (헬퍼 함수 사용)
-                        render_tool_results(tool_results)
+                        render_tool_results(tool_results, key_prefix="tool_stream")
+
+                        # 응답이 끝난 뒤 한 번만 맨 아래로 스크롤
+                        scroll_to_latest_message(response_id)
+
+                    # 그래프 파일이 있으면 base64 사본은 세션 상태에 남기지 않음
+                    tool_results = _strip_inline_images(tool_results)
 
-                    # thinking 메시지를 실제 응답으로 교체 (rerun 없이)
+                    # 스트리밍이 끝난 뒤에만 응답을 기록에 저장 (rerun 없이)
                     # streamed_content를 사용하여 스트리밍 표시와 히스토리 저장이 동일하도록 함
-                    st.session_state.messages[-1] = {
+                    st.session_state.messages.append({
+                        "id": response_id,
                         "role": "assistant",
                         "content": streamed_content,  # write_stream()이 반환한 실제 렌더링된 내용 사용
                         "tool_results": tool_results,
-                        "timestamp": datetime.now().strftime("%H:%M"),
+                        "timestamp": now_hhmm,
                         "processing_time": f"{processing_time:.2f}초",
                         "is_thinking": False
-                    }
+                    })
+                    _trim_history()
 
                     # 디버그 정보 업데이트
                     st.session_state.debug_info = {
@@ -1686,79 +1718,30 @@ def main():
                         "processing_time": f"{processing_time:.2f}초"
                     }
 
-                    # 처리 완료 플래그 제거
-                    if 'processing_started' in st.session_state:
-                        del st.session_state.processing_started
-
                     st.toast("✅ 응답 완료!", icon="🎉")
 
                     # rerun 제거 - 스트리밍된 메시지를 그대로 유지
 
                 except Exception as e:
-                    # 오류 발생 시 thinking 메시지 제거하고 에러 메시지로 교체
+                    # 오류 발생 시 에러 메시지를 응답으로 기록
                     logger.error(f"스트리밍 오류: {str(e)}")
                     error_message = f"❌ 오류가 발생했습니다: {str(e)}"
                     cleaned_error = clean_ai_response(error_message)
-                    st.session_state.messages[-1] = {
+                    st.session_state.messages.append({
+                        "id": uuid.uuid4().hex,
                         "role": "assistant",
                         "content": cleaned_error,
-                        "timestamp": datetime.now().strftime("%H:%M"),
+                        "timestamp": now_hhmm,
                         "is_thinking": False
-                    }
-
-                    if 'processing_started' in st.session_state:
-                        del st.session_state.processing_started
+                    })
+                    _trim_history()
 
                     st.error(cleaned_error)
                     st.toast("❌ 오류 발생", icon="⚠️")
                     # rerun 제거 - 오류 메시지를 바로 표시
 
-        # --- 자동 스크롤 (개선된 버전) ---
-        # MutationObserver를 사용하여 채팅 내용 변경을 감지하고 자동으로 스크롤합니다.
-        st.components.v1.html("""
-        <script>
-            // 이 스크립트는 페이지가 로드될 때 한 번만 실행되어 Observer를 설정합니다.
-            const findChatContainer = () => {
-                const containers = window.parent.document.querySelectorAll('div[data-testid="stVerticalBlock"]');
-                for (let i = 0; i < containers.length; i++) {
-                    if (containers[i].style.height === '650px') {
-                        return containers[i];
-                    }
-                }
-                return null;
-            };
-
-            const chatContainer = findChatContainer();
-
-            if (chatContainer) {
-                const observer = new MutationObserver((mutations) => {
-                    // 내용 변경 시 스크롤을 맨 아래로 이동
-                    chatContainer.scrollTop = chatContainer.scrollHeight;
-                });
-
-                // 감시 시작
-                observer.observe(chatContainer, {
-                    childList: true,
-                    subtree: true
-                });
-                
-                // 페이지를 떠날 때 Observer 연결 해제 (메모리 누수 방지)
-                window.parent.addEventListener('beforeunload', () => {
-                    observer.disconnect();
-                });
-            }
-        </script>
-        """, height=0)
-
-        # 사용자 입력 (플레이스홀더 개선)
-        placeholder_text = "메시지를 입력하세요..."
-        # AI 응답 생성 중일 때 입력창 비활성화 - thinking 메시지가 있으면 처리 중으로 간주
-        is_processing = (st.session_state.messages and 
-                        st.session_state.messages[-1].get("is_thinking", False))
-        if is_processing:
-            placeholder_text = "AI가 응답 생성 중입니다..."
-        
-        if prompt := st.chat_input(placeholder_text, key="main_chat_input", disabled=is_processing):
+        # 사용자 입력 (제출 콜백이 rerun 전에 질문을 기록하므로 별도 rerun 없이 바로 응답 생성)
+        if st.chat_input("메시지를 입력하세요...", key="main_chat_input", on_submit=_on_chat_submit):
             if not is_system_initialized:
                 # 시스템 초기화 강제 실행
                 st.toast("⚠️ 시스템 초기화를 자동으로 실행합니다...", icon="🔄")
@@ -1769,27 +1752,6 @@ def main():
                     else:
                         st.error("❌ 시스템 초기화 실패! 수동으로 초기화해주세요.")
                         return
-            else:
-                # 사용자 메시지에 타임스탬프 추가
-                current_time = datetime.now().strftime("%H:%M")
-                user_message = {
-                    "role": "user", 
-                    "content": prompt,
-                    "timestamp": current_time
-                }
-                st.session_state.messages.append(user_message)
-                
-                # AI 생각 중 메시지 추가
-                thinking_message = {
-                    "role": "assistant",
-                    "content": "AI가 답변을 생성하고 있습니다...",
-                    "timestamp": datetime.now().strftime("%H:%M"),
-                    "is_thinking": True
-                }
-                st.session_state.messages.append(thinking_message)
-                
-                # 즉시 화면을 다시 그려서 thinking 메시지 표시
-                st.rerun()
 
     # --- 오른쪽 컬럼: 파일 관리 ---
     with right_col:
@@ -1822,10 +1784,8 @@ def main():
                 
                 # synergy 데이터베이스의 water 테이블에서만 데이터 가져오기
                 try:
-                    from tools.water_level_monitoring_tool import water_level_monitoring_tool
-                    
                     # 오직 실제 water 테이블의 데이터만 조회 (샘플 데이터 생성 안함)
-                    current_status = water_level_monitoring_tool(action='current_status')
+                    current_status = _fetch_current_status()
                     
                     if current_status.get('success'):
                         reservoirs = current_status.get('reservoirs', [])
@@ -1841,67 +1801,26 @@ def main():
                         if selected_data:
                             # 수위 그래프 표시
                             level = selected_data.get('current_level', 0)
-                            max_level = 120  # 최대 표시 수위
-                            level_percent = min(100, (level / max_level) * 100)
-                            
-                            # 상태별 색상 설정
                             status = selected_data.get('status', 'UNKNOWN')
-                            if status == 'CRITICAL':
-                                color = '#dc2626'  # 빨간색
-                            elif status == 'WARNING':
-                                color = '#f59e0b'  # 주황색
-                            else:
-                                color = '#3b82f6'  # 파란색
                             
                             # 날짜 정보 추출 (연월일 시분초까지 전체 표시)
                             last_update = selected_data.get('last_update', '')
-                            try:
-                                if 'T' in last_update:
-                                    update_dt = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
-                                else:
-                                    update_dt = datetime.strptime(last_update, '%Y-%m-%d %H:%M:%S')
-                                date_display = update_dt.strftime('%Y-%m-%d %H:%M:%S')
-                            except:
+                            parsed = _parse_ts(last_update)
+                            if parsed:
+                                date_display = f"{parsed[0]} {parsed[1]}"
+                            else:
                                 date_display = last_update if last_update else '날짜 불명'
                             
-                            st.markdown(f"""
-                            <div style="background: linear-gradient(to top, {color} {level_percent}%, #e5e7eb {level_percent}%); 
-                                       height: 80px; border-radius: 8px; position: relative; margin: 8px 0;
-                                       border: 2px solid {color}; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); 
-                                           color: white; font-weight: bold; font-size: 14px; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
-                                    {level:.1f}m
-                                </div>
-                                <div style="position: absolute; top: 5px; left: 8px; color: white; font-size: 11px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
-                                    {selected_data.get('reservoir', '').replace(' 배수지', '')}
-                                </div>
-                                <div style="position: absolute; top: 5px; right: 8px; color: white; font-size: 10px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">
-                                    {status}
-                                </div>
-                                <div style="position: absolute; bottom: 3px; left: 8px; color: white; font-size: 9px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.8); opacity: 0.95; max-width: calc(100% - 16px); overflow: hidden; text-overflow: ellipsis; white-space: nowrap; background: rgba(0,0,0,0.2); padding: 2px 4px; border-radius: 3px;">
-                                    📅 {date_display}
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
+                            reservoir_name = selected_data.get('reservoir', '').replace(' 배수지', '')
+                            st.markdown(_reservoir_html(level, status, reservoir_name, date_display), unsafe_allow_html=True)
                             
-                            # 펌프 상태 표시
-                            st.markdown("**💨 펌프 상태**")
+                            # 펌프 상태 + 요약 (배지 HTML 한 번으로 표시)
                             pump_statuses = selected_data.get('pump_statuses', {})
-                            active_pumps = selected_data.get('active_pumps', 0)
-                            total_pumps = selected_data.get('total_pumps', 0)
-                            
-                            if pump_statuses:
-                                pump_cols = st.columns(len(pump_statuses))
-                                for i, (pump_name, is_active) in enumerate(pump_statuses.items()):
-                                    with pump_cols[i]:
-                                        pump_display_name = pump_name.replace('pump_', '펌프 ').upper()
-                                        if is_active:
-                                            st.success(f"🟢 {pump_display_name}", icon="⚡")
-                                        else:
-                                            st.info(f"⚪ {pump_display_name}", icon="⏸️")
-                            
-                            # 요약 정보
-                            st.markdown(f"**📊 요약:** {active_pumps}/{total_pumps} 펌프 가동 중")
+                            st.markdown(_pump_status_html(
+                                tuple(sorted(pump_statuses.items())),
+                                selected_data.get('active_pumps', 0),
+                                selected_data.get('total_pumps', 0)
+                            ), unsafe_allow_html=True)
                         else:
                             st.warning("선택된 배수지 데이터를 찾을 수 없습니다.")
                     else:
@@ -1909,24 +1828,18 @@ def main():
                         st.info("💡 데이터베이스에 수위 데이터를 추가한 후 새로고침해주세요.")
                         
                         # 개발/테스트 편의를 위한 샘플 데이터 생성 버튼 (선택적)
-                        if st.button("🔧 테스트용 샘플 데이터 생성", key="create_sample_data"):
-                            try:
-                                sample_result = water_level_monitoring_tool(action='add_sample_data')
-                                if sample_result.get('success'):
-                                    st.success("✅ 테스트용 샘플 데이터 생성 완료!")
-                                    st.rerun()
-                                else:
-                                    st.error(f"샘플 데이터 생성 실패: {sample_result.get('error')}")
-                            except Exception as e:
-                                st.error(f"샘플 데이터 생성 오류: {str(e)}")
+                        st.button("🔧 테스트용 샘플 데이터 생성", key="create_sample_data", on_click=_create_sample_data)
+                        if 'sample_data_error' in st.session_state:
+                            st.error(st.session_state.sample_data_error)
+                            del st.session_state.sample_data_error
                         
                 except Exception as e:
                     logger.error(f"수위 모니터링 오류: {str(e)}")
                     st.error(f"모니터링 시스템 오류: {str(e)}")
                 
                 # 새로고침 버튼 (실제 데이터베이스 재조회)
-                if st.button("🔄 새로고침", use_container_width=True, key="refresh_water"):
-                    st.rerun()
+                # 클릭 콜백이 스크립트 실행 전에 캐시를 비우므로 이번 실행에서 바로 새 데이터를 조회
+                st.button("🔄 새로고침", use_container_width=True, key="refresh_water", on_click=_fetch_current_status.clear)
                     
                 # 그래프 생성 버튼 (시간 범위 표시 포함)
                 if st.button("📊 24시간 그래프", use_container_width=True, key="show_graph"):
@@ -1935,12 +1848,8 @@ def main():
                         if graph_result.get('success'):
                             time_range = graph_result.get('time_range_display', '24시간')
                             st.success(f"📊 그래프 생성 완료!\n📅 시간 범위: {time_range}")
-                            if 'image_base64' in graph_result:
-                                import base64
-                                image_data = base64.b64decode(graph_result['image_base64'])
-                                st.image(image_data, 
-                                        caption=f"📊 배수지 수위 변화 ({time_range})", 
-                                        use_column_width=True)
+                            # 저장된 그래프 파일이 있으면 경로로 표시, 없을 때만 base64 디코딩
+                            _render_result_image(graph_result, caption=f"📊 배수지 수위 변화 ({time_range})")
                         else:
                             st.error(f"그래프 생성 실패: {graph_result.get('error')}")
                     except Exception as e:
@@ -1969,7 +1878,6 @@ def main():
                 if automation_active:
                     # 최근 자동화 로그 가져오기 (시도)
                     try:
-                        from tools.automation_control_tool import automation_control_tool
                         status_result = automation_control_tool(action='status')
                         
                         if status_result.get('success'):
@@ -1981,10 +1889,10 @@ def main():
                                     timestamp = event.get('timestamp', '')
                                     if timestamp:
                                         # 시간만 표시 (HH:MM 형식)
-                                        try:
-                                            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                            time_str = dt.strftime('%H:%M')
-                                        except:
+                                        parsed = _parse_ts(timestamp)
+                                        if parsed:
+                                            time_str = parsed[1][:5]
+                                        else:
                                             time_str = timestamp[-8:-3] if len(timestamp) > 8 else timestamp
                                     else:
                                         time_str = "N/A"
@@ -2028,8 +1936,7 @@ def main():
                 # 비활성 상태는 위에서 이미 표시했으므로 중복 제거
                 
                 # 상태 새로고침
-                if st.button("🔄 상태 새로고침", use_container_width=True, key="refresh_automation"):
-                    st.rerun()
+                st.button("🔄 상태 새로고침", use_container_width=True, key="refresh_automation", on_click=_load_state_cached.clear)
 
             # 자율 에이전트 실시간 알림 위젯
             if st.session_state.get('autonomous_agent'):
@@ -2041,20 +1948,10 @@ def main():
                     notifications = autonomous_agent.get_notifications(limit=3)
 
                     if notifications:
+                        # 카드 HTML은 모아서 마크다운 한 번으로, 승인 버튼은 그 아래 한 줄로 표시
+                        cards = []
+                        actionable = []
                         for notification in notifications:
-                            level_colors = {
-                                "info": "#3b82f6",
-                                "warning": "#f59e0b",
-                                "critical": "#ef4444",
-                                "emergency": "#dc2626"
-                            }
-                            level_icons = {
-                                "info": "ℹ️",
-                                "warning": "⚠️",
-                                "critical": "🚨",
-                                "emergency": "🆘"
-                            }
-
                             # 알림 level 처리 (문자열 또는 enum 값)
                             level_str = notification.get('level', 'info')
                             if hasattr(level_str, 'value'):
@@ -2064,211 +1961,95 @@ def main():
                             else:
                                 level_str = str(level_str).lower()
 
-                            color = level_colors.get(level_str.lower(), "#6b7280")
-                            icon = level_icons.get(level_str.lower(), "📢")
+                            # 알림 데이터 안전하게 추출
+                            title = notification.get('title', notification.get('message', '알림'))
+                            message = notification.get('message', '')
+                            timestamp = notification.get('timestamp')
 
-                            with st.container():
-                                # 알림 데이터 안전하게 추출
-                                title = notification.get('title', notification.get('message', '알림'))
-                                message = notification.get('message', '')
-                                timestamp = notification.get('timestamp')
-                                
-                                # 타임스탬프 처리
-                                if timestamp:
-                                    if hasattr(timestamp, 'strftime'):
-                                        time_str = timestamp.strftime('%H:%M:%S')
-                                    else:
-                                        # 문자열 형태의 timestamp 처리
-                                        try:
-                                            if isinstance(timestamp, str):
-                                                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                                time_str = dt.strftime('%H:%M:%S')
-                                            else:
-                                                time_str = str(timestamp)
-                                        except:
-                                            time_str = str(timestamp)
+                            # 타임스탬프 처리
+                            if timestamp:
+                                if hasattr(timestamp, 'strftime'):
+                                    time_str = timestamp.strftime('%H:%M:%S')
                                 else:
-                                    time_str = "N/A"
-                                
-                                st.markdown(f"""
-                                <div style="border-left: 3px solid {color}; padding: 8px 12px; margin: 6px 0; background: #f8fafc; border-radius: 0 6px 6px 0;">
-                                    <strong style="color: {color};">{icon} {title}</strong><br>
-                                    <small style="color: #6b7280;">{time_str}</small><br>
-                                    <span style="font-size: 13px;">{message[:100]}{'...' if len(message) > 100 else ''}</span>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # 승인이 필요한 경우 미니 버튼
-                                action_required = notification.get('action_required', False)
-                                action_id = notification.get('action_id')
-                                if action_required and action_id:
-                                    col1, col2 = st.columns(2)
-                                    with col1:
-                                        if st.button("✅", key=f"mini_approve_{action_id}", help="승인"):
-                                            if autonomous_agent.approve_action(action_id):
-                                                st.toast("승인 완료!", icon="✅")
-                                                st.rerun()
-                                    with col2:
-                                        if st.button("❌", key=f"mini_reject_{action_id}", help="거부"):
-                                            if autonomous_agent.reject_action(action_id):
-                                                st.toast("거부 완료", icon="❌")
-                                                st.rerun()
+                                    # 문자열 형태의 timestamp 처리
+                                    parsed = _parse_ts(timestamp) if isinstance(timestamp, str) else None
+                                    time_str = parsed[1] if parsed else str(timestamp)
+                            else:
+                                time_str = "N/A"
+
+                            cards.append(_notification_card_html(level_str.lower(), title, time_str, message[:101]))
+
+                            # 승인이 필요한 알림만 버튼 대상으로 수집
+                            action_id = notification.get('action_id')
+                            if notification.get('action_required', False) and action_id:
+                                actionable.append((action_id, title))
+
+                        st.markdown("".join(cards), unsafe_allow_html=True)
+
+                        # 승인이 필요한 경우 미니 버튼 (action_id 기준 키)
+                        if actionable:
+                            action_cols = st.columns(len(actionable) * 2)
+                            for i, (action_id, title) in enumerate(actionable):
+                                with action_cols[i * 2]:
+                                    if st.button("✅", key=f"mini_approve_{action_id}", help=f"승인: {title}"):
+                                        if autonomous_agent.approve_action(action_id):
+                                            st.toast("승인 완료!", icon="✅")
+                                            st.rerun()
+                                with action_cols[i * 2 + 1]:
+                                    if st.button("❌", key=f"mini_reject_{action_id}", help=f"거부: {title}"):
+                                        if autonomous_agent.reject_action(action_id):
+                                            st.toast("거부 완료", icon="❌")
+                                            st.rerun()
                     else:
                         st.info("🔕 현재 알림이 없습니다.")
 
             # 파일 업로드 위젯
             with st.container(border=True):
-                st.subheader("📤 파일 업로드")
-
-                # 업로드 완료 메시지 표시
-                if 'upload_success_msg' in st.session_state:
-                    st.success(st.session_state.upload_success_msg)
-                    del st.session_state.upload_success_msg
-
-                # 업로드 위젯 초기화를 위한 동적 키
-                upload_key = st.session_state.get('upload_widget_key', 0)
-
-                uploaded_file = st.file_uploader(
-                    "파일 선택",
-                    label_visibility="collapsed",
-                    key=f"file_uploader_{upload_key}"
-                )
-                if uploaded_file:
-                    if st.button("📤 업로드", use_container_width=True, type="primary"):
-                        storage = st.session_state.get('storage')
-                        if storage:
-                            # 진행률 표시를 위한 컨테이너 생성
-                            progress_container = st.container()
-                            status_container = st.container()
-                            
-                            with progress_container:
-                                progress_bar = st.progress(0)
-                                status_text = st.empty()
-                            
-                            try:
-                                # 1단계: 파일 데이터 읽기
-                                status_text.text("📁 파일 데이터 읽는 중...")
-                                progress_bar.progress(10)
-                                file_data = uploaded_file.getvalue()
-                                
-                                # 2단계: 중복 파일 확인
-                                status_text.text("🔍 중복 파일 확인 중...")
-                                progress_bar.progress(20)
-                                
-                                # 중복 확인을 위한 별도 메서드 호출
-                                existing_file = storage.check_file_exists(uploaded_file.name)
-                                if existing_file:
-                                    progress_bar.progress(100)
-                                    status_text.text("⚠️ 파일이 이미 존재합니다.")
-                                    st.warning(f"파일 '{uploaded_file.name}'이 이미 존재합니다. (ID: {existing_file['id']})")
-                                    st.info("다른 이름으로 파일을 저장하거나 기존 파일을 사용하세요.")
-                                    return
-                                
-                                # 3단계: 파일 내용 처리 및 임베딩 생성
-                                status_text.text("🔄 파일 내용 처리 중...")
-                                progress_bar.progress(30)
-                                
-                                # 파일 확장자 확인
-                                file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-                                if file_extension in ['.pdf', '.txt', '.docx']:
-                                    status_text.text("📄 문서 내용 분석 중...")
-                                    progress_bar.progress(40)
-                                    
-                                    status_text.text("✂️ 텍스트 청크 분할 중...")
-                                    progress_bar.progress(60)
-                                    
-                                    status_text.text("🧠 임베딩 생성 중...")
-                                    progress_bar.progress(80)
-                                
-                                # 4단계: 파일 저장
-                                status_text.text("💾 데이터베이스에 저장 중...")
-                                progress_bar.progress(90)
-                                
-                                file_id = storage.save_file(file_data, uploaded_file.name, metadata={"source": "streamlit_upload"})
-                                
-                                if file_id:
-                                    progress_bar.progress(100)
-                                    status_text.text("✅ 업로드 완료!")
-
-                                    # 파일 정보 준비
-                                    file_size = len(file_data)
-                                    if file_size > 1024 * 1024:
-                                        size_str = f"{file_size / (1024 * 1024):.1f} MB"
-                                    elif file_size > 1024:
-                                        size_str = f"{file_size / 1024:.1f} KB"
-                                    else:
-                                        size_str = f"{file_size} bytes"
-
-                                    # 청크 정보 (PDF, TXT, DOCX인 경우)
-                                    chunk_info = ""
-                                    if file_extension in ['.pdf', '.txt', '.docx']:
-                                        chunk_count = storage.get_chunk_count(file_id)
-                                        if chunk_count:
-                                            chunk_info = f" | 청크: {chunk_count}개"
-
-                                    # 성공 메시지를 세션에 저장 (다음 렌더링에서 표시)
-                                    st.session_state.upload_success_msg = (
-                                        f"✅ **'{uploaded_file.name}'** 업로드 완료!\n\n"
-                                        f"📊 크기: {size_str} | ID: {file_id}{chunk_info}"
-                                    )
-
-                                    # 파일 목록 즉시 갱신을 위해 세션 상태 초기화
-                                    if 'postgres_files' in st.session_state:
-                                        del st.session_state['postgres_files']
-
-                                    # 업로드 위젯 초기화를 위한 키 증가
-                                    current_key = st.session_state.get('upload_widget_key', 0)
-                                    st.session_state.upload_widget_key = current_key + 1
-
-                                    # 즉시 새로고침 (메시지는 다음 렌더링에서 표시)
-                                    time.sleep(1)
-                                    st.rerun()
-                                else:
-                                    progress_bar.progress(0)
-                                    status_text.text("❌ 업로드 실패")
-                                    st.error("파일 업로드에 실패했습니다.")
-                                    
-                            except Exception as e:
-                                progress_bar.progress(0)
-                                status_text.text("❌ 오류 발생")
-                                st.error(f"업로드 중 오류가 발생했습니다: {str(e)}")
-                                logger.error(f"파일 업로드 오류: {e}")
-                        else:
-                            st.error("스토리지 시스템이 초기화되지 않았습니다.")
+                _render_upload_panel()
 
             # 파일 목록 위젯
             with st.container(border=True):
                 st.subheader("📂 파일 목록")
                 storage = st.session_state.get('storage')
                 if storage:
-                    # 파일 목록 조회 (캐시 사용)
-                    if 'postgres_files' not in st.session_state:
-                        with st.spinner("파일 목록 로딩 중..."):
-                            try:
-                                st.session_state.postgres_files = storage.list_files()
-                            except Exception as e:
-                                st.error(f"파일 목록 로딩 실패: {e}")
-                                st.session_state.postgres_files = []
-
-                    file_list = st.session_state.postgres_files
+                    # 파일 목록 조회 (files_version 기준 캐시, 현재 페이지만 조회)
+                    try:
+                        total_files = _count_files(st.session_state.files_version, storage)
+                        page_count = max(1, -(-total_files // FILE_LIST_PAGE_SIZE))
+                        page = min(st.session_state.files_page, page_count - 1)
+                        file_list = _list_files(st.session_state.files_version, page, storage)
+                    except Exception as e:
+                        st.error(f"파일 목록 로딩 실패: {e}")
+                        total_files, page_count, page, file_list = 0, 1, 0, []
 
                     if not file_list:
                         st.info("📭 업로드된 파일이 없습니다.")
                     else:
-                        st.success(f"📊 총 {len(file_list)}개의 파일")
+                        st.success(f"📊 총 {total_files}개의 파일")
+
+                        if page_count > 1:
+                            col_prev, col_page, col_next = st.columns([1, 2, 1])
+                            with col_prev:
+                                if st.button("◀", key="files_prev", disabled=page == 0, use_container_width=True):
+                                    st.session_state.files_page = page - 1
+                                    st.rerun()
+                            with col_page:
+                                first_row = page * FILE_LIST_PAGE_SIZE + 1
+                                last_row = first_row + len(file_list) - 1
+                                st.caption(f"{first_row}-{last_row} / {total_files} ({page + 1}/{page_count} 페이지)")
+                            with col_next:
+                                if st.button("▶", key="files_next", disabled=page >= page_count - 1, use_container_width=True):
+                                    st.session_state.files_page = page + 1
+                                    st.rerun()
+
+                        # 준비 버튼을 누르기 전에 상단 파일 내용을 백그라운드에서 조회
+                        _prefetch_files(storage, file_list)
 
                         for idx, file_info in enumerate(file_list):
                             file_id = file_info.get('_id')
                             filename = file_info.get('filename', 'N/A')
 
-                            # 파일 크기 계산
-                            file_size = file_info.get('length', 0)
-                            if file_size > 1024 * 1024:
-                                size_str = f"{file_size / (1024 * 1024):.2f} MB"
-                            elif file_size > 1024:
-                                size_str = f"{file_size / 1024:.2f} KB"
-                            else:
-                                size_str = f"{file_size} bytes"
+                            size_str = human_size(file_info.get('length', 0))
 
                             # 업로드 날짜 파싱
                             upload_date = file_info.get('uploadDate', 'N/A')
@@ -2284,7 +2065,7 @@ def main():
                                 date_str = str(upload_date)
 
                             # 파일 카드
-                            file_content_key = f'file_content_{file_id}'
+                            prepared_content = st.session_state.prepared_files.get(file_id)
                             with st.container(border=True):
                                 col_info, col_btn = st.columns([3, 1])
 
@@ -2294,25 +2075,25 @@ def main():
 
                                 with col_btn:
                                     # 2단계 다운로드: 먼저 파일 준비, 그 다음 다운로드
-                                    if file_content_key not in st.session_state:
+                                    if prepared_content is None:
                                         # 다운로드 준비 버튼
                                         if st.button("⬇️", key=f"prepare_{idx}_{file_id}", use_container_width=True, help="클릭하여 다운로드 준비"):
                                             try:
                                                 with st.spinner("파일 로딩 중..."):
-                                                    file_content = storage.get_file_content_by_id(file_id)
+                                                    # get_file_content_by_id가 이미 bytes로 반환하므로 다시 복사하지 않음
+                                                    file_content = _fetch_file_content(storage, file_id)
                                                     if file_content:
-                                                        # Streamlit download_button은 bytes만 허용하므로 강제 변환
-                                                        st.session_state[file_content_key] = bytes(file_content)
+                                                        _store_prepared_file(file_id, file_content)
                                                         st.rerun()
                                                     else:
                                                         st.error("파일을 가져올 수 없습니다.")
                                             except Exception as e:
                                                 st.error(f"오류: {str(e)}")
                                     else:
-                                        # 실제 다운로드 버튼
+                                        # 실제 다운로드 버튼 (보관한 bytes를 그대로 전달)
                                         st.download_button(
                                             label="💾",
-                                            data=bytes(st.session_state[file_content_key]),
+                                            data=prepared_content,
                                             file_name=filename,
                                             key=f"download_btn_{idx}_{file_id}",
                                             use_container_width=True,
@@ -2326,6 +2107,7 @@ if __name__ == "__main__":
     # 초기 메시지 설정
     if len(st.session_state.messages) == 0:
         st.session_state.messages.append({
+            "id": uuid.uuid4().hex,
             "role": "assistant",
             "content": "안녕하세요! 좌측의 **🔄 시스템 초기화**를 먼저 눌러주세요.",
             "timestamp": datetime.now().strftime("%H:%M")
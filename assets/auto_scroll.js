@@ -0,0 +1,52 @@
+// Synergy ChatBot 채팅 자동 스크롤 (app.py에서 세션당 한 번 부모 문서에 주입)
+(function () {
+    // 같은 문서에 이미 설치되어 있으면 옵저버를 중복 등록하지 않음
+    if (window.__synergyAutoScroll) {
+        return;
+    }
+    window.__synergyAutoScroll = true;
+
+    let observedContainer = null;
+    let rafId = null;
+
+    // 내용 변경 시 스크롤을 맨 아래로 이동 (변경이 몰려도 프레임당 한 번만)
+    const scrollToBottom = () => {
+        if (rafId !== null) {
+            return;
+        }
+        rafId = requestAnimationFrame(() => {
+            rafId = null;
+            if (observedContainer) {
+                observedContainer.scrollTop = observedContainer.scrollHeight;
+            }
+        });
+    };
+
+    // 새 메시지 추가는 메시지 목록의 직접 자식 변경만 감시 (subtree 없이)
+    // 스트리밍 중 토큰마다 스크롤하지 않고, 응답 완료 시 app.py가 아래 함수를 한 번 호출
+    const observer = new MutationObserver(scrollToBottom);
+    window.__synergyScrollToBottom = scrollToBottom;
+
+    // 채팅 컨테이너(st.container key="chat_container")는 페이지 이동 등으로 다시 만들어질 수 있으므로
+    // 주기적으로 확인해 바뀌었을 때만 다시 연결
+    const attach = () => {
+        const container = document.querySelector('.st-key-chat_container');
+        if (container === observedContainer) {
+            return;
+        }
+        observer.disconnect();
+        observedContainer = container;
+        if (container) {
+            const messageList = container.querySelector(':scope > [data-testid="stVerticalBlock"]') || container;
+            observer.observe(messageList, { childList: true });
+            scrollToBottom();
+        }
+    };
+    attach();
+    setInterval(attach, 1000);
+
+    // 페이지를 떠날 때 Observer 연결 해제 (메모리 누수 방지)
+    window.addEventListener('beforeunload', () => {
+        observer.disconnect();
+    });
+})();
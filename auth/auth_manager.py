@@ -1,27 +1,185 @@
 # auth/auth_manager.py - 인증 관리 시스템
 
 import bcrypt
+import contextlib
+import functools
+import psycopg2
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
+from config import PG_DB_HOST, PG_DB_PORT, PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 성공한 bcrypt 검증 결과 캐시 크기/유지 시간 (초)
+VERIFY_CACHE_SIZE = 128
+VERIFY_CACHE_TTL_SECONDS = 300
+
+# 기본 관리자 계정 비밀번호 (users 테이블에 관리자가 없을 때만 해시해서 등록)
+DEFAULT_ADMIN_PASSWORD = "admin"
+
+# users 테이블 조회 결과 캐시 크기/유지 시간 (초)
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL_SECONDS = 60
+
+
+@functools.lru_cache(maxsize=1)
+def _default_admin_hash() -> str:
+    """기본 관리자 비밀번호의 bcrypt 해시 (프로세스당 한 번, 기본 계정을 등록할 때만 계산)"""
+    return bcrypt.hashpw(DEFAULT_ADMIN_PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
 
 class AuthManager:
     """사용자 인증 관리 클래스"""
 
     def __init__(self):
-        # 임시 사용자 데이터베이스 (실제로는 PostgreSQL 사용 권장)
-        self.users = {
-            "admin": {
-                "password_hash": bcrypt.hashpw("admin".encode('utf-8'), bcrypt.gensalt()).decode('utf-8'),
+        self.db_config = {
+            'host': PG_DB_HOST,
+            'port': PG_DB_PORT,
+            'database': PG_DB_NAME,
+            'user': PG_DB_USER,
+            'password': PG_DB_PASSWORD
+        }
+        # DB를 쓸 수 없을 때만 사용하는 대체 사용자 목록
+        self.users: Dict[str, Dict[str, Any]] = {}
+        # users 테이블 read-through 캐시 (username -> 사용자 레코드)
+        self._user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+        self._user_cache_lock = threading.Lock()
+        # 성공한 검증만 (해시, 비밀번호 HMAC) 키로 짧게 캐시 - 평문 비밀번호는 보관하지 않음
+        self._verify_cache_key = secrets.token_bytes(32)
+        self._verify_cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._verify_cache_lock = threading.Lock()
+        self._db_available = self._ensure_users_table()
+        if not self._db_available:
+            self.users["admin"] = {
+                "password_hash": _default_admin_hash(),
                 "role": "admin",
                 "name": "관리자"
             }
-        }
         logger.info("인증 관리자 초기화 완료")
 
+    @contextlib.contextmanager
+    def get_connection(self):
+        """PostgreSQL 연결 (블록을 벗어나면 커밋/롤백 후 연결 종료)"""
+        conn = psycopg2.connect(**self.db_config)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_users_table(self) -> bool:
+        """users 테이블 생성 및 기본 관리자 계정 등록 (DB에 연결할 수 없으면 메모리 사용자 목록만 사용)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS users (
+                            username VARCHAR(255) PRIMARY KEY,
+                            password_hash TEXT NOT NULL,
+                            role VARCHAR(50) NOT NULL DEFAULT 'user',
+                            name VARCHAR(255)
+                        )
+                    """)
+                    # 기본 관리자가 없을 때만 해시 계산 후 등록 (변경된 비밀번호는 덮어쓰지 않음)
+                    cur.execute("SELECT 1 FROM users WHERE username = %s", ("admin",))
+                    if cur.fetchone() is None:
+                        cur.execute("""
+                            INSERT INTO users (username, password_hash, role, name)
+                            VALUES (%s, %s, %s, %s)
+                            ON CONFLICT (username) DO NOTHING
+                        """, ("admin", _default_admin_hash(), "admin", "관리자"))
+            return True
+        except Exception as e:
+            logger.warning(f"users 테이블을 사용할 수 없어 메모리 사용자 목록으로 동작합니다: {e}")
+            return False
+
+    def _get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        """사용자 레코드 조회 (캐시 → users 테이블, DB를 쓸 수 없을 때만 메모리 목록)
+
+        DB 조회가 실패하면 메모리 기본 계정으로 넘어가지 않고 None을 반환합니다.
+        """
+        if not self._db_available:
+            return self.users.get(username)
+
+        with self._user_cache_lock:
+            user = self._user_cache.get(username)
+        if user is not None:
+            return user
+
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT password_hash, role, name FROM users WHERE username = %s",
+                        (username,)
+                    )
+                    row = cur.fetchone()
+        except Exception as e:
+            logger.error(f"사용자 조회 오류: {e}")
+            return None
+
+        if not row:
+            return None
+        user = {"password_hash": row[0], "role": row[1], "name": row[2]}
+        with self._user_cache_lock:
+            self._user_cache[username] = user
+        return user
+
+    def _invalidate_user(self, username: str):
+        """사용자 캐시 항목 제거"""
+        with self._user_cache_lock:
+            self._user_cache.pop(username, None)
+
+    def _upsert_user(self, username: str, password_hash: str, role: str, name: str) -> bool:
+        """users 테이블에 사용자 저장 (DB를 쓸 수 없으면 False)"""
+        if not self._db_available:
+            return False
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO users (username, password_hash, role, name)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (username) DO UPDATE
+                    SET password_hash = EXCLUDED.password_hash,
+                        role = EXCLUDED.role,
+                        name = EXCLUDED.name
+                """, (username, password_hash, role, name))
+        return True
+
+    def _check_password(self, password: str, password_hash: str) -> bool:
+        """bcrypt 비밀번호 검증 (최근 성공한 조합은 bcrypt 없이 캐시로 확인)
+
+        bcrypt는 의도적으로 느리므로 같은 자격 증명이 반복되면 캐시를 사용합니다.
+        실패한 검증은 캐시하지 않아 무차별 대입 비용은 그대로 유지됩니다.
+        비밀번호가 바뀌면 해시가 달라지므로 이전 캐시는 자연히 맞지 않게 됩니다.
+        """
+        digest = hmac.new(self._verify_cache_key, password.encode('utf-8'), hashlib.sha256).digest()
+        cache_key = (password_hash, digest)
+        now = time.monotonic()
+        with self._verify_cache_lock:
+            cached_at = self._verify_cache.get(cache_key)
+            if cached_at is not None and now - cached_at < VERIFY_CACHE_TTL_SECONDS:
+                self._verify_cache.move_to_end(cache_key)
+                return True
+
+        if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+            return False
+
+        with self._verify_cache_lock:
+            self._verify_cache[cache_key] = now
+            self._verify_cache.move_to_end(cache_key)
+            while len(self._verify_cache) > VERIFY_CACHE_SIZE:
+                self._verify_cache.popitem(last=False)
+        return True
+
     def verify_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """사용자 인증 확인
 
@@ -33,14 +191,13 @@ class AuthManager:
             Optional[Dict]: 인증 성공 시 사용자 정보, 실패 시 None
         """
         try:
-            user = self.users.get(username)
+            user = self._get_user(username)
             if not user:
                 logger.warning(f"존재하지 않는 사용자: {username}")
                 return None
 
             # 비밀번호 검증
-            password_hash = user['password_hash'].encode('utf-8')
-            if bcrypt.checkpw(password.encode('utf-8'), password_hash):
+            if self._check_password(password, user['password_hash']):
                 logger.info(f"사용자 인증 성공: {username}")
                 return {
                     "username": username,
@@ -66,11 +223,13 @@ class AuthManager:
         """
         try:
             password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            self.users[username] = {
-                "password_hash": password_hash,
-                "role": role,
-                "name": name
-            }
+            if not self._upsert_user(username, password_hash, role, name):
+                self.users[username] = {
+                    "password_hash": password_hash,
+                    "role": role,
+                    "name": name
+                }
+            self._invalidate_user(username)
             logger.info(f"새 사용자 추가: {username} (역할: {role})")
         except Exception as e:
             logger.error(f"사용자 추가 오류: {e}")
@@ -94,7 +253,10 @@ class AuthManager:
 
             # 새 비밀번호 설정
             password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            self.users[username]["password_hash"] = password_hash
+            user = self._get_user(username)
+            if not self._upsert_user(username, password_hash, user["role"], user["name"]):
+                self.users[username]["password_hash"] = password_hash
+            self._invalidate_user(username)
             logger.info(f"비밀번호 변경 성공: {username}")
             return True
 
@@ -111,7 +273,7 @@ class AuthManager:
         Returns:
             Optional[Dict]: 사용자 정보 (비밀번호 해시 제외)
         """
-        user = self.users.get(username)
+        user = self._get_user(username)
         if user:
             return {
                 "username": username,
@@ -121,13 +283,17 @@ class AuthManager:
         return None
 
 
-# 전역 인증 관리자 인스턴스
-_auth_manager: Optional[AuthManager] = None
+# 전역 인증 관리자 생성 잠금 (lru_cache는 동시 첫 호출에서 생성자를 두 번 실행할 수 있음)
+_auth_manager_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _create_auth_manager() -> AuthManager:
+    """인증 관리자 생성 (프로세스당 한 번)"""
+    return AuthManager()
 
 
 def get_auth_manager() -> AuthManager:
     """전역 인증 관리자 인스턴스 반환"""
-    global _auth_manager
-    if _auth_manager is None:
-        _auth_manager = AuthManager()
-    return _auth_manager
+    with _auth_manager_lock:
+        return _create_auth_manager()
@@ -4,9 +4,9 @@ import streamlit as st
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import threading
+from typing import Dict, List, Any, Optional
 import time
+from collections import Counter
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -48,12 +48,190 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 자동화 상태 단계별 표시 (활성 개수: 자동화 엔진 + 자율 모니터링)
+# 아이콘, 상태 문구, 설명
+_STATUS_LEVELS = {
+    2: ("🟢", "완전 활성", "모든 시스템이 정상 작동 중"),
+    1: ("🟡", "부분 활성", "일부 시스템만 활성화됨"),
+    0: ("🔴", "비활성", "자동화 시스템 중지됨"),
+}
+
+def _status_level(automation_active: bool, monitoring_active: bool) -> int:
+    """활성화된 자동화 구성 요소 수 (0~2)"""
+    return int(bool(automation_active)) + int(bool(monitoring_active))
+
+@st.cache_resource(show_spinner=False)
+def _storage() -> PostgreSQLStorage:
+    """PostgreSQL 스토리지 싱글톤 (프로세스당 한 번 조회)"""
+    return PostgreSQLStorage.get_instance()
+
+@st.cache_resource(show_spinner=False)
+def _dashboard_singletons() -> tuple:
+    """대시보드가 쓰는 전역 객체 (로거, 상태 관리자, 비동기 캐시, 세션 동기화)"""
+    return (
+        get_automation_logger(),
+        get_state_manager(),
+        get_async_state_manager(),
+        get_streamlit_state_sync()
+    )
+
+# 배수지 수위 상태 코드 (세션에는 코드만 저장하고 표시 문구는 렌더링 때 매핑)
+LEVEL_UNKNOWN, LEVEL_CRITICAL, LEVEL_WARNING, LEVEL_NORMAL, LEVEL_HIGH, LEVEL_VERY_HIGH = range(-1, 5)
+
+# 상태 코드별 아이콘, 상태 문구, delta 색상, delta 문구
+_LEVEL_STATUS_DISPLAY = {
+    LEVEL_CRITICAL: ('🔴', '매우 낮음', 'inverse', '위험'),
+    LEVEL_WARNING: ('🟡', '낮음', 'off', '주의'),
+    LEVEL_NORMAL: ('🟢', '정상', 'normal', '정상'),
+    LEVEL_HIGH: ('🔵', '높음', 'off', '높음'),
+    LEVEL_VERY_HIGH: ('🔵', '매우 높음', 'off', '높음'),
+    LEVEL_UNKNOWN: ('⚪', '알 수 없음', 'off', 'N/A')
+}
+
+def _log_time(timestamp) -> str:
+    """로그 시각을 HH:MM:SS로 변환 (ISO 형식이 아니면 "날짜 시간" 형식으로 보고 자름)"""
+    timestamp = str(timestamp or '')
+    try:
+        return datetime.fromisoformat(timestamp).strftime('%H:%M:%S')
+    except ValueError:
+        return timestamp.partition(' ')[2][:8] or timestamp[:8] or "N/A"
+
+def _automation_flags() -> tuple:
+    """세션의 (자동화 엔진 활성, 자율 모니터링 활성) 상태"""
+    return (
+        st.session_state.get('automation_status', False),
+        st.session_state.get('autonomous_monitoring', False)
+    )
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _fetch_24h_water() -> pd.DataFrame:
+    """최근 24시간 수위/펌프 데이터를 1분 단위로 집계해 조회 (10초 캐시 - 그래프 전용)
+
+    원본 행을 모두 가져오지 않고 DB에서 분 단위 평균으로 줄여 최대 1440행만 받습니다.
+    펌프 상태는 평균이 아니라 각 분의 마지막 측정값을 사용합니다.
+    배수지 카드의 현재값은 평균이 아닌 원본 최신 행을 써야 하므로 _fetch_latest_water를 사용합니다.
+    """
+    storage = _storage()
+
+    # 최근 24시간 데이터 조회
+    query = """
+        SELECT date_trunc('minute', measured_at) AS measured_at,
+               MAX(measured_at) AS last_measured_at,
+               AVG(gagok_water_level) AS gagok_water_level,
+               (array_agg(gagok_pump_a ORDER BY measured_at DESC))[1] AS gagok_pump_a,
+               AVG(haeryong_water_level) AS haeryong_water_level,
+               (array_agg(haeryong_pump_a ORDER BY measured_at DESC))[1] AS haeryong_pump_a
+        FROM water
+        WHERE measured_at >= NOW() - INTERVAL '24 hours'
+        GROUP BY 1
+        ORDER BY 1
+    """
+
+    with storage.pooled_connection() as conn, conn.cursor() as cursor:
+        # 매번 같은 쿼리이므로 연결별 prepared statement로 실행
+        storage.execute_prepared(cursor, "water_24h", query)
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+
+    # read_sql_query를 거치지 않고 튜플에서 바로 DataFrame 생성 (수위는 float32로 충분)
+    df = pd.DataFrame(rows, columns=columns)
+    for col in ('gagok_water_level', 'haeryong_water_level'):
+        df[col] = df[col].astype('float32')
+    for col in ('measured_at', 'last_measured_at'):
+        df[col] = pd.to_datetime(df[col], cache=True)
+    return df
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _fetch_latest_water() -> Optional[dict]:
+    """배수지 카드용 최신 원본 측정 행 조회 (10초 캐시, 집계하지 않은 실제 마지막 측정값)"""
+    storage = _storage()
+
+    query = """
+        SELECT measured_at, gagok_water_level, gagok_pump_a,
+               haeryong_water_level, haeryong_pump_a
+        FROM water
+        ORDER BY measured_at DESC
+        LIMIT 1
+    """
+
+    with storage.pooled_connection() as conn, conn.cursor() as cursor:
+        storage.execute_prepared(cursor, "water_latest", query)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [desc[0] for desc in cursor.description]
+    return dict(zip(columns, row))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _build_water_fig(signature: tuple, _df: pd.DataFrame) -> go.Figure:
+    """24시간 수위 그래프 생성 (데이터 서명이 같으면 만들어 둔 Figure 재사용)
+
+    Args:
+        signature: (행 수, 첫 구간 시각, 마지막 측정 시각) - 데이터가 바뀌었는지 판단하는 키
+        _df: _fetch_24h_water 결과 (해시하지 않음)
+    """
+    # 점이 많으면 마커 없이 선만 표시
+    trace_mode = 'lines' if len(_df) > 500 else 'lines+markers'
+
+    # Plotly 그래프 생성 (Scattergl - SVG 대신 WebGL로 그려 점이 많아도 가벼움)
+    fig = go.Figure()
+
+    # 가곡 배수지 라인
+    fig.add_trace(go.Scattergl(
+        x=_df['measured_at'],
+        y=_df['gagok_water_level'],
+        mode=trace_mode,
+        name='가곡 배수지',
+        line=dict(color='#007bff', width=3),
+        marker=dict(size=4),
+        hovertemplate='<b>가곡</b><br>시간: %{x}<br>수위: %{y:.1f}%<extra></extra>'
+    ))
+
+    # 해룡 배수지 라인
+    fig.add_trace(go.Scattergl(
+        x=_df['measured_at'],
+        y=_df['haeryong_water_level'],
+        mode=trace_mode,
+        name='해룡 배수지',
+        line=dict(color='#28a745', width=3),
+        marker=dict(size=4),
+        hovertemplate='<b>해룡</b><br>시간: %{x}<br>수위: %{y:.1f}%<extra></extra>'
+    ))
+
+    # 레이아웃 설정
+    fig.update_layout(
+        xaxis_title='시간',
+        yaxis_title='수위 (%)',
+        hovermode='x unified',
+        height=450,
+        margin=dict(l=20, r=20, t=20, b=20),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis=dict(
+            gridcolor='rgba(128,128,128,0.2)',
+            range=[0, 100]
+        )
+    )
+
+    # 수위 경계선 추가 (위험 수준)
+    fig.add_hline(y=10, line_dash="dot", line_color="red", line_width=1,
+                 annotation_text="매우 낮음", annotation_position="right")
+    fig.add_hline(y=30, line_dash="dash", line_color="orange", line_width=1,
+                 annotation_text="낮음", annotation_position="right")
+    fig.add_hline(y=70, line_dash="dash", line_color="blue", line_width=1,
+                 annotation_text="높음", annotation_position="right")
+
+    return fig
+
 class SimpleAutomationDashboard:
     def __init__(self):
-        self.logger = get_automation_logger()
-        self.state_manager = get_state_manager()
-        self.async_manager = get_async_state_manager()
-        self.state_sync = get_streamlit_state_sync()
+        self.logger, self.state_manager, self.async_manager, self.state_sync = _dashboard_singletons()
         
         # 세션 상태 초기화
         self._init_session_state()
@@ -81,15 +259,16 @@ class SimpleAutomationDashboard:
         # 배수지 데이터 초기화
         if 'reservoir_data' not in st.session_state:
             st.session_state.reservoir_data = {
-                'gagok': {'name': '가곡 배수지', 'level': 0, 'pump': 'OFF', 'status': 'unknown'},
-                'haeryong': {'name': '해룡 배수지', 'level': 0, 'pump': 'OFF', 'status': 'unknown'}
+                'gagok': {'name': '가곡 배수지', 'level': 0, 'pump': 'OFF', 'status': LEVEL_UNKNOWN},
+                'haeryong': {'name': '해룡 배수지', 'level': 0, 'pump': 'OFF', 'status': LEVEL_UNKNOWN}
             }
     
     def run(self):
         """메인 대시보드 실행"""
         try:
             # 사이드바 구성
-            self._render_sidebar()
+            automation_active, monitoring_active = _automation_flags()
+            self._render_sidebar(automation_active, monitoring_active)
 
             # 헤더
             st.title("🤖 자동화 시스템 대시보드")
@@ -107,39 +286,30 @@ class SimpleAutomationDashboard:
                 st.session_state.autonomous_monitoring = False
                 st.session_state.last_logs = []
 
+            # 데이터 로드 후 상태/현재 시각을 한 번만 읽어 아래 섹션에 전달
+            automation_active, monitoring_active = _automation_flags()
+            now_str = get_current_timestamp()
+
             # === 첫 번째 섹션: 시스템 상태 (전체 폭) ===
-            self._render_main_status()
+            self._render_main_status(automation_active, monitoring_active, now_str)
 
             st.divider()
 
             # === 두 번째 섹션: 빠른 제어 (컴팩트) ===
-            self._render_controls()
-
-            st.divider()
-
-            # === 세 번째 섹션: 배수지 상태 (1:1 비율) ===
-            st.subheader("💧 배수지 실시간 상태")
-
-            col_gagok, col_haeryong = st.columns(2)
-
-            with col_gagok:
-                self._render_reservoir_card('gagok')
-
-            with col_haeryong:
-                self._render_reservoir_card('haeryong')
+            self._render_controls(automation_active)
 
             st.divider()
 
-            # === 네 번째 섹션: 수위 그래프 (전체 폭) ===
-            self._render_water_level_graph()
+            # === 세 번째/네 번째 섹션: 배수지 상태 (1:1 비율) + 수위 그래프 (전체 폭) ===
+            self._render_live_section()
 
             st.divider()
 
             # === 다섯 번째 섹션: 활동 로그 (전체 폭) ===
             self._render_logs()
 
-            # 자동 업데이트 (새로고침 없이)
-            self._setup_auto_update()
+            # 자동화 상태 주기 확인 (백그라운드 스레드 없이 fragment로 실행)
+            self._refresh_status()
 
         except Exception as e:
             st.error(f"대시보드 실행 중 오류 발생: {e}")
@@ -150,30 +320,13 @@ class SimpleAutomationDashboard:
             print(f"Dashboard Error: {e}")
             print(traceback.format_exc())
 
-    def _render_sidebar(self):
+    def _render_sidebar(self, automation_active: bool, monitoring_active: bool):
         """사이드바 렌더링"""
         # 시스템 상태 표시
-        automation_active = st.session_state.get('automation_status', False)
-        monitoring_active = st.session_state.get('autonomous_monitoring', False)
-
-        # 상태 색상 및 텍스트
-        if automation_active and monitoring_active:
-            status_color = "#16a34a"  # 녹색
-            status_text = "🟢 완전 활성"
-        elif automation_active or monitoring_active:
-            status_color = "#f59e0b"  # 주황색
-            status_text = "🟡 부분 활성"
-        else:
-            status_color = "#6b7280"  # 회색
-            status_text = "🔴 비활성"
-
-        st.sidebar.markdown(f"""
-        <div style="padding: 12px; background: {status_color}15; border: 2px solid {status_color};
-                    border-radius: 8px; margin: 10px 0;">
-            <h4 style="margin: 0; color: {status_color};">자동화 상태</h4>
-            <p style="margin: 5px 0 0 0; color: {status_color}; font-weight: bold;">{status_text}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        status_icon, status_text, _ = _STATUS_LEVELS[_status_level(automation_active, monitoring_active)]
+        with st.sidebar.container(border=True):
+            st.markdown("**자동화 상태**")
+            st.markdown(f"{status_icon} **{status_text}**")
 
         # 네비게이션 버튼
         st.sidebar.markdown("### 🧭 네비게이션")
@@ -204,8 +357,9 @@ class SimpleAutomationDashboard:
         # 시스템 정보
         st.sidebar.markdown("### 📊 시스템 정보")
 
-        gagok_data = st.session_state.reservoir_data.get('gagok', {})
-        haeryong_data = st.session_state.reservoir_data.get('haeryong', {})
+        reservoirs = st.session_state.reservoir_data
+        gagok_data = reservoirs.get('gagok', {})
+        haeryong_data = reservoirs.get('haeryong', {})
 
         st.sidebar.caption(f"**가곡 수위:** {gagok_data.get('level', 0):.1f}%")
         st.sidebar.caption(f"**해룡 수위:** {haeryong_data.get('level', 0):.1f}%")
@@ -217,8 +371,8 @@ class SimpleAutomationDashboard:
             self.async_manager.clear_cache('automation_status')
             self.async_manager.clear_cache('recent_logs')
             st.session_state.reservoir_data = {
-                'gagok': {'name': '가곡 배수지', 'level': 0, 'pump': 'OFF', 'status': 'unknown'},
-                'haeryong': {'name': '해룡 배수지', 'level': 0, 'pump': 'OFF', 'status': 'unknown'}
+                'gagok': {'name': '가곡 배수지', 'level': 0, 'pump': 'OFF', 'status': LEVEL_UNKNOWN},
+                'haeryong': {'name': '해룡 배수지', 'level': 0, 'pump': 'OFF', 'status': LEVEL_UNKNOWN}
             }
             st.rerun()
 
@@ -267,37 +421,31 @@ class SimpleAutomationDashboard:
             # 로그도 캐시 사용
             logs = self.async_manager.get_cached_data('recent_logs', fetch_logs)
             if logs:
+                # 표시용 시각은 렌더링마다가 아니라 로그를 받을 때 한 번만 계산
+                for log in logs:
+                    if 'time_str' not in log:
+                        log['time_str'] = _log_time(log.get('timestamp'))
                 st.session_state.last_logs = logs
                 
         except Exception as e:
             # 에러 시 기존 상태 유지
             pass
     
-    def _render_main_status(self):
+    def _render_main_status(self, automation_active: bool, monitoring_active: bool, now_str: str):
         """메인 상태 표시"""
-        automation_active = st.session_state.get('automation_status', False)
-        monitoring_active = st.session_state.get('autonomous_monitoring', False)
-
         # 자동화 상태 결정
-        if automation_active and monitoring_active:
-            status_icon = "🟢"
-            status_text = "완전 활성"
-            status_message = "모든 시스템이 정상 작동 중"
-        elif automation_active or monitoring_active:
-            status_icon = "🟡"
-            status_text = "부분 활성"
-            status_message = "일부 시스템만 활성화됨"
-        else:
-            status_icon = "🔴"
-            status_text = "비활성"
-            status_message = "자동화 시스템 중지됨"
+        status_icon, status_text, status_message = _STATUS_LEVELS[
+            _status_level(automation_active, monitoring_active)
+        ]
 
         # 배수지 상태 요약
-        gagok_data = st.session_state.reservoir_data.get('gagok', {})
-        haeryong_data = st.session_state.reservoir_data.get('haeryong', {})
+        reservoirs = st.session_state.reservoir_data
+        gagok_data = reservoirs.get('gagok', {})
+        haeryong_data = reservoirs.get('haeryong', {})
 
-        critical_count = sum(1 for data in [gagok_data, haeryong_data] if data.get('status') == 'critical')
-        warning_count = sum(1 for data in [gagok_data, haeryong_data] if data.get('status') == 'warning')
+        statuses = Counter(data.get('status') for data in (gagok_data, haeryong_data))
+        critical_count = statuses[LEVEL_CRITICAL]
+        warning_count = statuses[LEVEL_WARNING]
         normal_count = 2 - critical_count - warning_count
 
         # 상태 표시
@@ -339,14 +487,12 @@ class SimpleAutomationDashboard:
         elif warning_count > 0:
             st.warning(f"⚠️ {warning_count}개 배수지가 경고 수위입니다.", icon="⚠️")
 
-        st.caption(f"⏰ 마지막 업데이트: {get_current_timestamp()}")
+        st.caption(f"⏰ 마지막 업데이트: {now_str}")
     
-    def _render_controls(self):
+    def _render_controls(self, automation_active: bool):
         """제어 패널"""
         st.subheader("⚙️ 빠른 제어")
 
-        automation_active = st.session_state.get('automation_status', False)
-
         # 4개 버튼 한 행 배치
         col1, col2, col3, col4 = st.columns(4)
 
@@ -403,31 +549,37 @@ class SimpleAutomationDashboard:
             st.session_state.last_action_result = None
     
     def _execute_action(self, action: str):
-        """액션 실행 (안전한 오류 처리)"""
+        """액션 실행 (안전한 오류 처리)
+
+        결과 메시지는 같은 실행 안에서 제어 패널이 표시하므로,
+        자동화 상태가 실제로 바뀐 경우에만 전체 화면을 다시 실행합니다.
+        """
+        state_before = _automation_flags()
         try:
             # 스피너 없이 빠른 실행
             result = automation_control_tool(action=action)
-            
+
             if result:
                 st.session_state.last_action_result = result
-                
-                # 상태 변경 시 캐시 무효화 후 즉시 반영
+
+                # 상태 변경 시에만 상태 캐시 무효화 (status/점검은 TTL 캐시 사용)
                 if action in ['start', 'stop']:
                     self.async_manager.clear_cache('automation_status')
-                    self._load_data_async()
-                
+
                 # Arduino 액션 시 로그 캐시도 무효화
                 if action in ['debug_arduino', 'test_arduino_connection']:
                     self.async_manager.clear_cache('recent_logs')
-                
-                st.rerun()
+
+                if action in ['start', 'stop', 'debug_arduino', 'test_arduino_connection']:
+                    # 이번 실행 초반에 이미 로드했으므로 스로틀링을 풀고 한 번 더 로드
+                    self._last_load_time = 0
+                    self._load_data_async()
             else:
                 st.session_state.last_action_result = {
                     "success": False,
                     "error": "액션 실행 결과를 받지 못했습니다"
                 }
-                st.rerun()
-                
+
         except Exception as e:
             error_msg = f"액션 '{action}' 실행 중 오류: {str(e)}"
             st.session_state.last_action_result = {
@@ -436,64 +588,59 @@ class SimpleAutomationDashboard:
             }
             # 오류를 콘솔에도 출력
             print(f"Dashboard Error: {error_msg}")
+
+        # 이미 그려진 상태 표시/사이드바가 낡은 경우에만 한 번 재실행
+        if _automation_flags() != state_before:
             st.rerun()
-    
+
     def _load_reservoir_data(self):
         """배수지 데이터 로드 (PostgreSQL에서)"""
         try:
-            storage = PostgreSQLStorage.get_instance()
-
-            # 최신 데이터 1개 조회
-            query = """
-                SELECT measured_at,
-                       gagok_water_level, gagok_pump_a,
-                       haeryong_water_level, haeryong_pump_a
-                FROM water
-                ORDER BY measured_at DESC
-                LIMIT 1
-            """
-
-            with storage._connection.cursor() as cursor:
-                cursor.execute(query)
-                row = cursor.fetchone()
-
-                if row:
-                    measured_at, gagok_level, gagok_pump, haeryong_level, haeryong_pump = row
-
-                    # 가곡 배수지 데이터 업데이트
-                    if gagok_level is not None:
-                        st.session_state.reservoir_data['gagok'].update({
-                            'level': float(gagok_level),
-                            'pump': 'ON' if gagok_pump and gagok_pump > 0 else 'OFF',
-                            'status': self._get_level_status(float(gagok_level)),
-                            'last_update': measured_at
-                        })
-
-                    # 해룡 배수지 데이터 업데이트
-                    if haeryong_level is not None:
-                        st.session_state.reservoir_data['haeryong'].update({
-                            'level': float(haeryong_level),
-                            'pump': 'ON' if haeryong_pump and haeryong_pump > 0 else 'OFF',
-                            'status': self._get_level_status(float(haeryong_level)),
-                            'last_update': measured_at
-                        })
+            # 분 단위 평균이 아닌 원본 최신 행 사용
+            last = _fetch_latest_water()
+            if last is None:
+                return
+
+            measured_at = last['measured_at']
+
+            # 가곡 배수지 데이터 업데이트
+            gagok_level = last['gagok_water_level']
+            if pd.notna(gagok_level):
+                gagok_pump = last['gagok_pump_a']
+                st.session_state.reservoir_data['gagok'].update({
+                    'level': float(gagok_level),
+                    'pump': 'ON' if pd.notna(gagok_pump) and gagok_pump > 0 else 'OFF',
+                    'status': self._get_level_status(float(gagok_level)),
+                    'last_update': measured_at
+                })
+
+            # 해룡 배수지 데이터 업데이트
+            haeryong_level = last['haeryong_water_level']
+            if pd.notna(haeryong_level):
+                haeryong_pump = last['haeryong_pump_a']
+                st.session_state.reservoir_data['haeryong'].update({
+                    'level': float(haeryong_level),
+                    'pump': 'ON' if pd.notna(haeryong_pump) and haeryong_pump > 0 else 'OFF',
+                    'status': self._get_level_status(float(haeryong_level)),
+                    'last_update': measured_at
+                })
 
         except Exception as e:
             print(f"배수지 데이터 로드 실패: {e}")
             # 실패 시 기존 데이터 유지
 
-    def _get_level_status(self, level: float) -> str:
-        """수위 레벨에 따른 상태 반환"""
+    def _get_level_status(self, level: float) -> int:
+        """수위 레벨에 따른 상태 코드 반환"""
         if level <= 10:
-            return 'critical'  # 매우 낮음
+            return LEVEL_CRITICAL    # 매우 낮음
         elif level <= 30:
-            return 'warning'   # 낮음
+            return LEVEL_WARNING     # 낮음
         elif level <= 70:
-            return 'normal'    # 정상
+            return LEVEL_NORMAL      # 정상
         elif level <= 90:
-            return 'high'      # 높음
+            return LEVEL_HIGH        # 높음
         else:
-            return 'very_high' # 매우 높음
+            return LEVEL_VERY_HIGH   # 매우 높음
 
     def _render_reservoir_card(self, reservoir_id: str):
         """배수지 상태 카드"""
@@ -501,20 +648,13 @@ class SimpleAutomationDashboard:
         name = data.get('name', reservoir_id)
         level = data.get('level', 0)
         pump = data.get('pump', 'OFF')
-        status = data.get('status', 'unknown')
+        status = data.get('status', LEVEL_UNKNOWN)
         last_update = data.get('last_update', 'N/A')
 
         # 상태 매핑
-        status_map = {
-            'critical': ('🔴', '매우 낮음', 'inverse', '위험'),
-            'warning': ('🟡', '낮음', 'off', '주의'),
-            'normal': ('🟢', '정상', 'normal', '정상'),
-            'high': ('🔵', '높음', 'off', '높음'),
-            'very_high': ('🔵', '매우 높음', 'off', '높음'),
-            'unknown': ('⚪', '알 수 없음', 'off', 'N/A')
-        }
-
-        icon, status_kr, delta_color, delta_text = status_map.get(status, status_map['unknown'])
+        icon, status_kr, delta_color, delta_text = _LEVEL_STATUS_DISPLAY.get(
+            status, _LEVEL_STATUS_DISPLAY[LEVEL_UNKNOWN]
+        )
         pump_text = '작동중' if pump == 'ON' else '정지'
 
         with st.container():
@@ -530,9 +670,9 @@ class SimpleAutomationDashboard:
                 st.metric(label="⚙️ 펌프", value=pump_text, delta="작동" if pump == 'ON' else "대기", delta_color=pump_delta_color)
 
             # 알림
-            if status == 'critical':
+            if status == LEVEL_CRITICAL:
                 st.error("🚨 긴급: 수위 매우 낮음!", icon="🚨")
-            elif status == 'warning':
+            elif status == LEVEL_WARNING:
                 st.warning("⚠️ 주의: 수위 낮음", icon="⚠️")
 
             st.caption(f"🕐 {last_update}")
@@ -542,79 +682,18 @@ class SimpleAutomationDashboard:
         st.subheader("📊 24시간 수위 변화 추이")
 
         try:
-            storage = PostgreSQLStorage.get_instance()
-
-            # 최근 24시간 데이터 조회
-            query = """
-                SELECT measured_at, gagok_water_level, haeryong_water_level
-                FROM water
-                WHERE measured_at >= NOW() - INTERVAL '24 hours'
-                ORDER BY measured_at ASC
-            """
-
-            df = pd.read_sql_query(query, storage._connection)
+            df = _fetch_24h_water()
 
             if len(df) > 0:
-                # Plotly 그래프 생성
-                fig = go.Figure()
-
-                # 가곡 배수지 라인
-                fig.add_trace(go.Scatter(
-                    x=df['measured_at'],
-                    y=df['gagok_water_level'],
-                    mode='lines+markers',
-                    name='가곡 배수지',
-                    line=dict(color='#007bff', width=3),
-                    marker=dict(size=6),
-                    hovertemplate='<b>가곡</b><br>시간: %{x}<br>수위: %{y:.1f}%<extra></extra>'
-                ))
-
-                # 해룡 배수지 라인
-                fig.add_trace(go.Scatter(
-                    x=df['measured_at'],
-                    y=df['haeryong_water_level'],
-                    mode='lines+markers',
-                    name='해룡 배수지',
-                    line=dict(color='#28a745', width=3),
-                    marker=dict(size=6),
-                    hovertemplate='<b>해룡</b><br>시간: %{x}<br>수위: %{y:.1f}%<extra></extra>'
-                ))
-
-                # 레이아웃 설정
-                fig.update_layout(
-                    xaxis_title='시간',
-                    yaxis_title='수위 (%)',
-                    hovermode='x unified',
-                    height=450,
-                    margin=dict(l=20, r=20, t=20, b=20),
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="center",
-                        x=0.5
-                    ),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    yaxis=dict(
-                        gridcolor='rgba(128,128,128,0.2)',
-                        range=[0, 100]
-                    )
-                )
-
-                # 수위 경계선 추가 (위험 수준)
-                fig.add_hline(y=10, line_dash="dot", line_color="red", line_width=1,
-                             annotation_text="매우 낮음", annotation_position="right")
-                fig.add_hline(y=30, line_dash="dash", line_color="orange", line_width=1,
-                             annotation_text="낮음", annotation_position="right")
-                fig.add_hline(y=70, line_dash="dash", line_color="blue", line_width=1,
-                             annotation_text="높음", annotation_position="right")
+                signature = (len(df), df['measured_at'].iloc[0], df['last_measured_at'].iloc[-1])
+                fig = _build_water_fig(signature, df)
 
                 st.plotly_chart(fig, use_container_width=True)
 
                 # 통계 정보 표시
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("📈 데이터 포인트", f"{len(df):,}개")
+                    st.metric("📈 데이터 포인트 (1분 평균)", f"{len(df):,}개")
                 with col2:
                     gagok_avg = df['gagok_water_level'].mean()
                     st.metric("💧 가곡 평균", f"{gagok_avg:.1f}%")
@@ -628,8 +707,9 @@ class SimpleAutomationDashboard:
             st.error(f"❌ 그래프 로드 실패: {e}")
             print(f"Graph error: {e}")
 
+    @st.fragment(run_every=10)
     def _render_logs(self):
-        """로그 표시"""
+        """로그 표시 (10초마다, 새로고침 버튼을 누를 때도 이 부분만 재실행)"""
         col_header, col_button = st.columns([3, 1])
 
         with col_header:
@@ -638,28 +718,32 @@ class SimpleAutomationDashboard:
         with col_button:
             if st.button("🔄", key="refresh_logs", use_container_width=True, help="로그 새로고침"):
                 self.async_manager.clear_cache('recent_logs')
-                self._load_data_async()
-                st.rerun()
+                self._last_load_time = 0
 
+        # 캐시/스로틀링이 적용되므로 주기 실행마다 호출해도 DB를 매번 읽지 않음
+        self._load_data_async()
         logs = st.session_state.get('last_logs', [])
 
         if logs:
+            # 레벨별로 한 번만 순회해서 분류 (CRITICAL은 에러 탭에 포함)
+            buckets = {'ERROR': [], 'WARNING': [], 'INFO': []}
+            for log in logs:
+                level = log.get('level', 'INFO')
+                buckets.setdefault('ERROR' if level == 'CRITICAL' else level, []).append(log)
+
             tab_all, tab_error, tab_warning, tab_info = st.tabs(["🗂️ 전체", "❌ 에러", "⚠️ 경고", "ℹ️ 정보"])
 
             with tab_all:
                 self._render_log_items(logs[-20:], None)
 
             with tab_error:
-                error_logs = [log for log in logs if log.get('level') in ['ERROR', 'CRITICAL']]
-                self._render_log_items(error_logs[-20:], 'ERROR')
+                self._render_log_items(buckets['ERROR'][-20:], 'ERROR')
 
             with tab_warning:
-                warning_logs = [log for log in logs if log.get('level') == 'WARNING']
-                self._render_log_items(warning_logs[-20:], 'WARNING')
+                self._render_log_items(buckets['WARNING'][-20:], 'WARNING')
 
             with tab_info:
-                info_logs = [log for log in logs if log.get('level') == 'INFO']
-                self._render_log_items(info_logs[-20:], 'INFO')
+                self._render_log_items(buckets['INFO'][-20:], 'INFO')
         else:
             st.info("📭 로그 로딩 중...")
 
@@ -676,68 +760,64 @@ class SimpleAutomationDashboard:
             'INFO': 'ℹ️'
         }
 
+        get_icon = level_icons.get
+
         for log in reversed(logs):
             level = log.get('level', 'INFO')
-            timestamp = log.get('timestamp', '')
-            message = log.get('message', '')
+            timestamp = str(log.get('timestamp') or '')
+            message = str(log.get('message') or '')
 
-            # 시간 추출
-            try:
-                time_str = timestamp.split(' ')[1][:8] if ' ' in timestamp else timestamp[:8]
-            except:
-                time_str = timestamp[:8] if timestamp else "N/A"
+            time_str = log.get('time_str') or _log_time(timestamp)
 
-            icon = level_icons.get(level, 'ℹ️')
-            preview = message[:60] + ('...' if len(message) > 60 else '')
+            icon = get_icon(level, 'ℹ️')
+            message_len = len(message)
+            preview = message[:60] + ('...' if message_len > 60 else '')
 
             with st.expander(f"{icon} {time_str} | {preview}", expanded=False):
                 st.markdown(f"**레벨:** {level}")
                 st.markdown(f"**시간:** {timestamp}")
                 st.text(message)
     
-    def _setup_auto_update(self):
-        """자동 업데이트 설정 (새로고침 최소화)"""
-        # 마지막 업데이트 시간 확인
-        last_update = st.session_state.get('last_auto_update', 0)
-        current_timestamp = time.time()
-
-        # 1분마다 데이터 업데이트 (필요한 경우만)
-        if current_timestamp - last_update > 60:
-            st.session_state.last_auto_update = current_timestamp
-
-            # 백그라운드에서 데이터 새로고침
-            threading.Thread(
-                target=self._background_update,
-                daemon=True
-            ).start()
-    
-    def _background_update(self):
-        """백그라운드에서 데이터 업데이트"""
+    @st.fragment(run_every=60)
+    def _refresh_status(self):
+        """자동화 상태 주기 확인 (1분마다 이 부분만 재실행, 상태가 바뀐 경우에만 전체 화면 갱신)"""
+        if not self.state_manager:
+            return
         try:
-            # 상태 확인
-            if self.state_manager:
-                automation_status, autonomous_monitoring = self.state_manager.is_automation_active()
-                
-                # 상태가 변경된 경우만 업데이트
-                current_auto = st.session_state.get('automation_status', False)
-                current_monitoring = st.session_state.get('autonomous_monitoring', False)
-                
-                if (automation_status != current_auto or 
-                    autonomous_monitoring != current_monitoring):
-                    
-                    # 캐시 무효화 후 다음 로드에서 새 데이터 사용
-                    self.async_manager.clear_cache('automation_status')
-                    
-                    # 상태 변경 알림 (선택적)
-                    status_change = {
-                        'status_changed': True,
-                        'change_time': get_current_timestamp()
-                    }
-                    st.session_state.update(status_change)
-            
+            automation_status, autonomous_monitoring = self.state_manager.is_automation_active()
         except Exception as e:
-            # 백그라운드 오류는 조용히 처리
-            pass
+            print(f"자동화 상태 확인 실패: {e}")
+            return
+
+        if (automation_status, autonomous_monitoring) != _automation_flags():
+            # 캐시 무효화 후 새 상태로 전체 화면 갱신
+            self.async_manager.clear_cache('automation_status')
+            self.state_sync.batch_update_state({
+                'automation_status': automation_status,
+                'autonomous_monitoring': autonomous_monitoring,
+                'status_changed': True,
+                'change_time': get_current_timestamp()
+            }, rerun=False)
+            st.rerun(scope="app")
+
+    @st.fragment(run_every=30)
+    def _render_live_section(self):
+        """배수지 카드와 수위 그래프 (30초마다 이 부분만 재실행)"""
+        self._load_reservoir_data()
+
+        st.subheader("💧 배수지 실시간 상태")
+
+        col_gagok, col_haeryong = st.columns(2)
+
+        with col_gagok:
+            self._render_reservoir_card('gagok')
+
+        with col_haeryong:
+            self._render_reservoir_card('haeryong')
+
+        st.divider()
+
+        self._render_water_level_graph()
 
 def main():
     """메인 함수"""
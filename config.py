@@ -17,6 +17,11 @@ logging.langsmith("AgenticRAG")
 DEFAULT_CHUNK_SIZE = 1000
 DEFAULT_CHUNK_OVERLAP = 200
 DEFAULT_TOP_K_RESULTS = 5
+DEFAULT_EMBEDDING_BATCH_SIZE = 32
+DEFAULT_EMBEDDING_MAX_IN_FLIGHT = 4
+DEFAULT_UPSERT_BATCH_SIZE = 500
+DEFAULT_PG_POOL_MIN_CONN = 5
+DEFAULT_PG_POOL_MAX_CONN = 20
 DEFAULT_MAX_TOKENS = 2048
 DEFAULT_REQUEST_TIMEOUT = 45
 DEFAULT_MAX_RETRIES = 3
@@ -56,6 +61,9 @@ EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "HF").upper()  # OPENAI | HF
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "dragonkue/BGE-m3-ko")
 EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cpu")  # HF 사용 시 device 지정
 HUGGINGFACEHUB_API_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN", None)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", str(DEFAULT_EMBEDDING_BATCH_SIZE)))  # 임베딩 요청 1회당 청크 수
+EMBEDDING_MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", str(DEFAULT_EMBEDDING_MAX_IN_FLIGHT)))  # 동시에 보내는 임베딩 배치 수
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", str(DEFAULT_UPSERT_BATCH_SIZE)))  # 청크 INSERT 문 1개당 행 수 (임베딩 배치와 별개)
 
 # 로깅 설정
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -101,6 +109,8 @@ PG_DB_PORT = _get_int_env("PG_DB_PORT", "5432")
 PG_DB_NAME = os.getenv("PG_DB_NAME", "synergy")
 PG_DB_USER = os.getenv("PG_DB_USER", "synergy")
 PG_DB_PASSWORD = os.getenv("PG_DB_PASSWORD", "synergy")
+PG_POOL_MIN_CONN = _get_int_env("PG_POOL_MIN_CONN", str(DEFAULT_PG_POOL_MIN_CONN))  # 미리 열어 두는 연결 수
+PG_POOL_MAX_CONN = _get_int_env("PG_POOL_MAX_CONN", str(DEFAULT_PG_POOL_MAX_CONN))  # 동시에 빌려 쓸 수 있는 최대 연결 수
 
 
 def validate_config() -> bool:
@@ -128,6 +138,12 @@ def validate_config() -> bool:
             {"port": PG_DB_PORT, "valid_range": f"{MIN_PORT}-{MAX_PORT}"}
         )
 
+    if not (0 < PG_POOL_MIN_CONN <= PG_POOL_MAX_CONN):
+        raise ConfigurationError(
+            f"잘못된 PostgreSQL 연결 풀 크기: {PG_POOL_MIN_CONN}-{PG_POOL_MAX_CONN}",
+            {"min": PG_POOL_MIN_CONN, "max": PG_POOL_MAX_CONN}
+        )
+
     # Temperature 값 검증
     if not (0.0 <= TOOL_SELECTION_TEMPERATURE <= 2.0):
         raise ConfigurationError(
@@ -154,6 +170,25 @@ def validate_config() -> bool:
             {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
         )
 
+    # EMBEDDING_BATCH_SIZE 검증
+    if EMBEDDING_BATCH_SIZE <= 0:
+        raise ConfigurationError(
+            f"EMBEDDING_BATCH_SIZE는 양수여야 합니다: {EMBEDDING_BATCH_SIZE}",
+            {"value": EMBEDDING_BATCH_SIZE}
+        )
+
+    if EMBEDDING_MAX_IN_FLIGHT <= 0:
+        raise ConfigurationError(
+            f"EMBEDDING_MAX_IN_FLIGHT는 양수여야 합니다: {EMBEDDING_MAX_IN_FLIGHT}",
+            {"value": EMBEDDING_MAX_IN_FLIGHT}
+        )
+
+    if UPSERT_BATCH_SIZE <= 0:
+        raise ConfigurationError(
+            f"UPSERT_BATCH_SIZE는 양수여야 합니다: {UPSERT_BATCH_SIZE}",
+            {"value": UPSERT_BATCH_SIZE}
+        )
+
     # TOP_K_RESULTS 검증
     if TOP_K_RESULTS <= 0:
         raise ConfigurationError(
@@ -577,14 +612,18 @@ def print_config() -> Dict[str, Any]:
         },
         "Enabled Tools": ENABLED_TOOLS,
         "Embedding": {
-            "Model Name": EMBEDDING_MODEL_NAME
+            "Model Name": EMBEDDING_MODEL_NAME,
+            "Batch Size": EMBEDDING_BATCH_SIZE,
+            "Max In Flight": EMBEDDING_MAX_IN_FLIGHT,
+            "Upsert Batch Size": UPSERT_BATCH_SIZE
         },
         "PostgreSQL": {
             "Host": PG_DB_HOST,
             "Port": PG_DB_PORT,
             "Database": PG_DB_NAME,
             "User": PG_DB_USER,
-            "Password": PG_DB_PASSWORD
+            "Password": PG_DB_PASSWORD,
+            "Pool Size": f"{PG_POOL_MIN_CONN}-{PG_POOL_MAX_CONN}"
         }
     }
     
@@ -15,9 +15,14 @@ CREATE TABLE IF NOT EXISTS files (
   upload_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
   length BIGINT NOT NULL,
   metadata JSONB,
-  content BYTEA
+  content BYTEA,
+  content_sha256 CHAR(64)
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_files_content_sha256 ON files(content_sha256);
+CREATE INDEX IF NOT EXISTS idx_files_upload_date
+  ON files(upload_date DESC) INCLUDE (id, filename, length);
+
 CREATE TABLE IF NOT EXISTS chunks (
   id SERIAL PRIMARY KEY,
   file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
@@ -31,6 +36,13 @@ CREATE INDEX IF NOT EXISTS idx_chunks_file_id ON chunks(file_id);
 CREATE INDEX IF NOT EXISTS idx_chunks_embedding
   ON chunks USING ivfflat (embedding vector_l2_ops) WITH (lists = 100);
 
+CREATE TABLE IF NOT EXISTS users (
+  username VARCHAR(255) PRIMARY KEY,
+  password_hash TEXT NOT NULL,
+  role VARCHAR(50) NOT NULL DEFAULT 'user',
+  name VARCHAR(255)
+);
+
 CREATE TABLE IF NOT EXISTS water (
   measured_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
   gagok_water_level DOUBLE PRECISION,
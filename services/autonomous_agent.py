@@ -54,6 +54,7 @@ class AutonomousAgent:
     # 운영 설정 변수
     DECISION_INTERVAL_SECONDS = 10  # 의사결정 간격(초)
     ERROR_RETRY_DELAY_SECONDS = 5  # 오류 발생 시 재시도 대기 시간(초)
+    MAX_ERROR_BACKOFF_SECONDS = 60  # 연속 오류 시 재시도 최대 대기 시간(초)
     MAX_RETRY_ATTEMPTS = 3          # 최대 재시도 횟수
 
     def __init__(self, lm_client):
@@ -66,6 +67,9 @@ class AutonomousAgent:
         self.is_running = False
         self.monitoring_thread: Optional[threading.Thread] = None
         self.decision_interval = self.DECISION_INTERVAL_SECONDS
+        self.last_heartbeat = 0.0  # 마지막 모니터링 주기 시작 시각 (time.time())
+        self.consecutive_errors = 0  # 연속으로 실패한 모니터링 주기 수 (재시도 백오프 계산용)
+        self._run_generation = 0  # asyncio 모니터링 실행 번호 (이전 실행 종료가 새 실행 상태를 덮어쓰지 않도록)
         self.allowed_reservoirs: Optional[Set[str]] = None
 
         # AI 에이전트 시스템 프롬프트
@@ -150,31 +154,73 @@ JSON만 출력한다.
         logger.info("자율형 AI 에이전트가 종료되었습니다.")
         return True
 
+    async def start_monitoring_async(self) -> bool:
+        """자율 모니터링을 asyncio 이벤트 루프에서 실행
+
+        블로킹 작업(DB 조회, AI 호출)은 기본 스레드 풀에서 실행하고 대기는
+        asyncio.sleep으로 처리합니다. stop_monitoring() 호출 또는 태스크
+        취소 시 종료됩니다.
+        """
+        if self.is_running:
+            logger.warning("이미 모니터링이 실행 중입니다.")
+            return False
+
+        self.is_running = True
+        self._run_generation += 1
+        generation = self._run_generation
+        self.automation_logger.info(EventType.SYSTEM, "system", "자율형 AI 에이전트 모니터링 시작")
+        logger.info("자율형 AI 에이전트가 시작되었습니다. (asyncio)")
+
+        try:
+            while self.is_running and generation == self._run_generation:
+                delay = await asyncio.to_thread(self._run_monitoring_cycle)
+                await asyncio.sleep(delay)
+        finally:
+            # 취소된 이전 실행이 늦게 끝나도 새로 시작한 실행의 상태는 유지
+            if generation == self._run_generation:
+                self.is_running = False
+            logger.info("AI 에이전트 모니터링 루프 종료")
+        return True
+
+    def is_heartbeat_fresh(self) -> bool:
+        """최근 모니터링 주기가 실행되었는지 (의사결정 간격의 2배 이내)"""
+        return time.time() - self.last_heartbeat < self.decision_interval * 2
+
     def _monitoring_loop(self):
         """메인 모니터링 루프"""
         logger.info("AI 에이전트 모니터링 루프 시작")
 
         while self.is_running:
-            try:
-                # 현재 시스템 상태 수집
-                system_state = self._collect_system_state()
+            time.sleep(self._run_monitoring_cycle())
+
+        logger.info("AI 에이전트 모니터링 루프 종료")
 
-                # AI로 의사결정 요청
-                decision = self._make_ai_decision(system_state)
+    def _run_monitoring_cycle(self) -> float:
+        """모니터링 1회 수행 후 다음 실행까지 대기할 시간(초) 반환"""
+        self.last_heartbeat = time.time()
+        try:
+            # 현재 시스템 상태 수집
+            system_state = self._collect_system_state()
 
-                if decision:
-                    # AI 결정사항 실행
-                    self._execute_decision(decision)
+            # AI로 의사결정 요청
+            decision = self._make_ai_decision(system_state)
 
-                # 다음 턴 대기
-                time.sleep(self.decision_interval)
+            if decision:
+                # AI 결정사항 실행
+                self._execute_decision(decision)
 
-            except Exception as e:
-                logger.error(f"모니터링 루프 오류: {e}")
-                self.automation_logger.error(EventType.ERROR, "system", f"모니터링 오류: {str(e)}")
-                time.sleep(self.ERROR_RETRY_DELAY_SECONDS)
+            # 다음 턴 대기
+            self.consecutive_errors = 0
+            return self.decision_interval
 
-        logger.info("AI 에이전트 모니터링 루프 종료")
+        except Exception as e:
+            # 연속 오류 시 재시도 간격을 지수적으로 늘림 (5초 → 10초 → ... 최대 60초)
+            self.consecutive_errors += 1
+            delay = min(self.ERROR_RETRY_DELAY_SECONDS * 2 ** (self.consecutive_errors - 1),
+                        self.MAX_ERROR_BACKOFF_SECONDS)
+            logger.error(f"모니터링 루프 오류, {delay}초 후 재시도: {e}")
+            self.automation_logger.error(EventType.ERROR, "system", f"모니터링 오류: {str(e)}")
+            return delay
 
     # ------------------------------
     # State
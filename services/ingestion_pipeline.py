@@ -0,0 +1,290 @@
+# services/ingestion_pipeline.py - 파일 업로드 비동기 처리 파이프라인
+
+import hashlib
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, BinaryIO
+
+from storage.postgresql_storage import SKIP_CHUNK_EXTENSIONS
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 단계 이름 (처리 순서)
+STAGES = ("load", "chunk", "embed", "upsert")
+
+# 단계별 표시 문구
+STAGE_LABELS = {
+    "queued": "⏳ 처리 대기 중...",
+    "load": "📄 문서 내용 분석 중...",
+    "chunk": "✂️ 텍스트 청크 분할 중...",
+    "embed": "🧠 임베딩 생성 중...",
+    "upsert": "💾 데이터베이스에 저장 중...",
+    "done": "✅ 업로드 완료!",
+    "duplicate": "⚠️ 같은 내용의 파일이 이미 있습니다.",
+    "error": "❌ 업로드 실패",
+}
+
+# 단계 사이 대기열 크기 (앞 단계가 너무 앞서가지 않도록 제한)
+DEFAULT_QUEUE_SIZE = 4
+
+# 완료/실패한 작업 상태 보관 시간 (초)
+FINISHED_JOB_TTL_SECONDS = 600
+
+# 업로드 파일을 나눠 읽는 단위 (1MiB)
+UPLOAD_READ_CHUNK_BYTES = 1 << 20
+
+
+def spool_upload(fileobj: BinaryIO, suffix: str = "") -> tuple:
+    """파일 객체를 UPLOAD_READ_CHUNK_BYTES씩 읽어 임시 파일에 쓰면서 크기와 SHA-256을 함께 계산
+
+    Args:
+        fileobj: 읽을 파일 객체 (예: Streamlit UploadedFile)
+        suffix: 임시 파일 확장자 (문서 로더가 확장자를 볼 수 있도록)
+
+    Returns:
+        tuple: (임시 파일 경로, 전체 크기, SHA-256 hex)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="upload_") as tmp:
+        try:
+            for chunk in iter(lambda: fileobj.read(UPLOAD_READ_CHUNK_BYTES), b""):
+                tmp.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        except Exception:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return tmp.name, size, digest.hexdigest()
+
+
+class IngestionPipeline:
+    """업로드 파일을 Load → Chunk → Embed → Upsert 4단계로 처리하는 백그라운드 파이프라인
+
+    단계마다 상주 워커 스레드 풀을 두고 단계 사이는 크기 제한이 있는 Queue로 연결합니다.
+    여러 파일이 올라오면 한 파일의 임베딩과 다른 파일의 로드/저장이 겹쳐 진행됩니다.
+    진행 상태는 작업 ID별로 파이프라인 안에 보관하며 (백그라운드 스레드는 st.session_state에
+    쓸 수 없으므로) 화면에서는 status()로 조회합니다.
+    """
+
+    def __init__(
+        self,
+        storage,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        workers_per_stage: Optional[Dict[str, int]] = None
+    ):
+        self.storage = storage
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
+
+        workers = {"load": 2, "chunk": 1, "embed": 1, "upsert": 1}
+        if workers_per_stage:
+            workers.update(workers_per_stage)
+
+        handlers = {
+            "load": self._load,
+            "chunk": self._chunk,
+            "embed": self._embed,
+            "upsert": self._upsert,
+        }
+
+        # 각 단계의 입력 대기열 (마지막 단계 출력은 없음)
+        self._queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES}
+        self._pools: List[ThreadPoolExecutor] = []
+        for i, stage in enumerate(STAGES):
+            next_queue = self._queues[STAGES[i + 1]] if i + 1 < len(STAGES) else None
+            pool = ThreadPoolExecutor(max_workers=workers[stage], thread_name_prefix=f"ingest-{stage}")
+            for _ in range(workers[stage]):
+                pool.submit(self._worker, stage, handlers[stage], self._queues[stage], next_queue)
+            self._pools.append(pool)
+
+        logger.info(f"업로드 파이프라인 시작 (워커: {workers})")
+
+    def submit(self, file_content: bytes, filename: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """메모리에 있는 파일 내용을 Load 대기열에 넣고 작업 ID를 바로 반환"""
+        return self.submit_stream(io.BytesIO(file_content), filename, metadata)
+
+    def submit_stream(self, fileobj: BinaryIO, filename: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """파일 객체를 나눠 읽어 임시 파일로 옮긴 뒤 Load 대기열에 넣고 작업 ID를 바로 반환
+
+        파일 전체를 바이트로 복사해 두지 않고 대기하는 동안은 디스크에 두며,
+        내용은 저장 단계에서만 읽습니다.
+        """
+        self._prune_finished()
+        extension = os.path.splitext(filename)[1].lower()
+        path, size, sha256 = spool_upload(fileobj, suffix=extension)
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "filename": filename,
+            "extension": extension,
+            "size": size,
+            "sha256": sha256,
+            "metadata": metadata,
+            "path": path,
+            "stage": "queued",
+            "file_id": None,
+            "duplicate_of": None,
+            "chunk_count": 0,
+            "embedded": 0,
+            "error": None,
+            "finished_at": None,
+        }
+        with self._jobs_lock:
+            self._jobs[job_id] = job
+        self._queues["load"].put(job)
+        logger.info(f"업로드 작업 등록: {filename} (job={job_id})")
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 진행 상태 조회 (내용/중간 결과를 뺀 사본)"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            stage = job["stage"]
+            return {
+                "id": job_id,
+                "filename": job["filename"],
+                "size": job["size"],
+                "stage": stage,
+                "label": STAGE_LABELS.get(stage, stage),
+                "file_id": job["file_id"],
+                "duplicate_of": job["duplicate_of"],
+                "chunk_count": job["chunk_count"],
+                "embedded": job["embedded"],
+                "error": job["error"],
+                "finished": stage in ("done", "duplicate", "error"),
+            }
+
+    def forget(self, job_id: str):
+        """화면에서 결과를 확인한 작업 상태 제거"""
+        with self._jobs_lock:
+            self._jobs.pop(job_id, None)
+
+    def shutdown(self):
+        """워커 종료 (각 단계 워커 수만큼 종료 신호 전달)"""
+        for stage, pool in zip(STAGES, self._pools):
+            for _ in range(pool._max_workers):
+                self._queues[stage].put(None)
+            pool.shutdown(wait=False)
+
+    # --- 내부 처리 ---
+
+    def _worker(self, stage: str, handler, in_queue: queue.Queue, out_queue: Optional[queue.Queue]):
+        """단계 워커 루프 (None을 받으면 종료)"""
+        while True:
+            job = in_queue.get()
+            if job is None:
+                break
+            self._set_stage(job, stage)
+            try:
+                passed = handler(job)
+            except Exception as e:
+                logger.error(f"업로드 파이프라인 {stage} 단계 오류 ({job['filename']}): {e}", exc_info=True)
+                self._finish(job, error=str(e))
+                continue
+
+            if not passed:
+                # 처리할 내용이 없거나 완료된 작업
+                continue
+            if out_queue is None:
+                self._finish(job)
+            else:
+                # 다음 단계 대기열이 가득 차면 여기서 대기 (backpressure)
+                out_queue.put(job)
+
+    def _load(self, job: Dict[str, Any]) -> bool:
+        """Load 단계 - 내용 해시 중복 확인 후 문서 로드 (청크 처리하지 않는 형식은 로드 생략)"""
+        # 이름이 달라도 내용이 같은 파일이면 청크/임베딩/저장 단계를 모두 건너뜀
+        existing_file = self.storage.check_file_hash_exists(job["sha256"])
+        if existing_file:
+            with self._jobs_lock:
+                job["file_id"] = str(existing_file["id"])
+                job["duplicate_of"] = existing_file["filename"]
+            self._finish(job, stage="duplicate")
+            return False
+
+        if job["extension"] in SKIP_CHUNK_EXTENSIONS:
+            job["chunks"] = None
+            return True
+        docs = self.storage.load_documents_from_path(job["path"], job["filename"])
+        if not docs:
+            self._finish(job, error="파일 내용을 읽을 수 없거나 지원하지 않는 형식입니다.")
+            return False
+        job["docs"] = docs
+        return True
+
+    def _chunk(self, job: Dict[str, Any]) -> bool:
+        """Chunk 단계 - 텍스트 청크 분할"""
+        if "docs" in job:
+            chunks = self.storage.split_documents(job.pop("docs"))
+            with self._jobs_lock:
+                job["chunks"] = chunks
+                job["chunk_count"] = len(chunks)
+        return True
+
+    def _embed(self, job: Dict[str, Any]) -> bool:
+        """Embed 단계 - 청크 임베딩 생성"""
+        if job.get("chunks"):
+            def _on_progress(done: int, total: int):
+                with self._jobs_lock:
+                    job["embedded"] = done
+
+            job["chunk_texts"], job["embeddings"] = self.storage.embed_chunks(job["chunks"], _on_progress)
+        return True
+
+    def _upsert(self, job: Dict[str, Any]) -> bool:
+        """Upsert 단계 - 파일과 청크를 한 트랜잭션으로 저장"""
+        chunks = job.get("chunks")
+        # files.content(bytea)에 넣을 원본은 저장 직전에만 메모리로 읽음
+        with open(job["path"], "rb") as f:
+            file_content = f.read()
+        file_id = self.storage.insert_file_with_chunks(
+            file_content,
+            job["filename"],
+            job["metadata"],
+            chunks,
+            job.get("chunk_texts"),
+            job.get("embeddings"),
+            content_sha256=job["sha256"],
+        )
+        job["file_id"] = file_id
+        job["chunk_count"] = len(chunks) if chunks else 0
+        return True
+
+    def _set_stage(self, job: Dict[str, Any], stage: str):
+        with self._jobs_lock:
+            job["stage"] = stage
+
+    def _finish(self, job: Dict[str, Any], error: Optional[str] = None, stage: str = "done"):
+        """작업 완료 처리 (큰 중간 데이터는 바로 해제)"""
+        with self._jobs_lock:
+            job["stage"] = "error" if error else stage
+            job["error"] = error
+            job["finished_at"] = time.time()
+            for key in ("docs", "chunks", "chunk_texts", "embeddings"):
+                job.pop(key, None)
+            path = job.pop("path", None)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"업로드 임시 파일 삭제 실패: {e}")
+
+    def _prune_finished(self):
+        """오래전에 끝난 작업 상태 정리 (화면에서 확인하지 않고 떠난 경우 대비)"""
+        cutoff = time.time() - FINISHED_JOB_TTL_SECONDS
+        with self._jobs_lock:
+            stale = [job_id for job_id, job in self._jobs.items()
+                     if job["finished_at"] and job["finished_at"] < cutoff]
+            for job_id in stale:
+                del self._jobs[job_id]
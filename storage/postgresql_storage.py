@@ -1,18 +1,26 @@
 # storage/postgresql_storage.py
 
+import asyncio
+import contextlib
 from datetime import datetime
+import hashlib
 import os
 import re
 import tempfile
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Callable
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
+import psycopg2.pool
 from utils.logger import setup_logger
 from utils.exceptions import DatabaseError, EmbeddingError, FileProcessingError, ConnectionError
 from config import (
     PG_DB_HOST, PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_PORT,
+    PG_POOL_MIN_CONN, PG_POOL_MAX_CONN,
     EMBEDDING_MODEL_NAME, OPENAI_API_KEY_ENV_VAR, TOP_K_RESULTS,
-    CHUNK_SIZE, CHUNK_OVERLAP
+    CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_IN_FLIGHT,
+    UPSERT_BATCH_SIZE
 )
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
@@ -21,6 +29,16 @@ from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader, Te
 
 logger = setup_logger(__name__)
 
+# 청크 분할/임베딩 없이 파일 행만 저장하는 확장자
+SKIP_CHUNK_EXTENSIONS = frozenset({'.xlsx', '.png'})
+
+# 내용을 읽어 청크로 나누는 확장자별 문서 로더
+DOCUMENT_LOADERS = {
+    '.txt': TextLoader,
+    '.pdf': PyPDFLoader,
+    '.docx': Docx2txtLoader,
+}
+
 
 def clean_text_for_postgresql(text: str) -> str:
     """PostgreSQL 저장을 위해 텍스트에서 NUL 문자와 기타 문제가 되는 문자를 제거
@@ -54,6 +72,8 @@ class PostgreSQLStorage:
         _connection: 데이터베이스 연결 객체
         _cursor: 커서 객체
         _pgvector_available: pgvector 확장 사용 가능 여부
+        _db_lock: 공유 연결/커서 사용을 직렬화하는 잠금 (업로드 파이프라인 워커와 공유)
+        _pool: 읽기 전용 조회용 연결 풀 (세션끼리 공유 연결을 기다리지 않도록)
         embedding_model: 임베딩 모델 인스턴스
     """
 
@@ -61,7 +81,9 @@ class PostgreSQLStorage:
     _initialized: bool = False
     _connection: Optional[psycopg2.extensions.connection] = None
     _cursor: Optional[psycopg2.extras.RealDictCursor] = None
+    _pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
     _pgvector_available: bool = False
+    _db_lock = threading.RLock()
 
     def __new__(cls, *args, **kwargs) -> 'PostgreSQLStorage':
         """인스턴스가 없을 때만 새로 생성하여 반환 (싱글톤 패턴)
@@ -166,6 +188,16 @@ class PostgreSQLStorage:
             # 커서 생성 (딕셔너리 형태로 결과를 받기 위해 cursor_factory 사용)
             self._cursor = self._connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
             logger.info("PostgreSQL 연결 성공!")
+
+            # 대시보드 등 동시 조회용 연결 풀 (실패해도 공유 연결로 동작)
+            try:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    PG_POOL_MIN_CONN, PG_POOL_MAX_CONN, **connection_kwargs
+                )
+                logger.info(f"PostgreSQL 연결 풀 생성 (min={PG_POOL_MIN_CONN}, max={PG_POOL_MAX_CONN})")
+            except psycopg2.Error as e:
+                logger.warning(f"PostgreSQL 연결 풀 생성 실패, 공유 연결 사용: {e}")
+                self._pool = None
             
             # Embedding 모델 로드 (config에서 모델 이름/백엔드 가져오기)
             # 환경 변수로 임베딩 로드 제어 가능
@@ -209,6 +241,10 @@ class PostgreSQLStorage:
 
             self._initialized = True # 초기화 완료 플래그 설정
 
+            # 내용 해시 기반 중복 확인용 컬럼/인덱스 준비 (기존 DB 호환)
+            self._ensure_content_hash_column()
+            self._ensure_upload_date_index()
+
         except UnicodeDecodeError as e:
             logger.error(
                 "PostgreSQL DSN 인코딩 오류(UnicodeDecodeError). 환경 변수/서비스 인코딩 확인 필요. "
@@ -250,8 +286,49 @@ class PostgreSQLStorage:
                 ) from e
         return PostgreSQLStorage._instance
 
+    @contextlib.contextmanager
+    def pooled_connection(self):
+        """연결 풀에서 연결을 빌려 사용 후 반납 (풀이 없으면 잠금 후 공유 연결 사용)
+
+        Yields:
+            psycopg2 연결 객체
+        """
+        if self._pool is None:
+            with self._db_lock:
+                yield self._connection
+            return
+
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            # 끊어진 연결은 풀에 돌려놓지 않고 닫음
+            self._pool.putconn(conn, close=bool(conn.closed))
+
+    @staticmethod
+    def execute_prepared(cursor, name: str, query: str):
+        """서버 측 prepared statement로 쿼리 실행
+
+        연결마다 처음 한 번만 PREPARE하고 이후에는 EXECUTE만 보내 파싱/계획 단계를 건너뜁니다.
+        name은 코드에 고정된 식별자만 사용해야 합니다 (SQL에 그대로 들어감).
+        """
+        try:
+            cursor.execute(f"EXECUTE {name}")
+        except psycopg2.errors.InvalidSqlStatementName:
+            # 이 연결에서는 아직 준비되지 않음 - 실패한 트랜잭션을 정리하고 등록
+            cursor.connection.rollback()
+            cursor.execute(f"PREPARE {name} AS {query}")
+            cursor.execute(f"EXECUTE {name}")
+
     def close(self):
         """PostgreSQL 연결을 닫습니다."""
+        if self._pool:
+            self._pool.closeall()
+            self._pool = None
         if self._cursor:
             self._cursor.close()
             self._cursor = None
@@ -317,28 +394,31 @@ class PostgreSQLStorage:
             else:
                 return None
 
-        try:
-            self._cursor.execute(query, params)
-
-            if commit:
-                self._connection.commit()
-                return True
-            elif fetchone:
-                return self._cursor.fetchone()
-            elif fetchall:
-                return self._cursor.fetchall()
-            else:
-                return None
+        # 업로드 파이프라인 워커 스레드와 커서를 공유하므로 실행~결과 조회~롤백을 묶어서 잠금
+        # (잠금 밖에서 롤백하면 다른 스레드가 진행 중인 트랜잭션까지 되돌릴 수 있음)
+        with self._db_lock:
+            try:
+                self._cursor.execute(query, params)
+
+                if commit:
+                    self._connection.commit()
+                    return True
+                elif fetchone:
+                    return self._cursor.fetchone()
+                elif fetchall:
+                    return self._cursor.fetchall()
+                else:
+                    return None
 
-        except Exception as e:
-            if self._connection:
-                self._connection.rollback()
-            error_msg = f"SQL 쿼리 실행 오류: {str(e)}"
-            logger.error(f"{error_msg}\n쿼리: {query}\n파라미터: {params}")
-            raise DatabaseError(
-                error_msg,
-                {"query": query[:200], "params": str(params)[:200], "error": str(e)}
-            ) from e
+            except Exception as e:
+                if self._connection:
+                    self._connection.rollback()
+                error_msg = f"SQL 쿼리 실행 오류: {str(e)}"
+                logger.error(f"{error_msg}\n쿼리: {query}\n파라미터: {params}")
+                raise DatabaseError(
+                    error_msg,
+                    {"query": query[:200], "params": str(params)[:200], "error": str(e)}
+                ) from e
 
     def save_file(
         self,
@@ -368,167 +448,257 @@ class PostgreSQLStorage:
         existing_file = self.execute_query(existing_file_query, params=(filename,), fetchone=True)
 
         if existing_file:
-           file_id = existing_file['id']
-           logger.warning(f"파일 '{filename}' 이미 존재. ID: {file_id}")
-           return str(file_id)
+            file_id = existing_file['id']
+            logger.warning(f"파일 '{filename}' 이미 존재. ID: {file_id}")
+            return str(file_id)
 
-        file_id = None
+        # 이름이 달라도 내용이 같으면 다시 임베딩하지 않음
+        content_sha256 = hashlib.sha256(file_content).hexdigest()
+        existing_file = self.check_file_hash_exists(content_sha256)
+        if existing_file:
+            logger.warning(f"파일 '{filename}' 내용이 '{existing_file['filename']}'과 동일. ID: {existing_file['id']}")
+            return str(existing_file['id'])
+
+        # 2. 먼저 파일 내용 처리 및 임베딩 생성 (파일 저장 전에)
+        file_extension = os.path.splitext(filename)[1].lower()
+
+        # .xlsx 또는 .png 파일은 청크 및 임베딩 처리 건너뛰기
+        if file_extension in SKIP_CHUNK_EXTENSIONS:
+            logger.info(f"{file_extension.upper()} 파일 '{filename}'은 청크 및 임베딩 처리를 건너킵니다.")
+            return self.insert_file_with_chunks(file_content, filename, metadata, content_sha256=content_sha256)
+
+        # 지원되는 다른 파일 형식 (txt, pdf, docx)은 내용 로드 및 청크 분할, 임베딩 생성 후 파일 저장
+        docs = self.load_documents(file_content, filename)
+        if not docs:
+            return None # 문서 로드 실패 시 처리 중단
+
+        # 3. 로드된 문서를 청크로 분할
+        chunks = self.split_documents(docs)
+
+        # 각 청크에 대한 벡터 임베딩 생성
+        chunk_texts, embeddings = self.embed_chunks(chunks)
+
+        # 4. 임베딩 생성이 완료된 후에 파일과 청크를 저장
+        return self.insert_file_with_chunks(
+            file_content, filename, metadata, chunks, chunk_texts, embeddings, content_sha256=content_sha256
+        )
+
+    def load_documents(self, file_content: bytes, filename: str) -> list:
+        """파일 내용을 Langchain 문서 목록으로 로드 (업로드 파이프라인 Load 단계)
+
+        Args:
+            file_content: 파일 내용 (바이트)
+            filename: 파일 이름 (확장자로 로더 선택)
+
+        Returns:
+            list: 로드된 Document 목록 (지원하지 않는 형식이거나 내용이 없으면 빈 목록)
+        """
+        file_extension = os.path.splitext(filename)[1].lower()
+        temp_file_path = None
         try:
-            # 2. 먼저 파일 내용 처리 및 임베딩 생성 (파일 저장 전에)
-            file_extension = os.path.splitext(filename)[1].lower()
-            
-            # .xlsx 또는 .png 파일은 청크 및 임베딩 처리 건너뛰기
-            if file_extension in ['.xlsx', '.png']:
-                logger.info(f"{file_extension.upper()} 파일 '{filename}'은 청크 및 임베딩 처리를 건너킵니다.")
-                # 이미지/엑셀 파일은 바로 저장
-                file_insert_query = "INSERT INTO files (filename, length, metadata, content) VALUES (%s, %s, %s, %s) RETURNING id"
+            # Langchain 로더는 파일 경로를 받는 경우가 많으므로 임시 파일로 저장
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp:
+                tmp.write(file_content)
+                temp_file_path = tmp.name
+            return self.load_documents_from_path(temp_file_path, filename)
+        finally:
+            # 임시 파일 삭제
+            if temp_file_path and os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def load_documents_from_path(self, file_path: str, filename: str) -> list:
+        """디스크에 있는 파일을 Langchain 문서 목록으로 로드 (확장자는 원래 파일 이름 기준)
+
+        Args:
+            file_path: 로드할 파일 경로
+            filename: 원래 파일 이름 (확장자로 로더 선택)
+
+        Returns:
+            list: 로드된 Document 목록 (지원하지 않는 형식이거나 내용이 없으면 빈 목록)
+        """
+        loader_cls = DOCUMENT_LOADERS.get(os.path.splitext(filename)[1].lower())
+        if loader_cls is None:
+            logger.warning(f"청크 처리가 지원되지 않는 파일 형식: {filename}")
+            return [] # 처리 실패
+
+        docs = loader_cls(file_path).load()
+        if not docs:
+            logger.warning(f"파일 내용 로드 실패 또는 내용 없음: {filename}")
+        return docs
+
+    def split_documents(self, docs: list) -> list:
+        """로드된 문서를 청크로 분할 (업로드 파이프라인 Chunk 단계)"""
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            length_function=len,
+            is_separator_regex=False,
+        )
+        return text_splitter.split_documents(docs)
+
+    def embed_chunks(self, chunks: list, progress_callback: Optional[Callable[[int, int], None]] = None) -> tuple:
+        """청크 텍스트 정제 후 임베딩 생성 (업로드 파이프라인 Embed 단계)
+
+        실행 중인 이벤트 루프가 없으면 aembed_chunks로 배치를 동시에 요청하고,
+        이미 루프 안에서 호출된 경우에는 배치를 순서대로 요청합니다.
+        progress_callback이 있으면 배치가 끝날 때마다 (완료 청크 수, 전체 청크 수)로 호출합니다.
+
+        Returns:
+            tuple: (정제된 청크 텍스트 목록, 임베딩 목록)
+
+        Raises:
+            RuntimeError: 임베딩 모델이 로드되지 않은 경우
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aembed_chunks(chunks, progress_callback))
+
+        chunk_texts = self._prepare_chunk_texts(chunks)
+        embeddings = []
+        for start in range(0, len(chunk_texts), EMBEDDING_BATCH_SIZE):
+            embeddings.extend(self.embedding_model.embed_documents(chunk_texts[start:start + EMBEDDING_BATCH_SIZE]))
+            if progress_callback:
+                progress_callback(len(embeddings), len(chunk_texts))
+        logger.info(f"{len(embeddings)}개의 청크 임베딩 생성 완료 (배치 크기 {EMBEDDING_BATCH_SIZE}).")
+        return chunk_texts, embeddings
+
+    async def aembed_chunks(self, chunks: list, progress_callback: Optional[Callable[[int, int], None]] = None) -> tuple:
+        """청크를 EMBEDDING_BATCH_SIZE개씩 나눠 최대 EMBEDDING_MAX_IN_FLIGHT개 배치를 동시에 임베딩
+
+        progress_callback이 있으면 배치가 끝날 때마다 (완료 청크 수, 전체 청크 수)로 호출합니다.
+
+        Returns:
+            tuple: (정제된 청크 텍스트 목록, 임베딩 목록 - 청크 순서 유지)
+
+        Raises:
+            RuntimeError: 임베딩 모델이 로드되지 않은 경우
+        """
+        chunk_texts = self._prepare_chunk_texts(chunks)
+        batches = [chunk_texts[start:start + EMBEDDING_BATCH_SIZE]
+                   for start in range(0, len(chunk_texts), EMBEDDING_BATCH_SIZE)]
+        semaphore = asyncio.Semaphore(EMBEDDING_MAX_IN_FLIGHT)
+        completed = 0
+
+        async def _embed_batch(batch: List[str]) -> list:
+            nonlocal completed
+            async with semaphore:
+                result = await self.embedding_model.aembed_documents(batch)
+            completed += len(batch)
+            if progress_callback:
+                progress_callback(completed, len(chunk_texts))
+            return result
+
+        # gather는 입력 순서대로 결과를 돌려주므로 청크 순서가 유지됨
+        results = await asyncio.gather(*(_embed_batch(batch) for batch in batches))
+        embeddings = [embedding for batch_result in results for embedding in batch_result]
+        logger.info(
+            f"{len(embeddings)}개의 청크 임베딩 생성 완료 "
+            f"(배치 {len(batches)}개, 크기 {EMBEDDING_BATCH_SIZE}, 동시 {EMBEDDING_MAX_IN_FLIGHT})."
+        )
+        return chunk_texts, embeddings
+
+    def _prepare_chunk_texts(self, chunks: list) -> List[str]:
+        """임베딩 모델 확인 후 청크 텍스트에서 NUL 문자 등 제거"""
+        if not self.embedding_model:
+            logger.error("Embedding 모델이 로드되지 않았습니다. 청크 임베딩 생성이 불가능합니다.")
+            raise RuntimeError("Embedding model not loaded") # 임베딩 모델 없으면 오류 발생
+        return [clean_text_for_postgresql(chunk.page_content) for chunk in chunks]
+
+    def insert_file_with_chunks(
+        self,
+        file_content: bytes,
+        filename: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunks: Optional[list] = None,
+        chunk_texts: Optional[List[str]] = None,
+        embeddings: Optional[list] = None,
+        content_sha256: Optional[str] = None
+    ) -> Optional[str]:
+        """files 행과 청크/임베딩을 하나의 트랜잭션으로 저장 (업로드 파이프라인 Upsert 단계)
+
+        chunks가 없으면 (이미지/엑셀 등) 파일 행만 저장합니다.
+        content_sha256은 files.content_sha256 컬럼과 메타데이터에 함께 기록합니다.
+
+        Returns:
+            Optional[str]: 저장된 파일 ID (문자열)
+        """
+        with self._db_lock:
+            try:
+                if content_sha256:
+                    metadata = {**(metadata or {}), "content_sha256": content_sha256}
+                file_insert_query = "INSERT INTO files (filename, length, metadata, content, content_sha256) VALUES (%s, %s, %s, %s, %s) RETURNING id"
                 self.execute_query(
                     file_insert_query,
-                    params=(filename, len(file_content), psycopg2.extras.Json(metadata), file_content),
-                    commit=True
+                    params=(filename, len(file_content), psycopg2.extras.Json(metadata), file_content, content_sha256),
+                    commit=chunks is None # 청크 저장까지 하나의 트랜잭션으로 묶기 위해 청크가 있으면 commit은 나중에
                 )
+                # 방금 삽입된 파일의 ID를 가져옵니다.
                 self._cursor.execute("SELECT currval(pg_get_serial_sequence('files','id')) AS new_file_id")
                 result_row = self._cursor.fetchone()
                 file_id = result_row['new_file_id'] if result_row else None
                 logger.info(f"파일 '{filename}' files 테이블에 저장 완료. ID: {file_id}")
+
+                if chunks is None:
+                    return str(file_id)
+
+                # pgvector의 Vector 타입을 사용하기 위해 Vector 임포트
+                from pgvector import Vector # Vector 타입 임포트
+
+                chunk_insert_query = "INSERT INTO chunks (file_id, chunk_index, content, embedding, metadata) VALUES %s"
+                chunk_data_to_insert = []
+                for i, chunk in enumerate(chunks):
+                    chunk_metadata = {
+                        "filename": filename,
+                        "chunk_index": i,
+                        "original_file_id": file_id, # PostgreSQL 파일 ID 참조
+                        **chunk.metadata
+                    }
+                    # NUL 문자 제거된 청크 내용 사용
+                    chunk_data_to_insert.append((
+                        file_id,
+                        i,
+                        chunk_texts[i],
+                        Vector(embeddings[i]), # pgvector의 Vector 객체 사용
+                        psycopg2.extras.Json(chunk_metadata)
+                    ))
+
+                # execute_values로 UPSERT_BATCH_SIZE개 행씩 하나의 INSERT 문으로 묶어 삽입
+                # (임베딩 배치 크기와 분리 - 임베딩은 작게, INSERT는 크게 묶는 편이 유리)
+                psycopg2.extras.execute_values(
+                    self._cursor, chunk_insert_query, chunk_data_to_insert, page_size=UPSERT_BATCH_SIZE
+                )
+                self._connection.commit() # files 및 chunks 테이블 삽입 트랜잭션 커밋
+                logger.info(f"{len(chunk_data_to_insert)}개의 청크 files ID {file_id}에 대해 chunks 테이블에 저장 완료.")
+
+                # 모든 처리가 성공적으로 완료되면 파일 ID 반환 (일반 문서의 경우)
                 return str(file_id)
-            
-            # 지원되는 다른 파일 형식 (txt, pdf, docx)은 내용 로드 및 청크 분할, 임베딩 생성 후 파일 저장
-            temp_file_path = None
-            docs = []
-            try:
-                 # Langchain 로더는 파일 경로를 받는 경우가 많으므로 임시 파일로 저장
-                 with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp:
-                     tmp.write(file_content)
-                     temp_file_path = tmp.name
- 
-                 if file_extension == '.txt':
-                     loader = TextLoader(temp_file_path)
-                     docs = loader.load()
-                 elif file_extension == '.pdf':
-                     loader = PyPDFLoader(temp_file_path)
-                     docs = loader.load()
-                 elif file_extension == '.docx':
-                     loader = Docx2txtLoader(temp_file_path)
-                     docs = loader.load()
-                 else:
-                      logger.warning(f"청크 처리가 지원되지 않는 파일 형식: {filename}")
-                      return None # 처리 실패
-
-            finally:
-                 # 임시 파일 삭제
-                 if temp_file_path and os.path.exists(temp_file_path):
-                     os.remove(temp_file_path)
-
-            if not docs:
-                 logger.warning(f"파일 내용 로드 실패 또는 내용 없음: {filename}")
-                 return None # 문서 로드 실패 시 처리 중단
-
-            # 3. 로드된 문서를 청크로 분할
-            text_splitter = RecursiveCharacterTextSplitter(
-                 chunk_size=CHUNK_SIZE,
-                 chunk_overlap=CHUNK_OVERLAP,
-                 length_function=len,
-                 is_separator_regex=False,
-            )
-            chunks = text_splitter.split_documents(docs)
- 
-            # 각 청크(Document 객체)에 대한 벡터 임베딩 생성
-            if not self.embedding_model:
-                logger.error("Embedding 모델이 로드되지 않았습니다. 청크 임베딩 생성이 불가능합니다.")
-                raise RuntimeError("Embedding model not loaded") # 임베딩 모델 없으면 오류 발생
-
-            # NUL 문자 제거
-            chunk_texts = [clean_text_for_postgresql(chunk.page_content) for chunk in chunks]
-            embeddings = self.embedding_model.embed_documents(chunk_texts)
-            logger.info(f"{len(embeddings)}개의 청크 임베딩 생성 완료.")
-            
-            # 4. 임베딩 생성이 완료된 후에 파일을 저장
-            file_insert_query = "INSERT INTO files (filename, length, metadata, content) VALUES (%s, %s, %s, %s) RETURNING id"
-            self.execute_query(
-                file_insert_query,
-                params=(filename, len(file_content), psycopg2.extras.Json(metadata), file_content),
-                commit=False # 청크 저장까지 하나의 트랜잭션으로 묶기 위해 commit은 나중에
-            )
-            # 방금 삽입된 파일의 ID를 가져옵니다.
-            self._cursor.execute("SELECT currval(pg_get_serial_sequence('files','id')) AS new_file_id")
-            result_row = self._cursor.fetchone()
-            file_id = result_row['new_file_id'] if result_row else None
-            logger.info(f"파일 '{filename}' files 테이블에 저장 완료. ID: {file_id}")
-
-            # KeyBERT로 태그 추출기 준비 (최초 1회만 로드)
-            # KeyBERT 임포트 및 사용 로직 추가
-            # try:
-            #     from keybert import KeyBERT # KeyBERT 임포트
-            #     if not hasattr(self, '_keybert_model'):
-            #        self._keybert_model = KeyBERT()
-            #     kw_model = self._keybert_model
-            #     use_keybert = True
-            # except ImportError:
-            #      logger.warning("KeyBERT 라이브러리가 설치되지 않았습니다. 태그 자동 추출 기능을 사용할 수 없습니다.")
-            #      use_keybert = False
-
-            # 4. chunks 테이블에 청크 및 임베딩 저장
-            # pgvector의 Vector 타입을 사용해야 합니다.
-            # from pgvector.psycopg2 import register_vector
-            # register_vector(self._connection)
-
-            # pgvector의 Vector 타입을 사용하기 위해 Vector 임포트
-            from pgvector import Vector # Vector 타입 임포트
-
-            chunk_insert_query = "INSERT INTO chunks (file_id, chunk_index, content, embedding, metadata) VALUES (%s, %s, %s, %s, %s)"
-            chunk_data_to_insert = []
-            # KeyBERT 태그 추출 로직 추가 필요
-            # if use_keybert:
-            #    # KeyBERT로 주요 키워드 추출 (상위 5개, 단어만)
-            #    keywords = [kw for kw, _ in kw_model.extract_keywords(chunk.page_content, top_n=5)]
-            # else:
-            #     keywords = []
-
-            for i, chunk in enumerate(chunks):
-                 chunk_metadata = {
-                     "filename": filename,
-                     "chunk_index": i,
-                     "original_file_id": file_id, # PostgreSQL 파일 ID 참조
-                     # "tags": keywords, # 태그 추가 (KeyBERT 사용 시)
-                     **chunk.metadata
-                 }
-                 # NUL 문자 제거된 청크 내용 사용
-                 clean_content = clean_text_for_postgresql(chunk.page_content)
-                 chunk_data_to_insert.append((
-                     file_id,
-                     i,
-                     clean_content,
-                     Vector(embeddings[i]), # pgvector의 Vector 객체 사용
-                     psycopg2.extras.Json(chunk_metadata)
-                 ))
-
-            # psycopg2.extras.execute_batch를 사용하여 일괄 삽입
-            from psycopg2.extras import execute_batch # execute_batch 임포트 활성화
-            execute_batch(self._cursor, chunk_insert_query, chunk_data_to_insert)
-            self._connection.commit() # files 및 chunks 테이블 삽입 트랜잭션 커밋
-            logger.info(f"{len(chunk_data_to_insert)}개의 청크 files ID {file_id}에 대해 chunks 테이블에 저장 완료.")
-
-            # 모든 처리가 성공적으로 완료되면 파일 ID 반환 (일반 문서의 경우)
-            return str(file_id)
 
-        except Exception as e:
-             logger.error(f"PostgreSQL 파일 저장 및 처리 중 오류 발생: {e}")
-             if self._connection: # 연결이 있는 경우 롤백 시도
-                 self._connection.rollback()
-             # 오류 발생 시 예외 다시 발생
-             raise
+            except Exception as e:
+                logger.error(f"PostgreSQL 파일 저장 및 처리 중 오류 발생: {e}")
+                if self._connection: # 연결이 있는 경우 롤백 시도 (아직 _db_lock을 잡은 상태)
+                    self._connection.rollback()
+                # 오류 발생 시 예외 다시 발생
+                raise
 
-    def list_files(self) -> List[Dict[str, Any]]:
+    def list_files(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """files 테이블에 저장된 파일 목록을 조회
 
+        Args:
+            limit: 최대 조회 개수 (None이면 전체)
+            offset: 건너뛸 개수 (페이지 조회용)
+
         Returns:
             List[Dict[str, Any]]: 파일 목록 리스트
         """
         logger.info("PostgreSQL 파일 목록 조회 시도")
-        # SQL: SELECT id, filename, upload_date, length, metadata FROM files
-        list_files_query = "SELECT id, filename, upload_date, length, metadata FROM files ORDER BY upload_date DESC"
-        files = self.execute_query(list_files_query, fetchall=True)
+        # SQL: SELECT id, filename, upload_date, length FROM files (idx_files_upload_date로 정렬/조회)
+        list_files_query = "SELECT id, filename, upload_date, length FROM files ORDER BY upload_date DESC"
+        params = None
+        if limit is not None:
+            list_files_query += " LIMIT %s OFFSET %s"
+            params = (limit, offset)
+        files = self.execute_query(list_files_query, params=params, fetchall=True)
 
         # MongoDBStorage의 반환 형태와 유사하게 변환
         # ObjectId 대신 PostgreSQL의 INTEGER ID를 문자열로 반환
@@ -543,6 +713,11 @@ class PostgreSQLStorage:
         else:
              return []
 
+    def count_files(self) -> int:
+        """files 테이블의 전체 파일 수 조회"""
+        result = self.execute_query("SELECT COUNT(*) AS count FROM files", fetchone=True)
+        return result['count'] if result else 0
+
     def get_file_content_by_id(self, file_id: str):
         """files 테이블에서 특정 ID의 파일 내용을 가져옵니다."""
         logger.info(f"PostgreSQL 파일 내용 ID {file_id}로 조회 시도")
@@ -555,10 +730,18 @@ class PostgreSQLStorage:
             return None
 
         content_query = "SELECT content FROM files WHERE id = %s"
-        content_row = self.execute_query(content_query, params=(file_id_int,), fetchone=True)
+        # 큰 bytea 조회가 공유 연결 잠금을 오래 잡지 않도록 풀 연결 사용 (미리 가져오기 스레드에서도 호출됨)
+        try:
+            with self.pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(content_query, (file_id_int,))
+                    content_row = cur.fetchone()
+        except Exception as e:
+            logger.error(f"파일 내용 조회 오류: {file_id} ({e})")
+            return None
 
         # content는 bytea 타입으로 저장되므로 bytes 객체 그대로 반환
-        content = content_row['content'] if content_row and content_row.get('content') else None
+        content = content_row[0] if content_row and content_row[0] else None
         # psycopg2는 bytea를 memoryview로 반환할 수 있으므로 bytes로 강제 변환
         if isinstance(content, memoryview):
             content = content.tobytes()
@@ -752,6 +935,51 @@ class PostgreSQLStorage:
 
         return count > 0
 
+    def check_file_hash_exists(self, content_sha256: str) -> Optional[dict]:
+        """
+        파일 내용의 SHA-256으로 중복 파일 존재 여부를 확인합니다.
+
+        Args:
+            content_sha256 (str): 확인할 파일 내용의 SHA-256 (hex).
+
+        Returns:
+            dict: 파일 정보 (존재하는 경우) 또는 None (존재하지 않는 경우).
+        """
+        query = "SELECT id, filename, upload_date, length FROM files WHERE content_sha256 = %s"
+        result = self.execute_query(query, params=(content_sha256,), fetchone=True)
+        if result:
+            return {
+                'id': result['id'],
+                'filename': result['filename'],
+                'upload_date': result['upload_date'],
+                'length': result['length']
+            }
+        return None
+
+    def _ensure_content_hash_column(self):
+        """files.content_sha256 컬럼과 유니크 인덱스가 없으면 추가 (init.sql 이전에 만든 DB 호환)"""
+        try:
+            self.execute_query(
+                """
+                ALTER TABLE files ADD COLUMN IF NOT EXISTS content_sha256 CHAR(64);
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_files_content_sha256 ON files(content_sha256);
+                """,
+                commit=True
+            )
+        except Exception as e:
+            logger.warning(f"content_sha256 컬럼 준비 실패 (내용 해시 중복 확인 불가): {e}")
+
+    def _ensure_upload_date_index(self):
+        """파일 목록 페이지 조회용 upload_date 커버링 인덱스가 없으면 추가"""
+        try:
+            self.execute_query(
+                "CREATE INDEX IF NOT EXISTS idx_files_upload_date "
+                "ON files(upload_date DESC) INCLUDE (id, filename, length)",
+                commit=True
+            )
+        except Exception as e:
+            logger.warning(f"upload_date 인덱스 준비 실패: {e}")
+
     def check_file_exists(self, filename: str) -> dict:
         """
         파일명으로 중복 파일 존재 여부를 확인합니다.
@@ -39,6 +39,11 @@ class GlobalStateManager:
         self._syncing_to_streamlit = False
         self._syncing_from_streamlit = False
         self._last_sync_state = {}
+
+        # 이 프로세스가 마지막으로 기록한 값과 그때의 파일 시그니처 (쓰기 생략 판단용)
+        # 다른 프로세스/코드가 파일을 바꾸면 시그니처가 달라져 다시 읽고 기록함
+        self._written_state = {}
+        self._written_signature = None
         
         # 기본 상태
         self.default_state = {
@@ -58,6 +63,20 @@ class GlobalStateManager:
         # 상태 초기화
         self._ensure_state_file()
     
+    def _file_signature(self) -> Optional[tuple]:
+        """상태 파일의 (수정 시각 ns, 크기) - 파일이 없으면 None"""
+        try:
+            stat = self.state_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _is_already_written(self, values: Dict[str, Any]) -> bool:
+        """마지막 기록 이후 파일이 바뀌지 않았고 같은 값을 이미 기록했는지 확인"""
+        if self._written_signature is None or self._file_signature() != self._written_signature:
+            return False
+        return all(self._written_state.get(key) == value for key, value in values.items())
+
     def _ensure_state_file(self):
         """상태 파일이 없으면 생성"""
         if not self.state_file.exists():
@@ -112,6 +131,8 @@ class GlobalStateManager:
                     json.dump(cleaned_state, f, indent=2, ensure_ascii=False)
                 
                 self._last_update = time.time()
+                self._written_state = cleaned_state
+                self._written_signature = self._file_signature()
                 
         except Exception as e:
             logger.error(f"상태 저장 오류: {e}")
@@ -146,6 +167,13 @@ class GlobalStateManager:
     
     def update_automation_status(self, automation_status: bool, autonomous_monitoring: bool = None):
         """자동화 상태 업데이트"""
+        # 파일이 그대로이고 같은 값을 이미 기록했으면 파일을 읽거나 쓰지 않음
+        values = {'automation_status': automation_status}
+        if autonomous_monitoring is not None:
+            values['autonomous_monitoring'] = autonomous_monitoring
+        if self._is_already_written(values):
+            return
+
         state = self.load_state()
         
         # 변경사항 있는지 체크
@@ -169,6 +197,13 @@ class GlobalStateManager:
     
     def update_system_status(self, system_initialized: bool, orchestrator_active: bool = None):
         """시스템 상태 업데이트"""
+        # 파일이 그대로이고 같은 값을 이미 기록했으면 파일을 읽거나 쓰지 않음
+        values = {'system_initialized': system_initialized}
+        if orchestrator_active is not None:
+            values['orchestrator_active'] = orchestrator_active
+        if self._is_already_written(values):
+            return
+
         state = self.load_state()
         state['system_initialized'] = system_initialized
         